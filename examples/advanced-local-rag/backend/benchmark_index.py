@@ -0,0 +1,127 @@
+"""
+Benchmark the vector index of the docstore table against exact search.
+
+For every combination of nprobes and refine_factor, the recall@k of the indexed
+search (the fraction of the exact top k it returns) and the p50/p99 query latency
+are measured, next to the latency of exact search:
+
+    python benchmark_index.py --queries 200 --k 10 --nprobes 10,20,50,100 --refine-factors 0,5,10
+
+Queries are embedded from the lines of --queries-file, or else sampled from the
+vectors stored in the table. A sampled vector always finds its own row, so use
+real queries for absolute recall numbers and samples to compare settings.
+"""
+import argparse
+import time
+
+import numpy as np
+
+import db_utils
+
+
+def parse_ints(value: str):
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def load_queries(table, count: int, queries_file=None, seed: int = 0):
+    """Query vectors, embedded from a file with one query per line or sampled from the table."""
+    if queries_file:
+        with open(queries_file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()][:count]
+        return np.asarray(db_utils.get_model().encode(texts), dtype=np.float32)
+    try:
+        # random rows, needs pylance
+        vectors = table.to_lance().sample(count, columns=["embedding"], randomize_order=True)["embedding"]
+    except Exception:
+        # the first rows of a larger head of the table
+        head = table.search().select(["embedding"]).limit(count * 10).to_arrow()["embedding"]
+        rng = np.random.default_rng(seed)
+        vectors = head.take(rng.choice(len(head), size=min(count, len(head)), replace=False))
+    return np.asarray(vectors.to_pylist(), dtype=np.float32)
+
+
+def run_queries(table, queries, k: int, nprobes=None, refine_factor=None, exact=False):
+    """Run all queries and return the ids of the results and the latency of each query in milliseconds."""
+    results = []
+    latencies = []
+    for query in queries:
+        search = table.search(query, vector_column_name="embedding").select(["id"]).limit(k)
+        if exact:
+            search = search.bypass_vector_index()
+        else:
+            if nprobes:
+                search = search.nprobes(nprobes)
+            if refine_factor:
+                search = search.refine_factor(refine_factor)
+        start = time.perf_counter()
+        rows = search.to_list()
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([row["id"] for row in rows])
+    return results, np.asarray(latencies)
+
+
+def recall_at_k(results, expected, k: int) -> float:
+    """Mean fraction of the exact top k found by the indexed search."""
+    hits = [len(set(found[:k]) & set(truth[:k])) / max(1, min(k, len(truth))) for found, truth in zip(results, expected)]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def benchmark(table, queries, k: int, nprobes_values, refine_factors, warmup: int = 5):
+    """
+    Measure exact search and every combination of nprobes and refine_factor.
+
+    Returns a list of dicts with the settings, recall@k, p50 and p99 latency.
+    """
+    # warm up caches of the table files
+    run_queries(table, queries[:warmup], k, exact=True)
+    expected, latencies = run_queries(table, queries, k, exact=True)
+    rows = [{
+        'search': 'exact', 'nprobes': None, 'refine_factor': None, 'recall': 1.0,
+        'p50_ms': float(np.percentile(latencies, 50)), 'p99_ms': float(np.percentile(latencies, 99)),
+    }]
+    for nprobes in nprobes_values:
+        for refine_factor in refine_factors:
+            run_queries(table, queries[:warmup], k, nprobes, refine_factor)
+            results, latencies = run_queries(table, queries, k, nprobes, refine_factor)
+            rows.append({
+                'search': 'index', 'nprobes': nprobes, 'refine_factor': refine_factor or None,
+                'recall': recall_at_k(results, expected, k),
+                'p50_ms': float(np.percentile(latencies, 50)), 'p99_ms': float(np.percentile(latencies, 99)),
+            })
+    return rows
+
+
+def print_report(rows, k: int):
+    print(f"{'search':<8} {'nprobes':>8} {'refine':>7} {f'recall@{k}':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for row in rows:
+        print(f"{row['search']:<8} {row['nprobes'] or '-':>8} {row['refine_factor'] or '-':>7} "
+              f"{row['recall']:>10.3f} {row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure recall@k and latency of the vector index.")
+    parser.add_argument("--queries", type=int, default=200, help="number of queries")
+    parser.add_argument("--queries-file", help="file with one query per line, default: sample stored vectors")
+    parser.add_argument("--k", type=int, default=10, help="number of results per query")
+    parser.add_argument("--nprobes", type=parse_ints, default=[10, 20, 50, 100], help="comma-separated nprobes values")
+    parser.add_argument("--refine-factors", type=parse_ints, default=[0, 5, 10],
+                        help="comma-separated refine_factor values, 0 for no refinement")
+    parser.add_argument("--create-index", action="store_true", help="(re)create the index before measuring")
+    args = parser.parse_args()
+
+    table = db_utils.get_table()
+    num_rows = table.count_rows()
+    print(f"{num_rows} rows, planned index: {db_utils.plan_vector_index(num_rows) or 'flat search'}")
+    if args.create_index:
+        db_utils.create_vector_index()
+    try:
+        print(f"Indices: {table.list_indices()}")
+    except Exception:
+        pass
+
+    queries = load_queries(table, args.queries, args.queries_file)
+    print_report(benchmark(table, queries, args.k, args.nprobes, args.refine_factors), args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,45 @@
 from pathlib import Path
 from docling.document_converter import DocumentConverter
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
 import os
-from db_utils import get_table, create_embeddings_batch, create_vector_index, get_model
+import queue
+import threading
+import time
+import numpy as np
+import pyarrow as pa
+from bisect import bisect_right
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from operator import itemgetter
+from db_utils import (
+    build_columns, create_vector_index, get_embedding_cache, get_model, get_table, get_tokenizer, optimize_table,
+    to_record_batch,
+)
 import shutil
 from docling.chunking import HybridChunker
-from semantic_text_splitter import TextSplitter, CodeSplitter, MarkdownSplitter
 
-EMBEDDING_MODEL = "jinaai/jina-embeddings-v3"
+# Pipeline settings
+NUM_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # conversion processes, one core is left for embedding
+MAX_PENDING_FILES = NUM_WORKERS * 4  # files in conversion or waiting for the embedding stage
+EMBED_BATCH_SIZE = 64  # chunks per batch of the embedding model
+EMBED_POOL_SIZE = EMBED_BATCH_SIZE * 16  # chunks pooled across documents and sorted by token length
+WRITE_BATCH_SIZE = 8192  # rows per table.add, default of --write-batch-size
+WRITE_QUEUE_SIZE = 64  # embedded documents waiting for the writer
+_DONE = None  # end of stream marker for the stage queues
+
+# Indexed files with size, mtime and content hash, for incremental re-indexing
+MANIFEST_PATH = Path("./.lancedb/manifest.json")
+
+# Chunking of text files
+MAX_CHUNK_TOKENS = 512
+# split points of text chunks in order of preference, the chunk ends after the separator
+TEXT_SEPARATORS = ('\n\n', '\n', '. ', '? ', '! ', '; ', ' ')
+MARKDOWN_SEPARATORS = ('\n#',) + TEXT_SEPARATORS
+
+# Docling converter of a worker process, created on first use
+_converter = None
 
 # Directories to ignore during processing
 IGNORE_DIRECTORIES = {
@@ -21,6 +54,7 @@ IGNORE_DIRECTORIES = {
     'venv',
     'env',
     '.lancedb',
+    '.embedding_cache',
     '.mypy_cache'
 }
 
@@ -45,126 +79,94 @@ DOCUMENT_EXTENSIONS = {
 }
 
 
-def chunk_text_file(file_path: Path):
+def read_text_file(file_path: Path):
+    """
+    Read a file as UTF-8 text, None if it is not a text file.
     """
-    Chunk a text file using a semantic splitter, retrying up to 3 times 
-    with decreasing char-chunk sizes if we get any chunk > 512 tokens.
-    If still failing, we do a direct token-based split for the large chunk.
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except UnicodeDecodeError:
+        print(f"Unable to read {file_path} as text - skipping")
+        return None
 
-    Returns a list of dicts with keys: 'text', 'page_number', 'bbox'.
+
+def split_text(text: str, separators=TEXT_SEPARATORS, tokenizer=None):
     """
-    tokenizer = get_model().tokenizer
-    
-    # 1) Read file text
-    with open(file_path, 'r', encoding='utf-8') as f:
-        try:
-            text = f.read()
-        except UnicodeDecodeError:
-            print(f"Unable to read {file_path} as text - skipping")
-            return []
-    
-    if not text.strip():
-        return []
+    Split text into chunks of at most MAX_CHUNK_TOKENS tokens in a single pass.
 
-    # 2) Estimate average ratio of tokens/characters
-    tokens = tokenizer.tokenize(text)
-    char_len = len(text)
-    token_len = len(tokens)
-    if char_len == 0:  # extremely rare if text is empty
-        return []
-    
-    ratio = token_len / char_len  # tokens per character
-    # Start with chunk_size_chars ~ 512 tokens worth of characters
-    chunk_size_chars = int(512 / ratio) if ratio > 0 else 512
-    chunk_size_chars = max(chunk_size_chars, 200)  # floor to avoid super-tiny chunks
-
-    # 3) We'll define a helper to do one pass of semantic chunking
-    def semantic_split_pass(txt: str, chunk_size: int) -> list:
-        """Split text semantically with a given char chunk size."""
-        # Decide which semantic splitter based on extension
-        file_extension = file_path.suffix.lower()
-        if file_extension == '.md':
-            splitter = MarkdownSplitter(chunk_size)
-        # Comment out code splitting logic for now
-        # elif file_extension in {'.py', '.js', '.ts', '.jsx', '.tsx'}:
-        #     # Load tree-sitter
-        #     if file_extension == '.py':
-        #         import tree_sitter_python
-        #         language = tree_sitter_python.language()
-        #     elif file_extension == '.ts':
-        #         import tree_sitter_typescript
-        #         language = tree_sitter_typescript.language_typescript()
-        #     elif file_extension == '.tsx':
-        #         import tree_sitter_typescript
-        #         language = tree_sitter_typescript.language_tsx()
-        #     else:  # .js, .jsx
-        #         import tree_sitter_javascript
-        #         language = tree_sitter_javascript.language()
-        #     
-        #     splitter = CodeSplitter(language, chunk_size)  # Add minimum chunk size
-        else:
-            splitter = TextSplitter(chunk_size)  # Add minimum chunk size
-        
-        return splitter.chunks(txt)
+    The text is tokenized once. Every chunk takes as many tokens as allowed and is then
+    cut back to the last of the separators (tried in order) in the second half of its
+    character range, or at a token boundary if there is none. Each character is searched
+    about once per separator, so the time is linear in the text length.
 
-    # 4) Attempt semantic chunking up to 3 times, each time reducing chunk size if needed
-    max_retries = 3
-    for attempt in range(1, max_retries + 1):
-        text_chunks = semantic_split_pass(text, chunk_size_chars)
+    Returns the (start, end) character ranges of the chunks and their token counts.
+    """
+    tokenizer = tokenizer or get_tokenizer()
+    offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)['offset_mapping']
+    token_ends = [token_end for _, token_end in offsets]
+
+    spans = []
+    lengths = []
+    first = 0
+    while first < len(offsets):
+        last = min(first + MAX_CHUNK_TOKENS, len(offsets))
+        char_start = offsets[first][0]
+        char_end = offsets[last - 1][1]
+        if last < len(offsets):
+            # search the second half of the chunk, so that chunks do not get tiny
+            min_end = char_start + (char_end - char_start) // 2
+            for separator in separators:
+                found = text.rfind(separator, min_end, char_end)
+                if found < 0:
+                    continue
+                # the chunk ends with the separator, a heading starts the next chunk
+                cut = found + 1 if separator.startswith('\n#') else found + len(separator)
+                # tokens ending after the cut belong to the next chunk, including a token
+                # overlapping the cut, the chunk then ends where that token starts
+                cut_token = bisect_right(token_ends, cut, first + 1, last)
+                if cut_token > first:
+                    last = cut_token
+                    char_end = min(cut, offsets[cut_token][0])
+                break
+        spans.append((char_start, char_end))
+        lengths.append(last - first)
+        first = last
+    return spans, lengths
 
-        # Check if any chunk > 512 tokens
-        chunk_sizes = []
-        for c in text_chunks:
-            tk_len = len(tokenizer.tokenize(c))
-            chunk_sizes.append(tk_len)
 
-        oversize = [sz for sz in chunk_sizes if sz > 512]
+def chunk_text(text: str, suffix: str = ''):
+    """
+    Chunk a text with split_text, using Markdown headings as separators for .md files.
 
-        if not oversize:
-            # All chunks are within 512 tokens => success
-            break
-        else:
-            # We have an oversized chunk
-            if attempt < max_retries:
-                # Decrease chunk_size_chars and retry
-                # E.g., multiply by 0.5 or 0.75, your choice
-                chunk_size_chars = max(int(chunk_size_chars * 0.5), 50)
-                print(f"[Retry {attempt}/{max_retries}] Oversized chunk found. "
-                      f"Reducing chunk_size_chars to {chunk_size_chars} and retrying...")
-            else:
-                # After final attempt, we'll accept the chunking and
-                # fallback to direct token-based splitting for large chunks
-                print(f"[Final Retry] Still oversize after attempts. "
-                      "Will forcibly tokenize oversize chunks.")
-                break
+    Returns a list of dicts with keys: 'text', 'page_number', 'bbox', and the token count of each chunk.
+    """
+    separators = MARKDOWN_SEPARATORS if suffix.lower() == '.md' else TEXT_SEPARATORS
+    chunks = []
+    lengths = []
+    for (start, end), length in zip(*split_text(text, separators)):
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append({
+                'text': chunk,
+                'page_number': None,
+                'bbox': None
+            })
+            lengths.append(length)
+    return chunks, lengths
 
-    # 5) Now we have semantic chunks in `text_chunks`, some might still be >512 tokens.
-    #    We'll do a final pass to forcibly split those oversize chunks by tokens.
-    final_chunks = []
-    for chunk_text in text_chunks:
-        sub_tokens = tokenizer.tokenize(chunk_text)
-        if len(sub_tokens) <= 512:
-            final_chunks.append(chunk_text)
-        else:
-            # Force-split
-            start_idx = 0
-            while start_idx < len(sub_tokens):
-                end_idx = start_idx + 512
-                piece_tokens = sub_tokens[start_idx:end_idx]
-                piece_text = tokenizer.detokenize(piece_tokens)
-                final_chunks.append(piece_text)
-                start_idx = end_idx
-
-    # 6) Package them into your standard chunk dict format
-    chunk_dicts = []
-    for ck_text in final_chunks:
-        chunk_dicts.append({
-            'text': ck_text,
-            'page_number': None,
-            'bbox': None
-        })
-    
-    return chunk_dicts
+
+def chunk_text_file(file_path: Path):
+    """
+    Chunk a text file into chunks of at most MAX_CHUNK_TOKENS tokens aligned to
+    paragraphs, lines, sentences or words.
+
+    Returns a list of dicts with keys: 'text', 'page_number', 'bbox'.
+    """
+    text = read_text_file(file_path)
+    if not text or not text.strip():
+        return []
+    return chunk_text(text, file_path.suffix)[0]
 
 
 def chunk_docling_document(doc):
@@ -175,7 +177,7 @@ def chunk_docling_document(doc):
     from docling_core.types.doc import CoordOrigin, Size
 
     chunker = HybridChunker(
-        tokenizer=get_model().tokenizer,
+        tokenizer=get_tokenizer(),
         max_tokens=512,
         merge_peers=True
     )
@@ -245,77 +247,508 @@ def chunk_docling_document(doc):
     return chunks
 
 
-def process_document(doc_path: Path, docling_result):
+def file_hash(path: Path) -> str:
+    """
+    Content hash of a file, read in blocks.
     """
-    Process a document by creating embeddings and storing them in the database.
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_entry(path: Path, content_hash: str) -> dict:
+    stat = path.stat()
+    return {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': content_hash}
+
+
+class Manifest:
+    """
+    The indexed files with their size, mtime and content hash, persisted next to the database.
+
+    An entry is only recorded after the rows of the file were written, so an interrupted
+    build picks up the remaining files on the next run.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.files = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            self.files = json.loads(path.read_text())['files']
+
+    def get(self, file: str):
+        with self._lock:
+            return self.files.get(file)
+
+    def set(self, file: str, entry: dict):
+        with self._lock:
+            self.files[file] = entry
+
+    def remove(self, file: str):
+        with self._lock:
+            self.files.pop(file, None)
+
+    def save(self):
+        with self._lock:
+            data = json.dumps({'version': 1, 'files': self.files})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # write and rename, so a crash never leaves a truncated manifest
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(data)
+        os.replace(tmp_path, self.path)
+
+
+def delete_rows(table, paths):
     """
+    Delete the rows of the given documents, in batches of paths.
+    """
+    paths = list(paths)
+    for i in range(0, len(paths), 500):
+        quoted = ",".join("'" + path.replace("'", "''") + "'" for path in paths[i:i + 500])
+        table.delete(f"doc_path IN ({quoted})")
+
+
+def convert_and_chunk(path: str, known_hash=None):
+    """
+    Conversion stage, runs in a worker process: convert a file with Docling
+    (or read it as text) and chunk it.
+
+    If the content hash equals known_hash, the file is not chunked again.
+
+    Returns (path, content hash, chunks, token length of each chunk, seconds spent).
+    chunks is None if the content is unchanged, both chunks and the content hash are
+    None if the file could not be processed.
+    """
+    global _converter
+    start = time.perf_counter()
+    input_path = Path(path)
+    try:
+        content_hash = file_hash(input_path)
+    except OSError as e:
+        print(f"Error reading {input_path}: {str(e)}")
+        return path, None, None, None, time.perf_counter() - start
+    if content_hash == known_hash:
+        return path, content_hash, None, None, time.perf_counter() - start
+
+    chunks = None
+    lengths = None
     try:
-        if docling_result is not None:
-            # Process with Docling
+        if input_path.suffix.lower() in DOCUMENT_EXTENSIONS:
+            if _converter is None:
+                _converter = DocumentConverter()
+            docling_result = _converter.convert(path)
             chunks = chunk_docling_document(docling_result.document)
         else:
-            # Handle as plain text file
-            chunks = chunk_text_file(doc_path)
-            
-        if chunks:
-            embeddings_batch = create_embeddings_batch(doc_path, chunks)
-            table = get_table()
-            table.add(embeddings_batch)
-            print(f"Added {len(embeddings_batch)} embeddings for {doc_path}")
-            
+            # text files, and unknown extensions are tried as text files
+            text = read_text_file(input_path)
+            chunks, lengths = chunk_text(text, input_path.suffix) if text and text.strip() else ([], [])
+        if lengths is None:
+            lengths = token_lengths(chunks)
     except Exception as e:
-        print(f"Error processing {doc_path}: {str(e)}")
+        print(f"Error processing {input_path}: {str(e)}")
+        return path, None, None, None, time.perf_counter() - start
+    return path, content_hash, chunks, lengths, time.perf_counter() - start
 
 
-def build_index():
+def token_lengths(chunks):
+    """
+    Number of tokens of each chunk, counted in the worker processes for the length buckets of the embedding stage.
+    """
+    if not chunks:
+        return []
+    input_ids = get_tokenizer()([chunk['text'] for chunk in chunks], add_special_tokens=False)['input_ids']
+    return [len(ids) for ids in input_ids]
+
+
+def discover_files(repo_root: Path):
+    """
+    Discovery stage: yield all files to index below repo_root.
+    """
+    for root, dirs, files in os.walk(repo_root):
+        # Modify dirs in-place to skip ignored directories
+        dirs[:] = [d for d in dirs if d not in IGNORE_DIRECTORIES]
+        for file in files:
+            if file not in IGNORE_FILES:
+                yield Path(root) / file
+
+
+class StageStats:
+    """
+    Items processed and busy time of a pipeline stage, for the throughput report.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, items: int, seconds: float):
+        with self._lock:
+            self.items += items
+            self.busy += seconds
+
+    def report(self, wall_seconds: float) -> str:
+        busy_rate = self.items / self.busy if self.busy else 0.0
+        return (f"{self.name:<12} {self.items:>8} items  busy {self.busy:8.1f}s  "
+                f"{busy_rate:8.1f} items/s busy  {self.items / max(wall_seconds, 1e-9):8.1f} items/s overall")
+
+
+def put_item(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """
+    Put item into a stage queue, waiting while it is full. Returns False without putting
+    the item if the pipeline is stopped, so a failed stage never blocks the others.
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def get_item(q: queue.Queue, stop: threading.Event):
+    """
+    Take the next item from a stage queue, _DONE once the pipeline is stopped.
+    """
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+def run_stage(stage, failures: list, stop: threading.Event, *args):
+    """
+    Run a pipeline stage in its thread. An exception is recorded in failures and stops
+    the pipeline, the main thread re-raises it.
+    """
+    try:
+        stage(*args, stop)
+    except Exception as e:
+        print(f"Error in {stage.__name__}: {str(e)}")
+        failures.append(e)
+        stop.set()
+
+
+class EmbeddingBatcher:
+    """
+    Encodes the chunks of many documents in batches of similar token length.
+
+    Chunks are pooled across documents. Once the pool holds pool_size chunks, it is
+    sorted by token length and encoded in batches of batch_size, so the texts of a
+    batch pad to about the same length and small documents do not produce small
+    batches. The embeddings are collected per document and returned once all chunks
+    of a document are encoded.
+
+    With a cache, chunks whose embedding is cached are not pooled and new embeddings
+    are added to the cache.
+    """
+
+    def __init__(self, model, batch_size: int = EMBED_BATCH_SIZE, pool_size: int = EMBED_POOL_SIZE, cache=None):
+        self.model = model
+        self.cache = cache
+        self.batch_size = batch_size
+        self.pool_size = max(pool_size, batch_size)
+        # (token length, document, position of the chunk in the document, text)
+        self._pool = []
+        # document -> [embeddings by chunk position, chunks not yet encoded, failed]
+        self._documents = {}
+
+    def add(self, document, texts, lengths):
+        """
+        Add the chunks of a document.
+
+        Returns the (document, embeddings) of all documents completed by encoding the
+        full batches of the pool. embeddings is None if a batch of the document failed.
+        """
+        if not texts:
+            return [(document, [])]
+        if self.cache is None:
+            embeddings, missing = [None] * len(texts), range(len(texts))
+        else:
+            embeddings, missing = self.cache.lookup(texts)
+            if not missing:
+                return [(document, embeddings)]
+        self._documents[document] = [embeddings, len(missing), False]
+        self._pool.extend((lengths[position], document, position, texts[position]) for position in missing)
+        if len(self._pool) < self.pool_size:
+            return []
+        return self._drain(final=False)
+
+    def finish(self):
+        """
+        Encode the remaining chunks and return the (document, embeddings) of all remaining documents.
+        """
+        return self._drain(final=True)
+
+    def _drain(self, final: bool):
+        self._pool.sort(key=itemgetter(0))
+        # a partial batch is kept for the next pool, except at the end
+        end = len(self._pool) if final else len(self._pool) - len(self._pool) % self.batch_size
+        completed = []
+        for start in range(0, end, self.batch_size):
+            completed.extend(self._encode(self._pool[start:start + self.batch_size]))
+        self._pool = self._pool[end:]
+        return completed
+
+    def _encode(self, batch):
+        texts = [text for _, _, _, text in batch]
+        try:
+            embeddings = self.model.encode(texts, batch_size=len(texts))
+        except Exception as e:
+            print(f"Error embedding {len(texts)} chunks: {str(e)}")
+            embeddings = None
+        if embeddings is not None and self.cache is not None:
+            self.cache.store(texts, embeddings)
+        completed = []
+        for i, (_, document, position, _) in enumerate(batch):
+            state = self._documents[document]
+            if embeddings is None:
+                state[2] = True
+            else:
+                state[0][position] = embeddings[i]
+            state[1] -= 1
+            if state[1] == 0:
+                del self._documents[document]
+                completed.append((document, None if state[2] else state[0]))
+        return completed
+
+
+def embedding_stage(inbox: queue.Queue, outbox: queue.Queue, stats: StageStats, root: Path, stop: threading.Event):
+    """
+    Embedding stage: encode the chunks of all documents with an EmbeddingBatcher
+    and pass the rows of each completed document on to the writer.
+
+    Items are (path, manifest entry, chunks, token lengths), documents without chunks
+    are passed on so that the writer removes their old rows and records them in the
+    manifest. Documents whose embedding failed are dropped and retried on the next run.
+    The chunk IDs are derived from the paths relative to root. The stage ends early
+    when the pipeline is stopped.
+    """
+    cache = get_embedding_cache()
+    batcher = EmbeddingBatcher(get_model(), cache=cache)
+    documents = {}
+
+    def emit(completed):
+        for path, embeddings in completed:
+            entry, chunks = documents.pop(path)
+            if embeddings is not None:
+                put_item(outbox, (path, entry, build_columns(Path(path), root, chunks, embeddings)), stop)
+
+    while True:
+        item = get_item(inbox, stop)
+        if item is _DONE:
+            break
+        path, entry, chunks, lengths = item
+        documents[path] = (entry, chunks)
+        start = time.perf_counter()
+        completed = batcher.add(path, [chunk['text'] for chunk in chunks], lengths)
+        stats.add(len(chunks), time.perf_counter() - start)
+        emit(completed)
+    if not stop.is_set():
+        start = time.perf_counter()
+        completed = batcher.finish()
+        stats.add(0, time.perf_counter() - start)
+        emit(completed)
+        put_item(outbox, _DONE, stop)
+    cache.flush()
+    if cache.hits or cache.misses:
+        print(f"Embedding cache: {cache.hits} hits, {cache.misses} misses "
+              f"({100 * cache.hits / (cache.hits + cache.misses):.0f}% hits)")
+
+
+def writer_stage(inbox: queue.Queue, stats: StageStats, manifest: Manifest, replace: bool,
+                 batch_size: int, stop: threading.Event):
+    """
+    Writer stage: add the rows to the table in batches of batch_size rows and
+    record the written documents in the manifest. When the pipeline is stopped,
+    the pending rows are not written.
+
+    The columns of the documents are collected as lists and embedding matrices and
+    written as one Arrow RecordBatch per flush, which keeps the number of Lance
+    fragments low and avoids a Python object per row.
+
+    If replace is set, existing rows of the documents (from a previous version or an
+    interrupted build) are deleted before their new rows are added.
+    """
+    table = get_table()
+    columns = {}
+    embeddings = []
+    documents = []
+    row_count = 0
+
+    def flush():
+        start = time.perf_counter()
+        try:
+            if replace:
+                delete_rows(table, [path for path, _ in documents])
+            if row_count:
+                batch = to_record_batch(columns, np.concatenate(embeddings))
+                table.add(pa.Table.from_batches([batch]))
+        except Exception as e:
+            print(f"Error writing {row_count} rows: {str(e)}")
+            return
+        for path, entry in documents:
+            manifest.set(path, entry)
+        manifest.save()
+        stats.add(row_count, time.perf_counter() - start)
+
+    while True:
+        item = get_item(inbox, stop)
+        if item is _DONE:
+            break
+        path, entry, (document_columns, document_embeddings) = item
+        documents.append((path, entry))
+        for name, values in document_columns.items():
+            columns.setdefault(name, []).extend(values)
+        embeddings.append(document_embeddings)
+        row_count += len(document_embeddings)
+        if row_count >= batch_size:
+            flush()
+            columns, embeddings, documents, row_count = {}, [], [], 0
+    if documents and not stop.is_set():
+        flush()
+
+
+def build_index(full: bool = False, write_batch_size: int = WRITE_BATCH_SIZE):
+    """
+    Index all new and changed files of the repository with a pipeline of bounded stages:
+
+        discovery -> conversion & chunking (process pool) -> embedding -> writer
+
+    Every stage runs concurrently, so Docling conversion on all cores overlaps with
+    embedding and writing. The queues between the stages are bounded, so at most
+    MAX_PENDING_FILES converted files are held in memory when the embedding stage
+    falls behind.
+
+    Indexed files are recorded in a manifest with their size, mtime and content hash.
+    Files whose size and mtime (or content) are unchanged are skipped, the rows of
+    changed and removed files are deleted. With full=True the database is rebuilt.
+
+    If the embedding or the writer stage fails, the pipeline is stopped and the
+    exception is raised once all stages have ended.
+
+    After ingestion the table is compacted, since every flush and delete adds fragments.
+    """
     print("Building index")
+    wall_start = time.perf_counter()
     
-    # Clear existing database if it exists
     db_path = Path("./.lancedb")
-    if db_path.exists():
+    if full and db_path.exists():
         print("Clearing existing database...")
         shutil.rmtree(db_path)
+    manifest = Manifest(MANIFEST_PATH)
+    # without a manifest, rows of an earlier build may exist for any file
+    replace = bool(manifest.files) or (db_path.exists() and get_table().count_rows() > 0)
     
     # Get repository root (3 levels up from current script)
     current_dir = Path(__file__).resolve().parent
     repo_root = current_dir.parents[2]
-    
-    # Initialize the document converter
-    converter = DocumentConverter()
-    
-    # Walk through all files in the repository
-    for root, dirs, files in os.walk(repo_root):
-        # Modify dirs in-place to skip ignored directories
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRECTORIES]
-        
-        for file in files:
-            if file in IGNORE_FILES:
-                continue
-
-            input_path = Path(root) / file
-            try:
-                file_extension = input_path.suffix.lower()
-                
-                if file_extension in TEXT_FILE_EXTENSIONS:
-                    print(f"Processing {input_path} as text file")
-                    process_document(input_path, None)
-                elif file_extension in DOCUMENT_EXTENSIONS:
-                    print(f"Processing {input_path} with Docling")
-                    try:
-                        docling_result = converter.convert(str(input_path))
-                        process_document(input_path, docling_result)
-                    except Exception as e:
-                        print(f"Docling conversion failed for {input_path}: {str(e)}")
-                else:
-                    print(f"Unknown extension for {input_path}, trying as text file")
-                    process_document(input_path, None)
-                    
-            except Exception as e:
-                print(f"Error processing {input_path}: {str(e)}")
-
-    print("Creating vector index...")
-    create_vector_index()
+
+    conversion_stats = StageStats("conversion")
+    embedding_stats = StageStats("embedding")
+    writer_stats = StageStats("writer")
+    to_embed = queue.Queue(maxsize=MAX_PENDING_FILES)
+    to_write = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+    # set when a stage fails, every queue operation gives up then
+    stop = threading.Event()
+    failures = []
+    embedder = threading.Thread(
+        target=run_stage, args=(embedding_stage, failures, stop, to_embed, to_write, embedding_stats, repo_root))
+    writer = threading.Thread(
+        target=run_stage, args=(writer_stage, failures, stop, to_write, writer_stats, manifest, replace,
+                                write_batch_size))
+    embedder.start()
+    writer.start()
+
+    counts = {'unchanged': 0, 'indexed': 0, 'failed': 0}
+
+    def collect(future):
+        path, content_hash, chunks, lengths, seconds = future.result()
+        conversion_stats.add(1, seconds)
+        if chunks is None:
+            if content_hash is None:
+                # not recorded, so the file is retried on the next run, its previous rows are kept until then
+                counts['failed'] += 1
+            else:
+                # touched but unchanged content, only update size and mtime
+                counts['unchanged'] += 1
+                manifest.set(path, file_entry(Path(path), content_hash))
+            return
+        counts['indexed'] += 1
+        print(f"Chunked {path} into {len(chunks)} chunks")
+        # blocks while the embedding stage is behind, which throttles discovery
+        put_item(to_embed, (path, file_entry(Path(path), content_hash), chunks, lengths), stop)
+
+    seen = set()
+    try:
+        # spawn instead of fork, the parent process holds torch and model threads
+        with ProcessPoolExecutor(max_workers=NUM_WORKERS, mp_context=mp.get_context("spawn")) as pool:
+            in_flight = set()
+            for input_path in discover_files(repo_root):
+                if stop.is_set():
+                    break
+                path = str(input_path)
+                seen.add(path)
+                entry = manifest.get(path)
+                try:
+                    stat = input_path.stat()
+                except OSError as e:
+                    # not recorded, the previous rows are kept and the file is retried on the next run
+                    print(f"Error processing {input_path}: {str(e)}")
+                    counts['failed'] += 1
+                    continue
+                if entry is not None and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+                    counts['unchanged'] += 1
+                    continue
+                if len(in_flight) >= MAX_PENDING_FILES:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                in_flight.add(pool.submit(convert_and_chunk, path, entry['hash'] if entry else None))
+            if stop.is_set():
+                for future in in_flight:
+                    future.cancel()
+            else:
+                for future in as_completed(in_flight):
+                    collect(future)
+    finally:
+        put_item(to_embed, _DONE, stop)
+        embedder.join()
+        writer.join()
+    if failures:
+        raise failures[0]
+
+    removed = [path for path in list(manifest.files) if path not in seen]
+    if removed:
+        print(f"Removing {len(removed)} deleted files from the index")
+        delete_rows(get_table(), removed)
+        for path in removed:
+            manifest.remove(path)
+    manifest.save()
+
+    wall_seconds = time.perf_counter() - wall_start
+    print(f"Indexed {counts['indexed']} files, {counts['unchanged']} unchanged, "
+          f"{len(removed)} removed, {counts['failed']} failed in {wall_seconds:.1f}s")
+    for stats in (conversion_stats, embedding_stats, writer_stats):
+        print(stats.report(wall_seconds))
+
+    if counts['indexed'] or removed:
+        print("Optimizing table...")
+        optimize_table()
+        print("Creating vector index...")
+        create_vector_index()
 
 
 if __name__ == "__main__":
-    build_index()
+    parser = argparse.ArgumentParser(description="Index the files of the repository.")
+    parser.add_argument("--full", action="store_true", help="delete the database and re-index all files")
+    parser.add_argument("--write-batch-size", type=int, default=WRITE_BATCH_SIZE,
+                        help="rows per write to the table")
+    args = parser.parse_args()
+    build_index(full=args.full, write_batch_size=args.write_batch_size)
@@ -0,0 +1,56 @@
+import re
+
+import build_index
+
+
+def whitespace_tokenizer(text, add_special_tokens=False, return_offsets_mapping=True):
+    """Tokenizer with one token per word, including the whitespace in front of it."""
+    return {'offset_mapping': [match.span() for match in re.finditer(r'\s*\S+', text)]}
+
+
+def trailing_whitespace_tokenizer(text, add_special_tokens=False, return_offsets_mapping=True):
+    """Tokenizer with one token per word, including the whitespace after it."""
+    return {'offset_mapping': [match.span() for match in re.finditer(r'\S+\s*', text)]}
+
+
+def split(text, max_tokens, tokenizer=whitespace_tokenizer):
+    previous = build_index.MAX_CHUNK_TOKENS
+    build_index.MAX_CHUNK_TOKENS = max_tokens
+    try:
+        return build_index.split_text(text, tokenizer=tokenizer)
+    finally:
+        build_index.MAX_CHUNK_TOKENS = previous
+
+
+def test_token_overlapping_the_cut_starts_next_chunk():
+    # the token '\n\nfive' overlaps the cut after the paragraph separator
+    text = "one two three four\n\nfive six seven eight"
+    spans, lengths = split(text, 6)
+
+    assert [text[start:end] for start, end in spans] == ["one two three four", "\n\nfive six seven eight"]
+    assert lengths == [4, 4]
+
+
+def test_token_ending_at_the_cut_stays_in_chunk():
+    # the token 'four. ' ends exactly at the cut after the sentence separator
+    text = "one two three four. five six seven eight"
+    spans, lengths = split(text, 6, trailing_whitespace_tokenizer)
+
+    assert [text[start:end] for start, end in spans] == ["one two three four. ", "five six seven eight"]
+    assert lengths == [4, 4]
+
+
+def test_chunks_cover_the_text():
+    text = " ".join(f"word{i}." if i % 7 == 6 else f"word{i}" for i in range(200))
+    spans, lengths = split(text, 16)
+
+    assert "".join(text[start:end] for start, end in spans).split() == text.split()
+    assert all(0 < length <= 16 for length in lengths)
+    assert sum(lengths) == len(whitespace_tokenizer(text)['offset_mapping'])
+
+
+if __name__ == "__main__":
+    test_token_overlapping_the_cut_starts_next_chunk()
+    test_token_ending_at_the_cut_stays_in_chunk()
+    test_chunks_cover_the_text()
+    print("All split_text tests passed")
@@ -1,14 +1,21 @@
+import atexit
 import torch
 from lancedb.pydantic import LanceModel, Vector
 import lancedb
+import numpy as np
+import pyarrow as pa
 from pathlib import Path
 from sentence_transformers import SentenceTransformer
 from typing import Optional
-import uuid  # Add this import at the top
+from lexio.ids import chunk_ids
+from embedding_cache import CHUNK_CACHE_DIR, QUERY_CACHE_DIR, EmbeddingCache
 
 # Initialize the embedding model
+EMBEDDING_MODEL = 'jinaai/jina-embeddings-v3'
 _model = None
+_tokenizer = None
 EMBEDDING_DIM = 1024  # jina-embeddings-v3 dimension
+_caches = {}
 
 # Global database connection
 _db = None
@@ -57,61 +64,130 @@ def get_model():
     if _model is None:
         print("Creating model")
         device = "cuda" if torch.cuda.is_available() else "mps" if torch.backends.mps.is_available() else "cpu"
-        _model = SentenceTransformer('jinaai/jina-embeddings-v3', trust_remote_code=True, device=device)
+        _model = SentenceTransformer(EMBEDDING_MODEL, trust_remote_code=True, device=device)
     return _model
 
-def create_embeddings_batch(doc_path: Path, chunks):
+def get_tokenizer():
+    """Get the tokenizer of the embedding model, without loading the model itself (e.g. in worker processes)."""
+    global _tokenizer
+    if _tokenizer is None:
+        if _model is not None:
+            _tokenizer = _model.tokenizer
+        else:
+            from transformers import AutoTokenizer
+            _tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL, trust_remote_code=True)
+    return _tokenizer
+
+def get_embedding_cache(directory: Path = CHUNK_CACHE_DIR):
+    """Get or open the embedding cache in a directory, one directory per writing process."""
+    if directory not in _caches:
+        _caches[directory] = cache = EmbeddingCache(directory, EMBEDDING_MODEL, EMBEDDING_DIM)
+        atexit.register(cache.flush)
+    return _caches[directory]
+
+def embed_query(query: str):
+    """Embed a search query, repeated queries are served from the query cache."""
+    return get_embedding_cache(QUERY_CACHE_DIR).encode(get_model(), [query])[0]
+
+def build_columns(doc_path: Path, root: Path, chunks, embeddings):
     """
-    Create embeddings batch from a list of chunks.
-    
-    Args:
-        doc_path: Path to the original document
-        chunks: List of dicts containing:
-            - text: str
-            - page_number: Optional[int]
-            - bbox: Optional[dict] with l, t, r, b keys
-    
-    Returns:
-        List of DocumentChunkEmbedding objects ready for database insertion
+    Create the column values of the rows of a document from its chunks and their embeddings.
+
+    The chunk IDs hash the POSIX path of the document relative to `root`, so they
+    do not depend on where the repository is checked out or on the platform.
+
+    Returns a dict with a list of values per column and the embeddings as a float32 matrix.
     """
     texts = [chunk['text'] for chunk in chunks]
-    embeddings = get_model().encode(texts)
-    
-    embeddings_batch = []
-    for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-        # Safely get bbox values with defaults
-        bbox = chunk.get('bbox') or {}
-        
-        # Create a unique ID using UUID
-        chunk_id = str(uuid.uuid4())
-        
-        embedding_obj = DocumentChunkEmbedding(
-            id=chunk_id,
-            doc_path=str(doc_path),
-            doc_type=doc_path.suffix[1:] if doc_path.suffix else 'txt',
-            chunk_index=idx,
-            text=chunk['text'],
-            embedding=embedding,
-            page_number=chunk.get('page_number'),
-            bbox_left=bbox.get('l') if bbox else None,
-            bbox_top=bbox.get('t') if bbox else None,
-            bbox_right=bbox.get('r') if bbox else None,
-            bbox_bottom=bbox.get('b') if bbox else None
-        )
-        embeddings_batch.append(embedding_obj)
-    
-    return embeddings_batch
+    # Safely get bbox values with defaults
+    bboxes = [chunk.get('bbox') or {} for chunk in chunks]
+    columns = {
+        'id': chunk_ids(doc_path.relative_to(root).as_posix(), texts),
+        'doc_path': [str(doc_path)] * len(chunks),
+        'doc_type': [doc_path.suffix[1:] if doc_path.suffix else 'txt'] * len(chunks),
+        'chunk_index': list(range(len(chunks))),
+        'text': texts,
+        'page_number': [chunk.get('page_number') for chunk in chunks],
+        'bbox_left': [bbox.get('l') for bbox in bboxes],
+        'bbox_top': [bbox.get('t') for bbox in bboxes],
+        'bbox_right': [bbox.get('r') for bbox in bboxes],
+        'bbox_bottom': [bbox.get('b') for bbox in bboxes],
+    }
+    return columns, np.asarray(embeddings, dtype=np.float32).reshape(len(chunks), EMBEDDING_DIM)
+
+def to_record_batch(columns, embeddings):
+    """
+    Build a RecordBatch with the schema of DocumentChunkEmbedding from column lists and an embedding matrix.
+    """
+    schema = DocumentChunkEmbedding.to_arrow_schema()
+    arrays = []
+    for field in schema:
+        if field.name == 'embedding':
+            # a view of the matrix, the vectors are not converted one by one
+            values = pa.array(np.ascontiguousarray(embeddings, dtype=np.float32).reshape(-1))
+            arrays.append(pa.FixedSizeListArray.from_arrays(values, EMBEDDING_DIM).cast(field.type))
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def optimize_table(table_name: str = "docstore"):
+    """Compact the small fragments left by appends and deletes and remove old versions."""
+    table = get_table(table_name)
+    try:
+        if hasattr(table, "optimize"):
+            table.optimize()
+        else:
+            # lancedb before 0.13
+            table.compact_files()
+            table.cleanup_old_versions()
+        print("Table optimized")
+    except Exception as e:
+        print(f"Error optimizing table: {e}")
+
+# Tables with fewer rows are searched exactly, a scan is fast enough and an index would lose recall
+FLAT_SEARCH_MAX_ROWS = 100_000
+# IVF k-means needs enough rows per partition to train
+MIN_ROWS_PER_PARTITION = 256
+MAX_PARTITIONS = 65536
+
+def plan_vector_index(num_rows: int, dim: int = EMBEDDING_DIM):
+    """
+    Choose the vector index for a table of num_rows vectors of dim dimensions.
+
+    Returns None for flat (exact) search, otherwise the keyword arguments of
+    table.create_index: IVF_PQ with about sqrt(num_rows) partitions, and sub-vectors
+    of 16 dimensions (8 for small dimensions), or IVF_FLAT if dim cannot be split evenly.
+    """
+    if num_rows < FLAT_SEARCH_MAX_ROWS:
+        return None
+    num_partitions = int(round(num_rows ** 0.5))
+    num_partitions = max(1, min(num_partitions, num_rows // MIN_ROWS_PER_PARTITION, MAX_PARTITIONS))
+    sub_vector_dim = 16 if dim >= 512 else 8
+    if dim % sub_vector_dim:
+        return {'index_type': 'IVF_FLAT', 'num_partitions': num_partitions}
+    return {'index_type': 'IVF_PQ', 'num_partitions': num_partitions, 'num_sub_vectors': dim // sub_vector_dim}
+
+def drop_vector_index(table):
+    """Drop the vector indices of the embedding column, e.g. after the table shrank below FLAT_SEARCH_MAX_ROWS."""
+    try:
+        for index in table.list_indices():
+            if "embedding" in index.columns:
+                table.drop_index(index.name)
+                print(f"Dropped vector index {index.name}")
+    except Exception as e:
+        print(f"Error dropping index: {e}")
 
 def create_vector_index(table_name: str = "docstore"):
-    """Create a vector index for the embeddings if it doesn't exist."""
+    """Create (or replace) the vector index chosen by plan_vector_index for the current size of the table."""
     table = get_table(table_name)
+    num_rows = table.count_rows()
+    plan = plan_vector_index(num_rows)
+    if plan is None:
+        print(f"{num_rows} rows, using flat search without a vector index")
+        drop_vector_index(table)
+        return
     try:
-        table.create_index(
-            vector_column_name="embedding",
-            index_type="IVF_PQ",  # Specify the index type
-            num_partitions=256,   # Number of partitions
-            num_sub_vectors=64    # Number of sub-vectors
-        )
-        print("Vector index created successfully")
+        table.create_index(vector_column_name="embedding", replace=True, **plan)
+        print(f"Vector index created successfully for {num_rows} rows: {plan}")
     except Exception as e:
-        print(f"Error creating index: {e}")
\ No newline at end of file
+        print(f"Error creating index: {e}")
@@ -0,0 +1,179 @@
+"""
+Persistent on-disk cache of embeddings, shared by build_index.py and the query path.
+
+Embeddings are stored as rows of a memory-mapped float16 matrix with a parallel
+matrix of keys. A key is the hash of the model name, the dimension and the text
+with normalized whitespace, so copies of a file and unchanged chunks of a rebuilt
+index are not encoded again. Rows are appended in a ring: once max_entries rows are
+used, the oldest rows are overwritten. The number of written rows is kept in a small
+JSON file, rows written after it was last saved are ignored after a crash.
+
+Writes go to the shared memory maps and are synced to disk every FLUSH_ROWS rows and
+on flush(), not on every store, so single query embeddings do not pay a file sync.
+
+A cache directory must only be written by one process at a time, which is why the
+indexer and the server use separate directories (see CHUNK_CACHE_DIR and QUERY_CACHE_DIR).
+"""
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+
+CACHE_ROOT = Path("./.embedding_cache")
+CHUNK_CACHE_DIR = CACHE_ROOT / "chunks"
+QUERY_CACHE_DIR = CACHE_ROOT / "queries"
+MAX_ENTRIES = 500_000  # about 1 GB for 1024 dimensions
+KEY_SIZE = 16
+FLUSH_ROWS = 1024  # rows stored between syncs to disk
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """
+    Embeddings of texts for one model, stored in `directory`.
+
+    The files are created sparse with room for max_entries rows. A cache created for
+    another model, dimension or size is cleared.
+    """
+
+    def __init__(self, directory: Path, model_name: str, dim: int, max_entries: int = MAX_ENTRIES):
+        self.directory = Path(directory)
+        self.model_name = model_name
+        self.dim = dim
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._meta_path = self.directory / "meta.json"
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        meta = self._load_meta()
+        expected = {'model': model_name, 'dim': dim, 'max_entries': max_entries}
+        fresh = meta is None or any(meta.get(key) != value for key, value in expected.items())
+        mode = 'w+' if fresh else 'r+'
+        self._vectors = np.memmap(self.directory / "vectors.f16", dtype=np.float16, mode=mode, shape=(max_entries, dim))
+        self._keys = np.memmap(self.directory / "keys.bin", dtype=np.uint8, mode=mode, shape=(max_entries, KEY_SIZE))
+        # total number of rows written, the next row is written at written % max_entries
+        self._written = 0 if fresh else meta['written']
+        self._unflushed = 0
+        if fresh:
+            self._save_meta()
+
+        used = min(self._written, max_entries)
+        keys = self._keys[:used].view(np.dtype((np.void, KEY_SIZE))).ravel().tolist()
+        self._index = {key: row for row, key in enumerate(keys) if any(key)}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _load_meta(self):
+        try:
+            return json.loads(self._meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _save_meta(self):
+        meta = {
+            'version': 1, 'model': self.model_name, 'dim': self.dim,
+            'max_entries': self.max_entries, 'written': self._written,
+        }
+        tmp_path = self._meta_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, self._meta_path)
+
+    def key(self, text: str) -> bytes:
+        digest = hashlib.blake2b(digest_size=KEY_SIZE)
+        digest.update(f"{self.model_name}\0{self.dim}\0{normalize_text(text)}".encode('utf-8'))
+        return digest.digest()
+
+    def lookup(self, texts):
+        """
+        Look up the embeddings of texts.
+
+        Returns a float32 matrix with a row per text, rows of texts not in the cache are
+        zero, and the indices of those texts.
+        """
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        found = []
+        rows = []
+        missing = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                row = self._index.get(self.key(text))
+                if row is None:
+                    missing.append(i)
+                else:
+                    found.append(i)
+                    rows.append(row)
+            if rows:
+                embeddings[found] = self._vectors[rows]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        return embeddings, missing
+
+    def store(self, texts, embeddings):
+        """
+        Add the embeddings of texts, overwriting the oldest rows once the cache is full.
+
+        Texts with the same key get a single row with the last of their embeddings.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(texts), self.dim)
+        with self._lock:
+            # key -> position of its last text
+            positions = {}
+            for i, text in enumerate(texts):
+                positions[self.key(text)] = i
+            keys = list(positions)
+            if len(keys) < len(texts):
+                embeddings = embeddings[list(positions.values())]
+            rows = []
+            for key in keys:
+                row = self._written % self.max_entries
+                if self._written >= self.max_entries:
+                    old_key = self._keys[row].tobytes()
+                    if self._index.get(old_key) == row:
+                        del self._index[old_key]
+                rows.append(row)
+                self._written += 1
+            # invalidate the rows before writing them, so a crash never pairs a key with another vector
+            self._keys[rows] = 0
+            self._vectors[rows] = embeddings
+            self._keys[rows] = np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(len(keys), KEY_SIZE)
+            for key, row in zip(keys, rows):
+                self._index[key] = row
+            self._unflushed += len(rows)
+            if self._unflushed >= FLUSH_ROWS:
+                self._flush()
+
+    def flush(self):
+        """
+        Sync the stored rows to disk and record them in the meta file.
+        """
+        with self._lock:
+            if self._unflushed:
+                self._flush()
+
+    def _flush(self):
+        self._vectors.flush()
+        self._keys.flush()
+        self._save_meta()
+        self._unflushed = 0
+
+    def encode(self, model, texts, **kwargs):
+        """
+        Embeddings of texts as a float32 matrix, only texts not in the cache are encoded with the model.
+        """
+        embeddings, missing = self.lookup(texts)
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            encoded = model.encode(missing_texts, **kwargs)
+            embeddings[missing] = encoded
+            self.store(missing_texts, encoded)
+        return embeddings
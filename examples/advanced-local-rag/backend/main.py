@@ -1,18 +1,33 @@
 import asyncio
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional, AsyncIterable
 import db_utils
-from transformers import AutoModelForCausalLM, AutoTokenizer, TextIteratorStreamer
+from transformers import AutoModelForCausalLM, AutoTokenizer, TextIteratorStreamer, StoppingCriteria, StoppingCriteriaList
 import torch
-from threading import Thread
+from threading import Event, Lock, Thread
 from sse_starlette import EventSourceResponse
 import json
 import time  # Add this import at the top
 import os
 from fastapi.responses import FileResponse
 from fastapi import HTTPException
+from lexio.citations import CitationExtractor, attach_citations
+from lexio.instrumentation import (
+    HIGHLIGHT_BUILDING,
+    METRICS_CONTENT_TYPE,
+    PROMPT_ASSEMBLY,
+    QUERY_EMBEDDING,
+    VECTOR_SEARCH,
+    render_metrics,
+    request_start,
+    stage_timer,
+    track_tokens,
+)
+from lexio.registry import SourceRegistry
+from lexio.sse import encode_chunk
+from lexio.streaming import coalesce_tokens, iterate_in_thread
 
 app = FastAPI()
 
@@ -44,12 +59,40 @@ class Message(BaseModel):
 class QueryRequest(BaseModel):
     query: str
 
-def generate_stream(messages: List[Message], context: str = "") -> TextIteratorStreamer:
+MAX_NEW_TOKENS = 1024
+
+# Counters for generations stopped because the client went away
+generation_stats = {
+    "cancelled_generations": 0,
+    # tokens not generated because of the cancellation, an upper bound since the
+    # model might have stopped earlier on its own
+    "reclaimed_tokens": 0,
+}
+_generation_stats_lock = Lock()
+
+
+class CancelOnEvent(StoppingCriteria):
     """
-    Create a TextIteratorStreamer, start model.generate() in a separate thread,
-    and immediately return the streamer so we can iterate over tokens in real time.
+    Stops model.generate() as soon as the cancel event is set.
+
+    Called once per generation step, so it also counts the generated tokens.
+    """
+
+    def __init__(self, cancel: Event):
+        self.cancel = cancel
+        self.steps = 0
+        self.cancelled = False
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        self.steps += 1
+        self.cancelled = self.cancel.is_set()
+        return torch.full((input_ids.shape[0],), self.cancelled, dtype=torch.bool, device=input_ids.device)
+
+
+def _build_inputs(messages: List[Message], context: str = "") -> torch.Tensor:
+    """
+    Format the chat messages and the retrieved context into the tokenized model input.
     """
-    # 1) Prepare input text
     formatted_messages = [{"role": msg.role, "content": msg.content} for msg in messages]
     if context:
         last_user_msg = formatted_messages[-1]["content"]
@@ -67,6 +110,19 @@ Please answer the query based on the reference documents above."""
     
     input_text = tokenizer.apply_chat_template(formatted_messages, tokenize=False)
     inputs = tokenizer.encode(input_text, return_tensors="pt").to(device)
+    return inputs
+
+
+def generate_stream(messages: List[Message], context: str = "", cancel: Optional[Event] = None) -> TextIteratorStreamer:
+    """
+    Create a TextIteratorStreamer, start model.generate() in a separate thread,
+    and immediately return the streamer so we can iterate over tokens in real time.
+
+    Setting the `cancel` event stops the generation after the current step.
+    """
+    # 1) Prepare input text
+    with stage_timer(PROMPT_ASSEMBLY):
+        inputs = _build_inputs(messages, context)
 
     # 2) Create the streamer with skip_prompt and skip_special_tokens
     streamer = TextIteratorStreamer(
@@ -77,13 +133,17 @@ Please answer the query based on the reference documents above."""
     )
 
     # 3) Define a thread function that does generation
+    cancel = cancel or Event()
+    stop_on_cancel = CancelOnEvent(cancel)
+
     def run_generation():
         try:
             with torch.no_grad():
                 model.generate(
                     inputs=inputs,
                     streamer=streamer,
-                    max_new_tokens=1024,
+                    max_new_tokens=MAX_NEW_TOKENS,
+                    stopping_criteria=StoppingCriteriaList([stop_on_cancel]),
                     do_sample=False,
                     top_p=None,
                     top_k=None,
@@ -92,6 +152,12 @@ Please answer the query based on the reference documents above."""
         finally:
             # Ensure streamer is properly ended even if generation fails
             streamer.end()
+            if stop_on_cancel.cancelled:
+                reclaimed = max(MAX_NEW_TOKENS - stop_on_cancel.steps, 0)
+                with _generation_stats_lock:
+                    generation_stats["cancelled_generations"] += 1
+                    generation_stats["reclaimed_tokens"] += reclaimed
+                print(f"Generation cancelled after {stop_on_cancel.steps} tokens, reclaimed up to {reclaimed} tokens")
 
     # 4) Start generation in a background thread
     thread = Thread(target=run_generation)
@@ -140,12 +206,46 @@ async def get_pdf(id: str):
             filename=os.path.basename(doc_path)
         )
 
+def chunk_highlight(sources: List[dict]):
+    """
+    Source highlight for the citations: the bounding box of the cited chunk.
+    """
+    def highlight(index: int, start: int, end: int) -> Optional[dict]:
+        highlights = sources[index].get("highlights")
+        if not highlights:
+            return None
+        page, bbox = highlights[0]["page"], highlights[0]["bbox"]
+        return {
+            "page": page,
+            "rect": {"top": bbox["t"], "left": bbox["l"], "width": bbox["r"] - bbox["l"], "height": bbox["b"] - bbox["t"]},
+        }
+    return highlight
+
 class ChatRequest(BaseModel):
     messages: List[Message]
     source_ids: Optional[List[str]] = None
+    session_id: Optional[str] = None
+
+# Sources already sent per conversation, repeats are only sent as {"id", "score"} references
+source_registry = SourceRegistry(max_sessions=1000, max_sources_per_session=200, reference_fields=("score",))
+
+@app.get("/api/generation-stats")
+async def get_generation_stats():
+    """
+    Counters for generations that were stopped because the client disconnected.
+    """
+    with _generation_stats_lock:
+        return dict(generation_stats)
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Stage latencies in the Prometheus text format, empty unless LEXIO_METRICS=1.
+    """
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
 
 @app.post("/api/chat")
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, http_request: Request):
     """
     Unified SSE endpoint that handles both initial queries and follow-ups:
       - messages: list of chat messages (required)
@@ -153,8 +253,12 @@ async def chat_endpoint(request: ChatRequest):
         If source_ids are provided, those specific sources will be used as context
         If no source_ids are provided, the system will automatically retrieve relevant sources
         based on the latest user query
+      - session_id: optional id of the conversation
+        Sources already sent in the session are only sent as references with their id and score,
+        and source_ids sent in the session are resolved without querying the database
     """
     print("Request received:", request)
+    start = request_start()
     try:
         messages_list = request.messages
         print(f"Chat history length: {len(messages_list)}")
@@ -167,72 +271,93 @@ async def chat_endpoint(request: ChatRequest):
         latest_query = next((msg.content for msg in reversed(messages_list) if msg.role == "user"), None)
         
         table = db_utils.get_table()
+        known_sources = []
         
         if request.source_ids:
             # Use specified sources if provided
             print(f"Using provided source IDs: {request.source_ids}")
-            source_ids_str = "('" + "','".join(request.source_ids) + "')"
-            results = table.search().where(f"id in {source_ids_str}", prefilter=True).to_list()
+            missing_ids = request.source_ids
+            if request.session_id:
+                known_sources, missing_ids = source_registry.resolve(request.session_id, request.source_ids)
+            results = []
+            if missing_ids:
+                source_ids_str = "('" + "','".join(missing_ids) + "')"
+                results = table.search().where(f"id in {source_ids_str}", prefilter=True).to_list()
         else:
             # Otherwise perform semantic search based on the latest query
             print(f"Performing semantic search for: {latest_query}")
-            query_embedding = db_utils.get_model().encode(latest_query)
-            results = (
-                table.search(query=query_embedding, vector_column_name="embedding")
-                     .limit(5)
-                     .to_list()
-            )
+            with stage_timer(QUERY_EMBEDDING):
+                query_embedding = db_utils.embed_query(latest_query)
+            with stage_timer(VECTOR_SEARCH):
+                results = (
+                    table.search(query=query_embedding, vector_column_name="embedding")
+                         .limit(5)
+                         .to_list()
+                )
         
         # Process results into sources and context
-        sources = [
-            {
-                "doc_path": r["doc_path"],
-                "page": r["page_number"],
-                "text": r["text"],
-                "id": r["id"],
-                "highlights": [{
+        with stage_timer(HIGHLIGHT_BUILDING):
+            sources = known_sources + [
+                {
+                    "doc_path": r["doc_path"],
                     "page": r["page_number"],
-                    "bbox": {
-                        "l": r["bbox_left"],
-                        "t": r["bbox_top"],
-                        "r": r["bbox_right"],
-                        "b": r["bbox_bottom"]
-                    }
-                }] if all(r.get(k) is not None for k in ["page_number", "bbox_left", "bbox_top", "bbox_right", "bbox_bottom"]) else None,
-                "score": float(r.score) if hasattr(r, "score") else None
-            }
-            for r in results
-        ]
+                    "text": r["text"],
+                    "id": r["id"],
+                    "highlights": [{
+                        "page": r["page_number"],
+                        "bbox": {
+                            "l": r["bbox_left"],
+                            "t": r["bbox_top"],
+                            "r": r["bbox_right"],
+                            "b": r["bbox_bottom"]
+                        }
+                    }] if all(r.get(k) is not None for k in ["page_number", "bbox_left", "bbox_top", "bbox_right", "bbox_bottom"]) else None,
+                    "score": float(r.score) if hasattr(r, "score") else None
+                }
+                for r in results
+            ]
         
         context_str = "\n\n".join([
-            f"[Document: {r['doc_path']}]\n{r['text']}"
-            for r in results
+            f"[Document: {s['doc_path']}]\n{s['text']}"
+            for s in sources
         ])
 
         # 2) Build async generator for SSE
         async def event_generator():
+            # Set when the client goes away, which stops model.generate() in the generation thread
+            cancel = Event()
             try:
                 # First yield the sources if we have any
                 if sources:
-                    yield {"data": json.dumps({"sources": sources})}
+                    if request.session_id:
+                        sources_to_send = source_registry.register(request.session_id, sources)
+                    else:
+                        sources_to_send = sources
+                    yield {"data": json.dumps({"sources": sources_to_send})}
 
                 # Create the streamer & generate tokens
-                streamer = generate_stream(messages_list, context_str)
-
-                for token in streamer:
-                    if token:
-                        try:
-                            data = json.dumps({"content": token, "done": False})
-                            yield {"data": data}
-                            await asyncio.sleep(0)
-                        except Exception as e:
-                            print(f"Error during token streaming: {str(e)}")
-                            continue
-
-                yield {"data": json.dumps({"content": "", "done": True})}
+                streamer = generate_stream(messages_list, context_str, cancel)
+                # match the answer against the source texts while it streams, citations
+                # refer to the sources by their index in the sources frame
+                extractor = CitationExtractor([s["text"] for s in sources], source_highlight=chunk_highlight(sources))
+
+                # read the blocking streamer in a worker thread and send the tokens of
+                # a short time window as one frame; the last frame carries done=True.
+                # time-to-first-token is measured from the start of the request
+                chunks = coalesce_tokens(track_tokens(iterate_in_thread(streamer), start))
+                async for chunk in attach_citations(chunks, extractor):
+                    if await http_request.is_disconnected():
+                        print("Client disconnected, stopping generation")
+                        break
+                    # pre-encoded SSE frames are passed through by EventSourceResponse as-is
+                    yield encode_chunk(chunk)
             except Exception as e:
                 print(f"Error in event generator: {str(e)}")
                 yield {"data": json.dumps({"error": str(e)})}
+            finally:
+                # EventSourceResponse cancels or closes this generator on disconnect, which
+                # also ends up here; after a complete generation this is a no-op
+                cancel.set()
 
         return EventSourceResponse(event_generator())
 
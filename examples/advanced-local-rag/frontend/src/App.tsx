@@ -1,4 +1,4 @@
-import { useCallback, useMemo } from 'react';
+import { useCallback, useMemo, useRef } from 'react';
 import {
     ChatWindow,
     LexioProvider,
@@ -15,7 +15,42 @@ import {
 } from 'lexio';
 import './App.css';
 
+// Lexio source of a source sent by the backend, the id of the chunk is the id of the source
+function toSource(item: any) {
+    return {
+        id: item.id,
+        title: item.doc_path.split('/').pop() || '',
+        type: item.doc_path.endsWith('.pdf') ? 'pdf'
+            : item.doc_path.endsWith('.html') ? 'html'
+                : item.doc_path.endsWith('.md') ? 'markdown'
+                    : 'text',
+        relevance: item.score || 0,
+        metadata: {
+            page: item.page || undefined,
+            id: item.id || undefined,
+        },
+        content: item.text,
+        highlights: item.highlights
+            ? item.highlights.map((highlight: any) => ({
+                page: highlight.page,
+                rect: highlight.bbox
+                    ? {
+                        top: highlight.bbox.t,
+                        left: highlight.bbox.l,
+                        width: highlight.bbox.r - highlight.bbox.l,
+                        height: highlight.bbox.b - highlight.bbox.t,
+                    }
+                    : undefined,
+            }))
+            : undefined,
+    };
+}
+
 function App() {
+    // The backend sends sources it already sent in this session only as { id, score } references
+    const sessionId = useMemo(() => crypto.randomUUID(), []);
+    const receivedSources = useRef(new Map<string, any>());
+    const answerSourceIds = useRef<string[]>([]);
 
     const chatConnectorOptions = useMemo(() => ({
         endpoint: 'http://localhost:8000/api/chat',
@@ -28,8 +63,9 @@ function App() {
                     content: m.content
                 })),
                 source_ids: metadata?.useExistingSources 
-                    ? sources.map(s => s.metadata?.id).filter(Boolean)
-                    : undefined
+                    ? sources.map(s => s.metadata?.id ?? s.id)
+                    : undefined,
+                session_id: sessionId,
             };
             
             console.log('Request body being sent to backend:', requestBody);
@@ -37,40 +73,44 @@ function App() {
         },
         parseEvent: (data: any) => {
             if (Array.isArray(data.sources)) {
-                const sources = data.sources.map((item: any) => ({
-                    title: item.doc_path.split('/').pop() || '',
-                    type: item.doc_path.endsWith('.pdf') ? 'pdf'
-                        : item.doc_path.endsWith('.html') ? 'html'
-                            : item.doc_path.endsWith('.md') ? 'markdown'
-                                : 'text',
-                    relevance: item.score || 0,
-                    metadata: {
-                        page: item.page || undefined,
-                        id: item.id || undefined,
-                    },
-                    content: item.text,
-                    highlights: item.highlights
-                        ? item.highlights.map((highlight: any) => ({
-                            page: highlight.page,
-                            rect: highlight.bbox
-                                ? {
-                                    top: highlight.bbox.t,
-                                    left: highlight.bbox.l,
-                                    width: highlight.bbox.r - highlight.bbox.l,
-                                    height: highlight.bbox.b - highlight.bbox.t,
-                                }
-                                : undefined,
-                        }))
-                        : undefined,
-                }));
+                // the ids of the sources of this answer, in the order the citations refer to them
+                answerSourceIds.current = data.sources.map((item: any) => item.id);
+                const sources = data.sources.map((item: any) => {
+                    if (item.doc_path !== undefined) {
+                        receivedSources.current.set(item.id, item);
+                        return toSource(item);
+                    }
+                    // a reference, resolve it from the sources received before
+                    const known = receivedSources.current.get(item.id);
+                    if (known) {
+                        return toSource({ ...known, ...item });
+                    }
+                    // keep the position of a reference that cannot be resolved
+                    return {
+                        id: item.id,
+                        title: 'Unavailable source',
+                        type: 'text',
+                        relevance: item.score || 0,
+                        metadata: { id: item.id },
+                    };
+                });
                 return { sources, done: false };
             }
             return {
                 content: data.content,
+                // citations refer to the sources frame of this answer by index, key them by the source id instead
+                citations: Array.isArray(data.citations)
+                    ? data.citations
+                        .map(({ sourceIndex, ...citation }: any) => ({
+                            ...citation,
+                            sourceId: answerSourceIds.current[sourceIndex],
+                        }))
+                        .filter((citation: any) => citation.sourceId !== undefined)
+                    : undefined,
                 done: !!data.done,
             };
         },
-    }), []);
+    }), [sessionId]);
     // Combine both connectors into a single unified connector
     const chatConnector = createSSEConnector(chatConnectorOptions);
 
@@ -104,7 +144,7 @@ function App() {
             
             // When using existing sources, set mode to 'text' to prevent sources update
             // When not using existing sources, use 'both' to get new sources
-            const { response, sources: newSources } = chatConnector({
+            const { response, sources: newSources, citations } = chatConnector({
                 messages: newMessages,
                 sources: activeSources,
                 mode: useExistingSources ? 'text' : 'both',
@@ -116,7 +156,8 @@ function App() {
             // Only return new sources if we're not using existing ones
             return { 
                 response, 
-                sources: useExistingSources ? undefined : newSources 
+                sources: useExistingSources ? undefined : newSources,
+                citations,
             };
         } else if (action.type === 'SET_SELECTED_SOURCE') {
             if (!action.sourceObject?.metadata?.id) {
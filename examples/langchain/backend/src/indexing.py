@@ -1,8 +1,9 @@
 import os
 import json
 import hashlib
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 import fitz
 from dotenv import load_dotenv
@@ -12,15 +13,35 @@ from langchain_community.document_loaders import PyPDFLoader
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.documents import Document
+from lexio.word_index import WordIndex
 from src.utils import PositionalMetadata
 
 DATA_DIR = Path("data")
 DB_DIR = Path(".chroma")
 
 
+@lru_cache(maxsize=4)
+def get_word_index(source: str) -> Tuple[WordIndex, Dict[int, Tuple[float, float]]]:
+    """
+    Build the word index of a PDF once for all of its chunks.
+
+    Args:
+        source (str): Path of the PDF file.
+
+    Returns:
+        Tuple[WordIndex, Dict[int, Tuple[float, float]]]: The word index and the size of each (1-based) page.
+    """
+    with fitz.open(source) as doc:
+        page_sizes = {page.number + 1: (page.rect.width, page.rect.height) for page in doc}
+        index = WordIndex.from_pages(
+            (page.number + 1, page.rect.width, page.rect.height, page.get_text("words")) for page in doc
+        )
+    return index, page_sizes
+
+
 def get_bbox_of_text(document: Document) -> Document:
     """
-    Extracts bounding boxes of text spans from a given document page and adds
+    Extracts bounding boxes of the words of a chunk from its document page and adds
     this positional metadata to the document.
 
     Args:
@@ -29,19 +50,28 @@ def get_bbox_of_text(document: Document) -> Document:
     Returns:
         Document: The document object with added positional metadata in the 'text_bboxes' field.
     """
-    doc = fitz.open(document.metadata["source"])
-
-    spans = []
-    for block in doc[document.metadata["page"]].get_text("dict")["blocks"]:
-        if "lines" in block:
-            for line in block["lines"]:
-                for idx, span in enumerate(line["spans"]):
-                    span["idx"] = idx
-                    spans.append(span)
-
-    page_dim = doc[document.metadata["page"]].rect
-    hits = [PositionalMetadata(**span, width=page_dim.width, height=page_dim.height).model_dump() for span in spans if
-            span["text"] in document.page_content]
+    index, page_sizes = get_word_index(document.metadata["source"])
+    page = document.metadata["page"] + 1
+    page_start, page_end = index.page_range(page)
+
+    # chunks are split from single pages, so the search is bounded to the page
+    found = index.locate(document.page_content, page_start, page_end)
+    if found is None:
+        return document
+
+    first, last = index.word_range(*found)
+    width, height = page_sizes[page]
+    hits = []
+    for i in range(first, last):
+        top, left, rect_width, rect_height = index.words.rects[i].tolist()
+        x0, y0, x1, y1 = left * width, top * height, (left + rect_width) * width, (top + rect_height) * height
+        hits.append(PositionalMetadata(
+            text=index.text[index.starts[i]:index.ends[i]],
+            origin=(x0, y1),
+            bbox=(x0, y0, x1, y1),
+            width=width,
+            height=height,
+        ).model_dump())
 
     if not hits:
         return document
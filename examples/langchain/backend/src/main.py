@@ -5,7 +5,7 @@ from typing import List, Optional, Any
 import uvicorn
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from langchain.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
@@ -16,9 +16,24 @@ import os.path
 
 # We import the necessary classes from lexio to interact with the frontend
 # todo
+from lexio.citations import CitationExtractor, attach_citations
+from lexio.instrumentation import (
+    HIGHLIGHT_BUILDING,
+    METRICS_CONTENT_TYPE,
+    PROMPT_ASSEMBLY,
+    QUERY_EMBEDDING,
+    VECTOR_SEARCH,
+    render_metrics,
+    request_start,
+    stage_timer,
+    track_tokens,
+)
+from lexio.sse import encode_chunk
+from lexio.streaming import coalesce_tokens
+from lexio.wire import MSGPACK_MEDIA_TYPE, encode_msgpack, negotiate
 
 from src.indexing import DocumentIndexer
-from src.utils import convert_bboxes_to_highlights
+from src.utils import convert_bboxes_to_highlights, highlight_of_span
 
 # Load environment variables
 load_dotenv()
@@ -97,41 +112,69 @@ class RequestBody(BaseModel):
     selectedSource: Optional[Source] = None
 
 
-@app.get("/search")
-async def on_message(query: str = Query(None, description="Search query string"), k: int = Query(5, ge=1, description="Number of sources to retrieve")):
-    if not query:
-        raise HTTPException(status_code=400, detail="No query string provided.")
+def retrieve(query: str, k: int):
+    """Search the vector store and convert the results to sources.
 
-    # Retrieve relevant documents
+    Args:
+        query: The search query
+        k: Number of documents to retrieve
+
+    Returns:
+        The sources and the retrieved documents
+    """
     retrieval_results = []
     retrieval_docs = []
     try:
-        results = db.similarity_search_with_score(query, k=k)
-        for doc, score in results:
-            metadata = doc.metadata
-            source = metadata.get("source", "unknown.pdf")
-            page = metadata.get("page", 0) + 1
-            highlights = convert_bboxes_to_highlights(page, metadata.get("text_bboxes", []))
-
-            result = Source(
-                title=source.replace("data/", "").split(".")[0],
-                description=doc.page_content,
-                type="pdf",
-                relevance=score,
-                metadata={
-                    "page": page,
-                    "file": source.replace("data/", ""),
-                    "_href": f"sources/{source.replace('data/', '')}"
-                },
-                highlights=[h.model_dump() for h in highlights]
-            )
-            retrieval_results.append(result)
-            retrieval_docs.append(doc)
+        # embed and search separately so that both stages are timed on their own
+        with stage_timer(QUERY_EMBEDDING):
+            query_embedding = db.embeddings.embed_query(query)
+        with stage_timer(VECTOR_SEARCH):
+            results = db.similarity_search_by_vector_with_relevance_scores(query_embedding, k=k)
+        with stage_timer(HIGHLIGHT_BUILDING):
+            for doc, score in results:
+                metadata = doc.metadata
+                source = metadata.get("source", "unknown.pdf")
+                page = metadata.get("page", 0) + 1
+                highlights = convert_bboxes_to_highlights(page, metadata.get("text_bboxes", []))
+
+                result = Source(
+                    title=source.replace("data/", "").split(".")[0],
+                    description=doc.page_content,
+                    type="pdf",
+                    relevance=score,
+                    metadata={
+                        "page": page,
+                        "file": source.replace("data/", ""),
+                        "_href": f"sources/{source.replace('data/', '')}"
+                    },
+                    highlights=[h.model_dump() for h in highlights]
+                )
+                retrieval_results.append(result)
+                retrieval_docs.append(doc)
 
     except Exception as e:
         print(f"Error in retrieve: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    return retrieval_results, retrieval_docs
+
+
+@app.get("/metrics")
+async def metrics():
+    """Stage latencies in the Prometheus text format, empty unless LEXIO_METRICS=1."""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/search")
+async def on_message(request: Request, query: str = Query(None, description="Search query string"), k: int = Query(5, ge=1, description="Number of sources to retrieve")):
+    if not query:
+        raise HTTPException(status_code=400, detail="No query string provided.")
 
+    # Retrieve relevant documents
+    retrieval_results, retrieval_docs = retrieve(query, k)
+
+    # JSON stays the default, clients can ask for the more compact MessagePack encoding
+    if negotiate(request.headers.get("accept")) == MSGPACK_MEDIA_TYPE:
+        return Response(encode_msgpack(retrieval_results), media_type=MSGPACK_MEDIA_TYPE)
     return retrieval_results
 
 
@@ -151,42 +194,17 @@ async def on_message(request: RequestBody) -> EventSourceResponse:
     selected_source = body.get("selectedSource")
 
     # Retrieve relevant documents
-    retrieval_results = []
-    retrieval_docs = []
-    try:
-        results = db.similarity_search_with_score(query, k=4)
-        for doc, score in results:
-            metadata = doc.metadata
-            source = metadata.get("source", "unknown.pdf")
-            page = metadata.get("page", 0) + 1
-            highlights = convert_bboxes_to_highlights(page, metadata.get("text_bboxes", []))
-
-            result = Source(
-                title=source.replace("data/", "").split(".")[0],
-                description=doc.page_content,
-                type="pdf",
-                relevance=score,
-                metadata={
-                    "page": page,
-                    "file": source.replace("data/", ""),
-                    "_href": f"sources/{source.replace('data/', '')}"
-                },
-                highlights=[h.model_dump() for h in highlights]
-            )
-            retrieval_results.append(result)
-            retrieval_docs.append(doc)
-
-    except Exception as e:
-        print(f"Error in retrieve: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    start = request_start()
+    retrieval_results, retrieval_docs = retrieve(query, 4)
 
     # Format the context and prompt
-    formatted_context = format_docs(retrieval_docs)
-    formatted_prompt = prompt.format(
-        context=formatted_context,
-        history="\n".join([f"{msg['role']}: {msg['content']}" for msg in message_history]),
-        input=query
-    )
+    with stage_timer(PROMPT_ASSEMBLY):
+        formatted_context = format_docs(retrieval_docs)
+        formatted_prompt = prompt.format(
+            context=formatted_context,
+            history="\n".join([f"{msg['role']}: {msg['content']}" for msg in message_history]),
+            input=query
+        )
 
     async def stream():
         # First yield the retrieval results
@@ -197,13 +215,32 @@ async def on_message(request: RequestBody) -> EventSourceResponse:
             })
         }
 
-        # Then stream the LLM response
-        async for chunk in llm.astream(formatted_prompt):
-            chunk_text = chunk.content if hasattr(chunk, 'content') else str(chunk)
-            yield {"data": json.dumps({"content": chunk_text, "done": False})}
+        async def tokens():
+            async for chunk in llm.astream(formatted_prompt):
+                yield chunk.content if hasattr(chunk, 'content') else str(chunk)
+
+        def cited_highlight(index: int, start_char: int, end_char: int):
+            doc = retrieval_docs[index]
+            return highlight_of_span(
+                doc.metadata.get("page", 0) + 1,
+                doc.page_content,
+                doc.metadata.get("text_bboxes", []),
+                start_char,
+                end_char,
+            )
 
-        # Signal completion
-        yield {"data": json.dumps({"content": "", "done": True})}
+        # Cite the sources (by their index in the first frame) as soon as the answer quotes them,
+        # pointing at the words of the cited text in the chunk
+        extractor = CitationExtractor(
+            [source.description for source in retrieval_results],
+            source_highlight=cited_highlight,
+        )
+
+        # Then stream the LLM response, sending the tokens of a short time window as one frame.
+        # The last frame signals completion with done=True.
+        # time-to-first-token is measured from the start of the request
+        async for chunk in attach_citations(coalesce_tokens(track_tokens(tokens(), start)), extractor):
+            yield encode_chunk(chunk)
 
     return EventSourceResponse(stream())
 
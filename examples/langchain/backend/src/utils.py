@@ -1,6 +1,8 @@
 import json
-from typing import Any
+import re
+from typing import Any, Optional
 from pydantic import BaseModel, Field
+from lexio.highlights import HighlightArray, coalesce_highlights
 
 SKIP_TEXT = ["", " ", "\n", "\t", ", ", ". ", ".", ",", "et al.", "et al. ", "₂", "₁", "₃"]
 
@@ -25,35 +27,64 @@ class PositionalMetadata(BaseModel):
     height: float
 
 
-def convert_bboxes_to_highlights(page: int, hits: list[dict[str, Any]]) -> list[Highlight]:
+def _parse_hits(hits: Any) -> list[dict[str, Any]]:
+    if isinstance(hits, str):
+        return [PositionalMetadata(**hit).model_dump() for hit in json.loads(hits)]
+    return hits
+
+
+def convert_bboxes_to_highlights(page: int, hits: list[dict[str, Any]], level: str = "line") -> list[Highlight]:
     """
     Convert a list of bbox dictionaries to a list of Highlight objects.
 
     Args:
         page (int): The page number where the hits are located.
         hits (list[dict[str, Any]]): A list of dictionaries containing bbox information.
+        level (str): "line" for one rect per line, "block" for one rect per block of lines.
 
     Returns:
-        list[Highlight]: A list of Highlight objects representing the hits.
+        list[Highlight]: A list of Highlight objects covering the hits, merged into one rect per line or block.
     """
-    highlights = []
-    if isinstance(hits, str):
-        parsed = json.loads(hits)
-        hits = [PositionalMetadata(**hit).model_dump() for hit in parsed]
-
-    for hit in hits:
-        if hit.get("text", "") in SKIP_TEXT:
-            continue
-
-        highlight = Highlight(
-            page=page,
-            rect=Rect(
-                left=hit["bbox"][0] / hit["width"],
-                top=hit["bbox"][1] / hit["height"],
-                width=(hit["bbox"][2] - hit["bbox"][0]) / hit["width"],
-                height=(hit["bbox"][3] - hit["bbox"][1]) / hit["height"],
-            )
-        )
-        highlights.append(highlight)
-
-    return highlights
\ No newline at end of file
+    hits = _parse_hits(hits)
+
+    hits = [hit for hit in hits if hit.get("text", "") not in SKIP_TEXT]
+    if not hits:
+        return []
+
+    # merge the per-span boxes into one rect per line (or block) to keep the payload small
+    spans = HighlightArray.from_bboxes(
+        page,
+        [hit["bbox"] for hit in hits],
+        [hit["width"] for hit in hits],
+        [hit["height"] for hit in hits],
+        validate=False,
+    )
+    merged = coalesce_highlights(spans, level=level)
+
+    return [
+        Highlight(page=page, rect=Rect(top=top, left=left, width=width, height=height))
+        for page, (top, left, width, height) in zip(merged.pages.tolist(), merged.rects.tolist())
+    ]
+
+
+def highlight_of_span(page: int, text: str, hits: list[dict[str, Any]], start: int, end: int) -> Optional[Highlight]:
+    """
+    The highlight around the words of a character range of a chunk.
+
+    Args:
+        page (int): The page of the chunk.
+        text (str): The text of the chunk.
+        hits (list[dict[str, Any]]): The boxes of the words of the chunk in reading order, see `get_bbox_of_text`.
+        start (int): Start of the range in `text`.
+        end (int): End of the range in `text`.
+
+    Returns:
+        Optional[Highlight]: The first block around the words of the range, None if they have no boxes.
+    """
+    hits = _parse_hits(hits)
+    # the boxes are those of the whitespace separated words of the chunk
+    words = [i for i, word in enumerate(re.finditer(r"\S+", text)) if word.start() < end and word.end() > start]
+    if not words:
+        return None
+    blocks = convert_bboxes_to_highlights(page, hits[words[0]:words[-1] + 1], level="block")
+    return blocks[0] if blocks else None
@@ -11,7 +11,7 @@ import {
 } from 'lexio';
 import LexioLogo from './assets/lexio.svg';
 import LexioIcon from './assets/icon.svg';
-import {ActionHandlerResponse, UserAction} from "lexio";
+import {ActionHandlerResponse, Citation, UserAction} from "lexio";
 
 // define the API base URL
 // @ts-ignore
@@ -41,11 +41,17 @@ const myOnActionFn = (action: UserAction, messages: Message[], sources: Source[]
         const sourcesPromise = new Promise<Source[]>(resolve => {
             sourcesResolve = resolve;
         });
+        // citations arrive with the content frames and are complete with the done frame
+        let citationsResolve: (citations: Omit<Citation, 'id'>[]) => void;
+        const citationsPromise = new Promise<Omit<Citation, 'id'>[]>(resolve => {
+            citationsResolve = resolve;
+        });
+        const citations: Omit<Citation, 'id'>[] = [];
 
         return {
             response: (async function* () {
                 const controller = new AbortController();
-                const queue: { content: any; done: any; }[] = [];
+                const queue: { content: any; citations?: Omit<Citation, 'id'>[]; done: any; }[] = [];
                 let resolver: ((value: unknown) => void) | null = null;
 
                 const waitForData = () => Promise.race([
@@ -75,8 +81,14 @@ const myOnActionFn = (action: UserAction, messages: Message[], sources: Source[]
                             if (data.sources) {
                                 sourcesResolve(data.sources);
                             }
+                            if (Array.isArray(data.citations)) {
+                                citations.push(...data.citations);
+                            }
+                            if (data.done) {
+                                citationsResolve(citations);
+                            }
                             if (data.content !== undefined) {
-                                queue.push({ content: data.content, done: data.done });
+                                queue.push({ content: data.content, citations: data.citations, done: data.done });
                                 // @ts-ignore
                                 if (resolver) resolver();
                             }
@@ -93,10 +105,12 @@ const myOnActionFn = (action: UserAction, messages: Message[], sources: Source[]
                     }
                 } catch (error) {
                     console.error('Streaming timeout:', error);
+                    citationsResolve(citations);
                     yield { content: '\n\nConnection timed out.', done: true };
                 }
             })(),
-            sources: sourcesPromise
+            sources: sourcesPromise,
+            citations: citationsPromise,
         };
     }
 
@@ -0,0 +1,77 @@
+import { describe, it, expect, vi } from 'vitest';
+import { renderHook } from '@testing-library/react';
+import { fetchEventSource } from '@microsoft/fetch-event-source';
+
+import { createSSEConnector } from './createSSEConnector';
+import type { StreamChunk } from '../types';
+
+vi.mock('@microsoft/fetch-event-source', () => ({
+  fetchEventSource: vi.fn(),
+}));
+
+const citation = {
+  sourceIndex: 0,
+  messageHighlight: { color: 'rgba(255, 235, 59, 0.3)', startChar: 0, endChar: 27 },
+  sourceHighlight: { page: 1, rect: { top: 0.1, left: 0.1, width: 0.5, height: 0.02 } },
+};
+
+// Replay the given SSE frames, then close the stream
+function mockStream(frames: any[]) {
+  vi.mocked(fetchEventSource).mockImplementation(async (_url, options: any) => {
+    for (const frame of frames) {
+      options.onmessage({ data: JSON.stringify(frame) });
+    }
+    options.onclose();
+  });
+}
+
+describe('createSSEConnector', () => {
+  it('passes citations from parseEvent to the stream chunks and the citations promise', async () => {
+    mockStream([
+      { sources: [{ title: 'Doc', type: 'text' }] },
+      { content: 'The quick brown fox jumps ' },
+      { content: 'over the lazy dog.', citations: [citation] },
+      { content: '', citations: [{ ...citation, sourceHighlight: undefined }], done: true },
+    ]);
+
+    const options = {
+      endpoint: '/api/chat',
+      parseEvent: (data: any) => ({
+        content: data.content,
+        sources: data.sources,
+        citations: data.citations,
+        done: !!data.done,
+      }),
+    };
+    const { result } = renderHook(() => createSSEConnector(options));
+    const { response, sources, citations } = result.current({ messages: [], sources: [] }) as any;
+
+    const chunks: StreamChunk[] = [];
+    for await (const chunk of response as AsyncIterable<StreamChunk>) {
+      chunks.push(chunk);
+    }
+
+    expect(chunks.map(chunk => chunk.content).join('')).toBe('The quick brown fox jumps over the lazy dog.');
+    expect(chunks[1].citations).toEqual([citation]);
+    expect(chunks[chunks.length - 1].done).toBe(true);
+    expect(await sources).toHaveLength(1);
+    expect(await citations).toEqual([citation, { ...citation, sourceHighlight: undefined }]);
+  });
+
+  it('resolves the citations promise with an empty list without citations', async () => {
+    mockStream([{ content: 'Hello', done: true }]);
+
+    const options = {
+      endpoint: '/api/chat',
+      parseEvent: (data: any) => ({ content: data.content, done: !!data.done }),
+    };
+    const { result } = renderHook(() => createSSEConnector(options));
+    const { response, citations } = result.current({ messages: [], sources: [], mode: 'text' }) as any;
+
+    for await (const _chunk of response as AsyncIterable<StreamChunk>) {
+      // drain the stream
+    }
+
+    expect(await citations).toEqual([]);
+  });
+});
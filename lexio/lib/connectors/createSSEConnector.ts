@@ -1,13 +1,13 @@
 import { useCallback } from 'react';
 import { fetchEventSource } from '@microsoft/fetch-event-source';
-import type { Message, Source, StreamChunk, MessageWithOptionalId } from '../types';
+import type { Citation, Message, Source, StreamChunk, MessageWithOptionalId } from '../types';
 
 
 /**
  * The connector options, including a parseEvent function (once).
- *  'text' => only text stream
+ *  'text' => only text stream (and citations promise)
  *  'sources' => only sources promise
- *  'both' => both text stream & sources promise
+ *  'both' => both text stream & sources promise (and citations promise)
  */
 export interface SSEConnectorOptions<TData = any> {
   endpoint: string;
@@ -15,11 +15,12 @@ export interface SSEConnectorOptions<TData = any> {
 
   /**
    * parseEvent is the single place to translate incoming SSE data
-   * into your text content, any sources, and a `done` signal.
+   * into your text content, any sources, citations, and a `done` signal.
    */
   parseEvent(data: TData): {
     content?: string;
     sources?: Source[];
+    citations?: Omit<Citation, 'id'>[];
     done?: boolean;
   };
 
@@ -54,9 +55,10 @@ export interface SSEConnectorRequest {
  * The returned function will:
  *   - Start the SSE using fetchEventSource
  *   - Return either:
- *       { response: AsyncIterable<StreamChunk> }            // if mode === 'text'
- *       { sources: Promise<Source[]> }                      // if mode === 'sources'
- *       { response: AsyncIterable<StreamChunk>, sources: Promise<Source[]> } // if 'both'
+ *       { response: AsyncIterable<StreamChunk>, citations }  // if mode === 'text'
+ *       { sources: Promise<Source[]> }                       // if mode === 'sources'
+ *       { response: AsyncIterable<StreamChunk>, sources: Promise<Source[]>, citations } // if 'both'
+ *   The citations promise resolves with all citations of the stream once it has ended.
  */
 export function createSSEConnector(options: SSEConnectorOptions) {
   return useCallback(
@@ -108,6 +110,13 @@ export function createSSEConnector(options: SSEConnectorOptions) {
         rejectSources = reject;
       });
 
+      // 4b) Citations are collected over the stream and resolved when it ends
+      const allCitations: Omit<Citation, 'id'>[] = [];
+      let resolveCitations!: (val: Omit<Citation, 'id'>[]) => void;
+      const citationsPromise = new Promise<Omit<Citation, 'id'>[]>((resolve) => {
+        resolveCitations = resolve;
+      });
+
       // 5) Start SSE in the background
       const sseTask = (async () => {
         try {
@@ -120,12 +129,18 @@ export function createSSEConnector(options: SSEConnectorOptions) {
               if (!ev.data) return; // skip pings or empty events
 
               try {
-                const { content, sources: newSources, done } = parseEvent(JSON.parse(ev.data));
+                const { content, sources: newSources, citations, done } = parseEvent(JSON.parse(ev.data));
+                const newCitations = Array.isArray(citations) && citations.length > 0 ? citations : undefined;
 
-                // a) Text (if mode includes it)
-                if ((mode === 'text' || mode === 'both') && content) {
-                  textQueue.push({ content, done: !!done });
-                  textNotify?.();
+                // a) Text and citations (if mode includes it)
+                if (mode === 'text' || mode === 'both') {
+                  if (newCitations) {
+                    allCitations.push(...newCitations);
+                  }
+                  if (content || newCitations) {
+                    textQueue.push({ content: content ?? '', citations: newCitations, done: !!done });
+                    textNotify?.();
+                  }
                 }
 
                 // b) Sources (if mode includes it)
@@ -177,6 +192,7 @@ export function createSSEConnector(options: SSEConnectorOptions) {
             sourcesResolved = true;
             resolveSources([...allSources]);
           }
+          resolveCitations([...allCitations]);
         }
       })();
 
@@ -211,7 +227,7 @@ export function createSSEConnector(options: SSEConnectorOptions) {
       // 7) Return shape based on mode
       if (mode === 'text') {
         // Only text stream
-        return { response: streamText() };
+        return { response: streamText(), citations: citationsPromise };
       } else if (mode === 'sources') {
         // Only sources
         return { sources: sourcesPromise };
@@ -220,6 +236,7 @@ export function createSSEConnector(options: SSEConnectorOptions) {
         return {
           response: streamText(),
           sources: sourcesPromise,
+          citations: citationsPromise,
         };
       }
     },
@@ -93,9 +93,9 @@ export const retrievedSourcesAtom = atom(
         return source;
       }
       
-      // Extract source highlights from citations
-      const sourceHighlights = sourceCitations.map(
-        citation => citation.sourceHighlight
+      // Extract source highlights from citations, citations without one only point at the source
+      const sourceHighlights = sourceCitations.flatMap(
+        citation => citation.sourceHighlight ? [citation.sourceHighlight] : []
       );
       
       // Return enhanced source with highlights from citations
@@ -734,7 +734,7 @@ const setSelectedSourceAtom = atom(null, async (get, set, { action, response }:
                     messageId: citation.messageId || lastMessageId // Use last message ID if not provided
                 };
                 
-                // All citations must have messageId, sourceId, and sourceHighlight
+                // All citations must have messageId and sourceId, sourceHighlight is optional
                 return {
                     id: baseCitation.id,
                     sourceId: baseCitation.sourceId,
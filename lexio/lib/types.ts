@@ -94,12 +94,12 @@ export type MessageHighlight = {
  *
  * @interface Citation
  * @property {MessageHighlight} messageHighlight - The message highlight this citation supports
- * @property {PDFHighlight} sourceHighlight - The highlight in the source document
+ * @property {PDFHighlight} [sourceHighlight] - The highlight in the source document, if the cited text could be located
  */
 export type Citation = {
   readonly id: UUID;
   messageHighlight: MessageHighlight;
-  sourceHighlight: PDFHighlight;
+  sourceHighlight?: PDFHighlight;
   messageId?: UUID; // for storing citation internally does nto have to be returned to the user
 } & (
   | { sourceId: string; sourceIndex?: never } // either sourceId or sourceIndex, not both
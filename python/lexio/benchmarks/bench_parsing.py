@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark parsing raw JSON payloads with `lexio.parsing` against the `json.loads` +
+`Source(**d)` path used by test clients and re-streaming proxies.
+
+Usage:
+    python benchmarks/bench_parsing.py [--number N]
+"""
+
+import argparse
+import json
+import timeit
+
+from lexio.parsing import parse_sources_json, parse_stream_chunk
+from lexio.sse import encode_sources
+from lexio.types import Source, StreamChunk
+
+from bench_sse import make_sources
+
+CONTENT = b'{"content":" retrieval","done":false}'
+
+
+def run(number: int) -> None:
+    sources_frame = encode_sources(make_sources())
+    sources_json = sources_frame[len(b'data: {"sources":'):-len(b"}\n\n")]
+
+    cases = {
+        "token: json.loads + StreamChunk(**d)": lambda: StreamChunk(**json.loads(CONTENT)),
+        "token: lexio.parsing.parse_stream_chunk": lambda: parse_stream_chunk(CONTENT),
+        "sources: json.loads + Source(**d)": lambda: [Source(**item) for item in json.loads(sources_json)],
+        "sources: lexio.parsing.parse_sources_json": lambda: parse_sources_json(sources_json),
+    }
+
+    for name, func in cases.items():
+        # token frames are cheap, run them more often to get stable numbers
+        n = number * 100 if name.startswith("token") else number
+        best = min(timeit.repeat(func, number=n, repeat=5)) / n
+        print(f"{name:<45} {best * 1e6:10.3f} µs/frame")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=1000, help="number of iterations per measurement")
+    args = parser.parse_args()
+    run(args.number)
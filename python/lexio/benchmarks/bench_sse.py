@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the SSE frame encoders in `lexio.sse` against the dict + `json.dumps` path
+used by the example backends.
+
+Usage:
+    python benchmarks/bench_sse.py [--number N]
+"""
+
+import argparse
+import json
+import timeit
+
+from lexio import fast
+from lexio.sse import encode_chunk, encode_content, encode_sources
+from lexio.types import PDFHighlight, Rect, Source, StreamChunk
+
+TOKEN = " retrieval"
+
+
+def make_sources(count: int = 20, highlights: int = 20) -> list:
+    return [
+        Source(
+            id=f"12345678-1234-5678-1234-{i:012d}",
+            title=f"Document {i}",
+            type="pdf",
+            description="A sample PDF document",
+            relevance=0.5,
+            metadata={"page": 1, "file": f"document-{i}.pdf"},
+            highlights=[
+                PDFHighlight(page=1, rect=Rect(top=0.01 * j, left=0.1, width=0.5, height=0.01))
+                for j in range(highlights)
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def sse_frame(data: str) -> bytes:
+    # what sse_starlette does for `{"data": ...}` items (without the event id/retry fields)
+    return f"data: {data}\n\n".encode("utf-8")
+
+
+def run(number: int) -> None:
+    sources = make_sources()
+    fast_sources = [fast.Source.from_model(source) for source in sources]
+
+    cases = {
+        "token: dict + json.dumps": lambda: sse_frame(json.dumps({"content": TOKEN, "done": False})),
+        "token: StreamChunk + encode_chunk": lambda: encode_chunk(StreamChunk(content=TOKEN, done=False)),
+        "token: fast.StreamChunk + encode_chunk": lambda: encode_chunk(fast.StreamChunk(content=TOKEN, done=False)),
+        "token: lexio.sse.encode_content": lambda: encode_content(TOKEN),
+        "sources: model_dump + json.dumps": lambda: sse_frame(
+            json.dumps({"sources": [source.model_dump(exclude_none=True) for source in sources]})
+        ),
+        "sources: lexio.sse.encode_sources": lambda: encode_sources(sources),
+        "sources: encode_sources(fast.Source)": lambda: encode_sources(fast_sources),
+    }
+
+    for name, func in cases.items():
+        # token frames are cheap, run them more often to get stable numbers
+        n = number * 100 if name.startswith("token") else number
+        best = min(timeit.repeat(func, number=n, repeat=5)) / n
+        print(f"{name:<40} {best * 1e6:10.3f} µs/frame")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=1000, help="number of iterations per measurement")
+    args = parser.parse_args()
+    run(args.number)
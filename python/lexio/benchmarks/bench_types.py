@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark suite for construction, validation and serialization of the `lexio.types` models.
+
+Every case is measured as the best of several repeats and divided by the time of a fixed
+pure-Python calibration workload, which reduces but does not remove the influence of
+the machine. The normalized times are compared against the baseline in `baseline.json`
+and the script exits with status 1 if a case is slower than `--threshold` times the
+baseline.
+
+Usage:
+    python benchmarks/bench_types.py                      # compare against the baseline
+    python benchmarks/bench_types.py --update-baseline    # store the current results
+    python benchmarks/bench_types.py --case highlights    # only cases containing "highlights"
+
+Timings of different machines or runs on shared CI runners still vary a lot. To compare
+two revisions, measure both alternately on the same machine and compare the stored files:
+
+    python benchmarks/bench_types.py --baseline base.json --update-baseline --keep-best  # base revision
+    python benchmarks/bench_types.py --baseline head.json --update-baseline --keep-best  # head revision
+    python benchmarks/bench_types.py --baseline base.json --results head.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pydantic
+
+from lexio.types import PDFHighlight, Rect, Source, SpreadsheetHighlight, StreamChunk
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DEFAULT_THRESHOLD = 1.5
+REPEAT = 5
+CALIBRATION_REPEAT = 15
+# slow cases are measured again this many times before they are reported as regressions
+CONFIRM_RUNS = 2
+
+SOURCE_ID = "12345678-1234-5678-1234-567812345678"
+
+
+def calibration() -> None:
+    """Fixed pure-Python workload used to normalize the timings."""
+    values = {}
+    for i in range(2000):
+        values[str(i)] = [i, i * 0.5, str(i)]
+    json.dumps(values)
+
+
+def _source_fields(**fields: Any) -> Dict[str, Any]:
+    return {"id": SOURCE_ID, "title": "Document", "type": "pdf", "relevance": 0.5, "metadata": {"page": 1}, **fields}
+
+
+def _model_cases(name: str, model: type, fields: Dict[str, Any], kwargs: Dict[str, Any], number: int) -> Dict[str, "Case"]:
+    """
+    The standard operations for one model instance.
+
+    Args:
+        name: Prefix of the case names
+        model: The model class
+        fields: Plain python data of the instance, used for validation
+        kwargs: Constructor arguments, nested values may already be model instances
+        number: Iterations per measurement
+    """
+    instance = model(**kwargs)
+    dumped_json = instance.model_dump_json(exclude_none=True)
+    return {
+        f"{name}.construct": Case(lambda: model(**kwargs), number),
+        f"{name}.validate": Case(lambda: model.model_validate(fields), number),
+        f"{name}.dump": Case(lambda: instance.model_dump(exclude_none=True), number),
+        f"{name}.dump_json": Case(lambda: instance.model_dump_json(exclude_none=True), number),
+        f"{name}.validate_json": Case(lambda: model.model_validate_json(dumped_json), number),
+    }
+
+
+class Case:
+    """A benchmark case: a function and the number of calls per measurement."""
+
+    __slots__ = ("func", "number")
+
+    def __init__(self, func: Callable[[], Any], number: int):
+        self.func = func
+        self.number = number
+
+    def measure(self, scale: float = 1.0, repeat: int = REPEAT) -> float:
+        """Return the best time per call in seconds."""
+        number = max(int(self.number * scale), 1)
+        return min(timeit.repeat(self.func, number=number, repeat=repeat)) / number
+
+
+def make_cases() -> Dict[str, Case]:
+    """Create all benchmark cases."""
+    cases: Dict[str, Case] = {}
+
+    # a source carrying a 1 MiB text document
+    data = "lorem ipsum dolor sit amet " * 40000
+    fields = _source_fields(type="text", data=data)
+    cases.update(_model_cases("source_large_data", Source, fields, fields, 20))
+
+    # a source with thousands of PDF highlights
+    highlights = [
+        {"page": 1 + i // 50, "rect": {"top": (i % 50) * 0.02, "left": 0.1, "width": 0.8, "height": 0.015}}
+        for i in range(5000)
+    ]
+    highlight_models = [PDFHighlight(page=h["page"], rect=Rect(**h["rect"])) for h in highlights]
+    cases.update(_model_cases(
+        "source_pdf_highlights",
+        Source,
+        _source_fields(highlights=highlights),
+        _source_fields(highlights=highlight_models),
+        5,
+    ))
+
+    # a spreadsheet highlight with many ranges
+    ranges = [f"A{row}:F{row + 10}" for row in range(1, 50001, 10)]
+    fields = {"sheetName": "Sheet1", "ranges": ranges}
+    cases.update(_model_cases("spreadsheet_ranges", SpreadsheetHighlight, fields, fields, 50))
+
+    # one stream chunk per generated token
+    fields = {"content": " retrieval", "done": False}
+    cases.update(_model_cases("stream_chunk_token", StreamChunk, fields, fields, 20000))
+
+    return cases
+
+
+def run(cases: Dict[str, Case], scale: float = 1.0) -> Dict[str, Any]:
+    """
+    Measure all cases and the calibration workload.
+
+    Returns:
+        Dict with the calibration time, and the raw and normalized time per case
+    """
+    # calibrate before and after the cases, the faster one is closer to the true speed
+    calibration_case = Case(calibration, 50)
+    calibration_time = calibration_case.measure(scale, CALIBRATION_REPEAT)
+    seconds = {name: case.measure(scale) for name, case in cases.items()}
+    calibration_time = min(calibration_time, calibration_case.measure(scale, CALIBRATION_REPEAT))
+
+    results = {
+        name: {"seconds": value, "normalized": value / calibration_time}
+        for name, value in seconds.items()
+    }
+    return {
+        "calibration_seconds": calibration_time,
+        "python": platform.python_version(),
+        "pydantic": pydantic.VERSION,
+        "cases": results,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare normalized results against a baseline.
+
+    Args:
+        results: Output of `run`
+        baseline: A previous output of `run`
+        threshold: Maximum allowed ratio of the current to the baseline time
+
+    Returns:
+        List[str]: The names of all cases slower than the threshold
+    """
+    regressions = []
+    for name, result in results["cases"].items():
+        reference = baseline["cases"].get(name)
+        if reference is not None and result["normalized"] / reference["normalized"] > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def keep_best(results: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, Any]:
+    """Return results with the faster normalized time of each case in `results` and `previous`."""
+    cases = dict(previous["cases"])
+    for name, result in results["cases"].items():
+        if name not in cases or result["normalized"] < cases[name]["normalized"]:
+            cases[name] = result
+    return dict(results, cases=cases)
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Optional[Dict[str, Any]]:
+    """Load the persisted baseline, None if there is none."""
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_baseline(results: Dict[str, Any], path: Path = BASELINE_PATH) -> None:
+    """Persist results as the new baseline."""
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="maximum allowed slowdown factor")
+    parser.add_argument("--scale", type=float, default=1.0, help="scale the number of iterations per measurement")
+    parser.add_argument("--case", default="", help="only run cases whose name contains this string")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="path of the baseline file")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--keep-best", action="store_true",
+                        help="with --update-baseline, keep the faster result of each case already in the baseline")
+    parser.add_argument("--results", type=Path, help="compare results stored with --update-baseline instead of measuring")
+    args = parser.parse_args(argv)
+
+    cases = {name: case for name, case in make_cases().items() if args.case in name}
+    if args.results:
+        results = load_baseline(args.results)
+        if results is None:
+            print(f"No results found at {args.results}")
+            return 1
+        results["cases"] = {name: result for name, result in results["cases"].items() if args.case in name}
+    else:
+        results = run(cases, args.scale)
+    baseline = load_baseline(args.baseline)
+
+    print(f"calibration: {results['calibration_seconds'] * 1e3:.3f} ms")
+    for name, result in results["cases"].items():
+        line = f"{name:<40} {result['seconds'] * 1e6:12.3f} µs"
+        reference = baseline["cases"].get(name) if baseline else None
+        if reference is not None:
+            line += f"   {result['normalized'] / reference['normalized']:6.2f}x baseline"
+        print(line)
+
+    if args.update_baseline:
+        if baseline is not None and args.keep_best:
+            results = keep_best(results, baseline)
+        elif baseline is not None and args.case:
+            # keep the cases which were not run
+            baseline["cases"].update(results["cases"])
+            results = dict(results, cases=baseline["cases"])
+        save_baseline(results, args.baseline)
+        print(f"Stored baseline in {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"No baseline found at {args.baseline}, run with --update-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for _ in range(0 if args.results else CONFIRM_RUNS):
+        if not regressions:
+            break
+        # re-measure to rule out noise, keeping the best result of each case
+        rerun = run({name: cases[name] for name in regressions}, args.scale)
+        for name, result in rerun["cases"].items():
+            if result["normalized"] < results["cases"][name]["normalized"]:
+                results["cases"][name] = result
+        regressions = compare(results, baseline, args.threshold)
+
+    if regressions:
+        print(f"Regressions beyond {args.threshold}x baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
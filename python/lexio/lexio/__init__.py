@@ -4,19 +4,23 @@ This file is auto-generated. Do not edit directly.
 
 Generated from:
   source:    lexio.types
-  timestamp: 2025-08-28T09:10:20+00:00
+  timestamp: 2026-10-17T07:07:49+00:00
 """
 
-from lexio.types import (
-    Message,
-    PDFHighlight,
-    Source,
-    SpreadsheetHighlight,
-    StreamChunk,
-    UUID,
-)
+from typing import TYPE_CHECKING, Any, List
+
 from lexio._version import __version__
 
+if TYPE_CHECKING:
+    from lexio.types import (
+        Message,
+        PDFHighlight,
+        Source,
+        SpreadsheetHighlight,
+        StreamChunk,
+        UUID,
+    )
+
 __all__ = [
     "Message",
     "PDFHighlight",
@@ -25,3 +29,20 @@ __all__ = [
     "StreamChunk",
     "UUID",
 ]
+
+_LAZY_TYPES = frozenset(__all__)
+
+
+def __getattr__(name: str) -> Any:
+    # import lexio.types on first access of one of its types
+    if name in _LAZY_TYPES:
+        from lexio import types
+
+        value = getattr(types, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | _LAZY_TYPES)
@@ -0,0 +1,36 @@
+"""
+Helpers for lexio models whose schema build is deferred until first use.
+
+The generated models use `defer_build=True`, so `__pydantic_core_schema__`,
+`__pydantic_validator__` and `__pydantic_serializer__` are placeholders until the model
+is used for the first time. Code which accesses them directly has to build the model first.
+"""
+
+from functools import lru_cache
+from typing import Type, TypeVar
+
+from pydantic import BaseModel
+from pydantic_core import SchemaSerializer
+
+ModelT = TypeVar("ModelT", bound=Type[BaseModel])
+
+
+def ensure_built(model: ModelT) -> ModelT:
+    """
+    Build the schema, validator and serializer of a model if that has not happened yet.
+
+    Args:
+        model: The model class
+
+    Returns:
+        The same model class
+    """
+    if not model.__pydantic_complete__:
+        model.model_rebuild()
+    return model
+
+
+@lru_cache(maxsize=None)
+def serializer(model: Type[BaseModel]) -> SchemaSerializer:
+    """Return the (built) pydantic-core serializer of a model."""
+    return ensure_built(model).__pydantic_serializer__
@@ -0,0 +1,136 @@
+"""
+Runtime support for the generated slotted mirror types in `lexio.fast`.
+
+The classes in `lexio.fast` are generated by `scripts/generate_fast.py` and only
+contain their fields and field-specific conversion code. Everything that is shared
+between them lives here.
+"""
+
+from typing import Any, Dict, Type
+
+from pydantic import BaseModel, RootModel
+from pydantic_core import to_json as _to_json
+
+from lexio.highlights import HighlightArray
+from lexio.payload import FileRef, iter_base64
+
+# fast class name -> fast class, filled by `register` when `lexio.fast` is imported
+_FAST_CLASSES: Dict[str, Type["FastStruct"]] = {}
+
+
+class FastStruct:
+    """
+    Base class of the generated types in `lexio.fast`.
+
+    Instances are created without any validation. Use `to_model()` to get the pydantic
+    model and `to_json()` to encode them directly.
+    """
+
+    __slots__ = ()
+    _model_name = ""
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self.__slots__ if getattr(self, name) is not None
+        )
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self, mode: str = "python") -> Dict[str, Any]:
+        """
+        Return the fields as plain python data, omitting fields which are None.
+
+        The generated classes override this with the conversion of each field, this
+        generic version converts all fields like them with `dump_value` and `dump_binary`.
+
+        Args:
+            mode: `python` keeps binary data unchanged like `model_dump()`, `json`
+                encodes it as base64 like `model_dump(mode="json")`
+        """
+        result = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = dump_binary(dump_value(value, mode), mode)
+        return result
+
+    def to_json(self) -> bytes:
+        """Encode to JSON, equal to `to_model().model_dump_json(exclude_none=True)`."""
+        return _to_json(self.to_dict("json"), fallback=_json_fallback)
+
+    def to_model(self, validate: bool = False) -> BaseModel:
+        """
+        Convert to the pydantic model in `lexio.types`.
+
+        Args:
+            validate: Validate the values. Without validation the model is built like
+                the trusted builders in `lexio.trusted` do, which keeps all values unchanged.
+
+        Returns:
+            The pydantic model
+        """
+        from lexio import types
+        from lexio.trusted import _build
+
+        return _build(getattr(types, self._model_name), self.to_dict(), validate)
+
+
+def register(cls: Type[FastStruct]) -> Type[FastStruct]:
+    """Class decorator used by the generated module."""
+    _FAST_CLASSES[cls.__name__] = cls
+    return cls
+
+
+def dump_value(value: Any, mode: str = "python") -> Any:
+    """Convert nested fast structs (also in lists) to plain python data."""
+    if isinstance(value, FastStruct):
+        return value.to_dict(mode)
+    if isinstance(value, list):
+        return [dump_value(item, mode) for item in value]
+    return value
+
+
+def dump_binary(value: Any, mode: str = "python") -> Any:
+    """
+    Convert a `BinaryData` field like `lexio.payload.BinaryData` does: unchanged in
+    python mode and as a base64 string in json mode.
+    """
+    if mode == "json" and isinstance(value, (bytes, bytearray, memoryview, FileRef)):
+        return b"".join(iter_base64(value)).decode("ascii")
+    return value
+
+
+def from_model_value(value: Any) -> Any:
+    """Convert nested pydantic models (also in lists) to fast structs and root models to their value."""
+    if isinstance(value, RootModel):
+        return value.root
+    if isinstance(value, BaseModel):
+        return _FAST_CLASSES[type(value).__name__].from_model(value)
+    if isinstance(value, list):
+        return [from_model_value(item) for item in value]
+    return value
+
+
+def _json_fallback(value: Any) -> Any:
+    if isinstance(value, HighlightArray):
+        return value.to_list()
+    if isinstance(value, (memoryview, FileRef)):
+        return b"".join(iter_base64(value)).decode("ascii")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_json(value: Any) -> bytes:
+    """
+    Encode fast structs, lists of them or plain data to JSON.
+
+    Args:
+        value: The value to encode
+
+    Returns:
+        bytes: The JSON document
+    """
+    return _to_json(dump_value(value, "json"), fallback=_json_fallback)
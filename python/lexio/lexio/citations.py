@@ -0,0 +1,232 @@
+"""
+Streaming extraction of citations from a generated answer.
+
+A `CitationExtractor` is built once per request from the texts of the retrieved
+sources. It indexes all word shingles (runs of `shingle_size` consecutive words) of
+the sources. The generated answer is fed to it while it streams: every completed
+word of the answer is looked up in the index and matches are extended word by word,
+so the work per word is constant and the total time is linear in the answer length.
+When a match of at least `min_words` words ends, a citation is emitted in the shape
+of `OmitCitationId`:
+
+    {
+        "sourceIndex": 0,
+        "messageHighlight": {"color": "...", "startChar": 120, "endChar": 184},
+        "sourceHighlight": {"page": 1, "rect": {...}},  # only if `source_highlight` returns one
+    }
+
+`startChar` and `endChar` refer to the full answer text. `attach_citations` adds the
+citations to the `StreamChunk`s of a stream:
+
+```python
+from lexio.citations import CitationExtractor, attach_citations
+
+extractor = CitationExtractor([source.description for source in sources])
+async for chunk in attach_citations(coalesce_tokens(tokens), extractor):
+    yield encode_chunk(chunk)
+```
+"""
+
+import re
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from lexio.types import StreamChunk
+
+DEFAULT_COLOR = "rgba(255, 235, 59, 0.3)"
+# matches are only followed in this many source positions, which bounds the work per word
+MAX_CANDIDATES = 16
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+# (source index, character start, character end) -> highlight in the source document
+SourceHighlight = Callable[[int, int, int], Any]
+
+
+class CitationExtractor:
+    """
+    Matches the streamed answer against the source texts and emits citations.
+
+    Args:
+        sources: The texts of the sources, in the order in which they were sent
+        shingle_size: Number of consecutive words which start a match
+        min_words: Minimum number of matching words for a citation
+        color: Color of the message highlights
+        source_highlight: Optional function returning the highlight (a `PDFHighlight`
+            or its dict) of a character range of a source text, or None
+        source_ids: Optional ids of the sources. If given, citations carry the
+            `sourceId` instead of the `sourceIndex`.
+
+    Raises:
+        ValueError: If `min_words` is smaller than `shingle_size` or the number of
+            source ids does not match the number of sources
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[str],
+        shingle_size: int = 4,
+        min_words: int = 6,
+        color: str = DEFAULT_COLOR,
+        source_highlight: Optional[SourceHighlight] = None,
+        source_ids: Optional[Sequence[str]] = None,
+    ):
+        if shingle_size < 1 or min_words < shingle_size:
+            raise ValueError("shingle_size must be at least 1 and min_words at least shingle_size")
+        if source_ids is not None and len(source_ids) != len(sources):
+            raise ValueError(f"got {len(sources)} sources but {len(source_ids)} source ids")
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.color = color
+        self.source_highlight = source_highlight
+        self.source_ids = source_ids
+
+        # per source the normalized words and their character ranges
+        self._words: List[List[str]] = []
+        self._spans: List[List[Tuple[int, int]]] = []
+        # shingle -> (source index, position of its last word)
+        self._index: Dict[Tuple[str, ...], List[Tuple[int, int]]] = {}
+        for source_index, text in enumerate(sources):
+            matches = list(_WORD_PATTERN.finditer(text or ""))
+            words = [match.group().lower() for match in matches]
+            self._words.append(words)
+            self._spans.append([match.span() for match in matches])
+            for end in range(shingle_size - 1, len(words)):
+                key = tuple(words[end - shingle_size + 1:end + 1])
+                hits = self._index.setdefault(key, [])
+                if len(hits) < MAX_CANDIDATES:
+                    hits.append((source_index, end))
+
+        # the answer received so far, its part which is not tokenized yet and the offset of that part
+        self._parts: List[str] = []
+        self._tail = ""
+        self._offset = 0
+        # the last `shingle_size` words of the answer with their start offsets
+        self._recent: Deque[Tuple[str, int]] = deque(maxlen=shingle_size)
+        # the current match: source positions which still match, its length and its range in the answer
+        self._candidates: List[Tuple[int, int]] = []
+        self._run_length = 0
+        self._run_start = 0
+        self._run_end = 0
+
+    @property
+    def text(self) -> str:
+        """The answer fed so far."""
+        return "".join(self._parts)
+
+    def feed(self, content: str) -> List[Dict[str, Any]]:
+        """
+        Add generated text to the answer.
+
+        Args:
+            content: The next part of the answer, e.g. the content of a `StreamChunk`
+
+        Returns:
+            List[Dict]: The citations of all matches which ended with this text
+        """
+        self._parts.append(content)
+        self._tail += content
+        return self._scan(final=False)
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """
+        Complete the answer, e.g. when the stream is done.
+
+        Returns:
+            List[Dict]: The citations of the remaining matches
+        """
+        citations = self._scan(final=True)
+        citation = self._close_run()
+        if citation is not None:
+            citations.append(citation)
+        return citations
+
+    def _scan(self, final: bool) -> List[Dict[str, Any]]:
+        citations = []
+        scanned = 0
+        for match in _WORD_PATTERN.finditer(self._tail):
+            if match.end() == len(self._tail) and not final:
+                # the word may continue in the next part
+                break
+            scanned = match.end()
+            citation = self._add_word(match.group().lower(), self._offset + match.start(), self._offset + scanned)
+            if citation is not None:
+                citations.append(citation)
+        # only the unfinished word is kept, so every character is scanned about once
+        self._tail = self._tail[scanned:]
+        self._offset += scanned
+        return citations
+
+    def _add_word(self, word: str, start: int, end: int) -> Optional[Dict[str, Any]]:
+        self._recent.append((word, start))
+        citation = None
+        if self._candidates:
+            words = self._words
+            alive = [
+                (source, position + 1) for source, position in self._candidates
+                if position + 1 < len(words[source]) and words[source][position + 1] == word
+            ]
+            if alive:
+                self._candidates = alive
+                self._run_length += 1
+                self._run_end = end
+                return None
+            citation = self._close_run()
+
+        if len(self._recent) == self.shingle_size:
+            hits = self._index.get(tuple(recent_word for recent_word, _ in self._recent))
+            if hits:
+                self._candidates = list(hits)
+                self._run_length = self.shingle_size
+                self._run_start = self._recent[0][1]
+                self._run_end = end
+        return citation
+
+    def _close_run(self) -> Optional[Dict[str, Any]]:
+        candidates = self._candidates
+        self._candidates = []
+        if not candidates or self._run_length < self.min_words:
+            return None
+        source, last = candidates[0]
+        spans = self._spans[source]
+        citation: Dict[str, Any] = {
+            "messageHighlight": {"color": self.color, "startChar": self._run_start, "endChar": self._run_end},
+        }
+        if self.source_ids is None:
+            citation["sourceIndex"] = source
+        else:
+            citation["sourceId"] = self.source_ids[source]
+        if self.source_highlight is not None:
+            highlight = self.source_highlight(source, spans[last - self._run_length + 1][0], spans[last][1])
+            if isinstance(highlight, BaseModel):
+                highlight = highlight.model_dump(exclude_none=True)
+            if highlight is not None:
+                citation["sourceHighlight"] = highlight
+        return citation
+
+
+async def attach_citations(
+    chunks: AsyncIterable[StreamChunk], extractor: CitationExtractor
+) -> AsyncIterator[StreamChunk]:
+    """
+    Feed the content of a stream to an extractor and add the citations to the chunks.
+
+    Citations are attached to the chunk whose content completes the match, the
+    remaining citations to the chunk with `done=True`.
+
+    Args:
+        chunks: The streamed chunks, e.g. from `coalesce_tokens`
+        extractor: The extractor of the request
+
+    Yields:
+        StreamChunk: The chunks with `citations` set where citations were found
+    """
+    async for chunk in chunks:
+        citations = extractor.feed(chunk.content) if chunk.content else []
+        if chunk.done:
+            citations += extractor.finish()
+        if citations:
+            chunk = StreamChunk(content=chunk.content, sources=chunk.sources, citations=citations, done=chunk.done)
+        yield chunk
@@ -0,0 +1,271 @@
+"""
+Slotted, low-overhead mirror types of the lexio protocol models.
+This file is auto-generated by scripts/generate_fast.py. Do not edit directly.
+
+The classes have the same fields as the pydantic models in `lexio.types`, but are
+plain `__slots__` classes that are constructed without any validation. Root models
+such as the `id` of a source are stored as their plain value. Use them on hot paths
+(e.g. per-token frames) and convert at the edges:
+
+- `Model.from_model(model)` creates a fast instance from a pydantic model,
+- `instance.to_model(validate=False)` creates the pydantic model,
+- `instance.to_json()` encodes JSON equal to `model_dump_json(exclude_none=True)`.
+
+Generated from:
+  source:    lexio.types
+  timestamp: 2026-10-17T07:46:04+00:00
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional, Union
+
+from lexio._fastbase import FastStruct, dump_binary, dump_value, encode_json, from_model_value, register
+
+if TYPE_CHECKING:
+    from lexio.highlights import HighlightArray
+    from lexio.payload import BinaryData
+
+
+@register
+class Rect(FastStruct):
+    """Slotted mirror of `lexio.types.Rect`."""
+
+    __slots__ = ("top", "left", "width", "height")
+    _model_name = "Rect"
+
+    def __init__(
+        self,
+        top: float,
+        left: float,
+        width: float,
+        height: float,
+    ) -> None:
+        self.top = top
+        self.left = left
+        self.width = width
+        self.height = height
+
+    def to_dict(self, mode: str = "python") -> Dict[str, Any]:
+        return {"top": self.top, "left": self.left, "width": self.width, "height": self.height}
+
+    @classmethod
+    def from_model(cls, model: Any) -> "Rect":
+        """Create from a `lexio.types.Rect` without validation."""
+        return cls(
+            model.top,
+            model.left,
+            model.width,
+            model.height,
+        )
+
+
+@register
+class PDFHighlight(FastStruct):
+    """Slotted mirror of `lexio.types.PDFHighlight`."""
+
+    __slots__ = ("page", "rect", "highlightColorRgba")
+    _model_name = "PDFHighlight"
+
+    def __init__(
+        self,
+        page: int,
+        rect: Rect,
+        highlightColorRgba: Optional[str] = None,
+    ) -> None:
+        self.page = page
+        self.rect = rect
+        self.highlightColorRgba = highlightColorRgba
+
+    def to_dict(self, mode: str = "python") -> Dict[str, Any]:
+        result = {"page": self.page, "rect": dump_value(self.rect, mode)}
+        if self.highlightColorRgba is not None:
+            result["highlightColorRgba"] = self.highlightColorRgba
+        return result
+
+    @classmethod
+    def from_model(cls, model: Any) -> "PDFHighlight":
+        """Create from a `lexio.types.PDFHighlight` without validation."""
+        return cls(
+            model.page,
+            from_model_value(model.rect),
+            model.highlightColorRgba,
+        )
+
+
+@register
+class SpreadsheetHighlight(FastStruct):
+    """Slotted mirror of `lexio.types.SpreadsheetHighlight`."""
+
+    __slots__ = ("sheetName", "ranges")
+    _model_name = "SpreadsheetHighlight"
+
+    def __init__(
+        self,
+        sheetName: str,
+        ranges: List[str],
+    ) -> None:
+        self.sheetName = sheetName
+        self.ranges = ranges
+
+    def to_dict(self, mode: str = "python") -> Dict[str, Any]:
+        return {"sheetName": self.sheetName, "ranges": self.ranges}
+
+    @classmethod
+    def from_model(cls, model: Any) -> "SpreadsheetHighlight":
+        """Create from a `lexio.types.SpreadsheetHighlight` without validation."""
+        return cls(
+            model.sheetName,
+            model.ranges,
+        )
+
+
+@register
+class Message(FastStruct):
+    """Slotted mirror of `lexio.types.Message`."""
+
+    __slots__ = ("id", "role", "content", "highlights")
+    _model_name = "Message"
+
+    def __init__(
+        self,
+        id: Any,
+        role: Literal['assistant', 'user'],
+        content: str,
+        highlights: Optional[List[Any]] = None,
+    ) -> None:
+        self.id = id
+        self.role = role
+        self.content = content
+        self.highlights = highlights
+
+    def to_dict(self, mode: str = "python") -> Dict[str, Any]:
+        result = {"id": self.id, "role": self.role, "content": self.content}
+        if self.highlights is not None:
+            result["highlights"] = self.highlights
+        return result
+
+    @classmethod
+    def from_model(cls, model: Any) -> "Message":
+        """Create from a `lexio.types.Message` without validation."""
+        return cls(
+            from_model_value(model.id),
+            model.role,
+            model.content,
+            from_model_value(model.highlights),
+        )
+
+
+@register
+class Source(FastStruct):
+    """Slotted mirror of `lexio.types.Source`."""
+
+    __slots__ = ("id", "title", "type", "description", "relevance", "href", "data", "metadata", "highlights")
+    _model_name = "Source"
+
+    def __init__(
+        self,
+        id: Any,
+        title: str,
+        type: Literal['html', 'markdown', 'pdf', 'text', 'xlsx'],
+        description: Optional[str] = None,
+        relevance: Optional[float] = None,
+        href: Optional[str] = None,
+        data: Optional[Union[str, BinaryData]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        highlights: Optional[Union[HighlightArray, List[PDFHighlight], List[SpreadsheetHighlight]]] = None,
+    ) -> None:
+        self.id = id
+        self.title = title
+        self.type = type
+        self.description = description
+        self.relevance = relevance
+        self.href = href
+        self.data = data
+        self.metadata = metadata
+        self.highlights = highlights
+
+    def to_dict(self, mode: str = "python") -> Dict[str, Any]:
+        result = {"id": self.id, "title": self.title, "type": self.type}
+        if self.description is not None:
+            result["description"] = self.description
+        if self.relevance is not None:
+            result["relevance"] = self.relevance
+        if self.href is not None:
+            result["href"] = self.href
+        if self.data is not None:
+            result["data"] = dump_binary(self.data, mode)
+        if self.metadata is not None:
+            result["metadata"] = self.metadata
+        if self.highlights is not None:
+            result["highlights"] = dump_value(self.highlights, mode)
+        return result
+
+    @classmethod
+    def from_model(cls, model: Any) -> "Source":
+        """Create from a `lexio.types.Source` without validation."""
+        return cls(
+            from_model_value(model.id),
+            model.title,
+            model.type,
+            model.description,
+            model.relevance,
+            model.href,
+            model.data,
+            model.metadata,
+            from_model_value(model.highlights),
+        )
+
+
+@register
+class StreamChunk(FastStruct):
+    """Slotted mirror of `lexio.types.StreamChunk`."""
+
+    __slots__ = ("content", "sources", "citations", "done")
+    _model_name = "StreamChunk"
+
+    def __init__(
+        self,
+        content: Optional[str] = None,
+        sources: Optional[List[Source]] = None,
+        citations: Optional[List[Any]] = None,
+        done: Optional[bool] = None,
+    ) -> None:
+        self.content = content
+        self.sources = sources
+        self.citations = citations
+        self.done = done
+
+    def to_dict(self, mode: str = "python") -> Dict[str, Any]:
+        result = {}
+        if self.content is not None:
+            result["content"] = self.content
+        if self.sources is not None:
+            result["sources"] = dump_value(self.sources, mode)
+        if self.citations is not None:
+            result["citations"] = self.citations
+        if self.done is not None:
+            result["done"] = self.done
+        return result
+
+    @classmethod
+    def from_model(cls, model: Any) -> "StreamChunk":
+        """Create from a `lexio.types.StreamChunk` without validation."""
+        return cls(
+            model.content,
+            from_model_value(model.sources),
+            from_model_value(model.citations),
+            model.done,
+        )
+
+
+__all__ = [
+    "Rect",
+    "PDFHighlight",
+    "SpreadsheetHighlight",
+    "Message",
+    "Source",
+    "StreamChunk",
+    "FastStruct",
+    "encode_json",
+]
@@ -0,0 +1,425 @@
+"""
+Columnar, NumPy-backed PDF highlights.
+
+A `HighlightArray` stores many PDF highlights as typed arrays instead of one
+`PDFHighlight` and one `Rect` model per highlight. It can be assigned to
+`Source.highlights` directly and serializes to the same JSON shape as a list of
+`PDFHighlight`s:
+
+    [{"page": 1, "rect": {"top": 0.1, "left": 0.2, "width": 0.3, "height": 0.05}}, ...]
+
+`highlightColorRgba` is only included for highlights which have a color.
+
+NumPy is an optional dependency, install it with `pip install lexio[numpy]`.
+"""
+
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import PydanticSerializationUnexpectedValue, core_schema
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from lexio.types import PDFHighlight
+
+# tolerance for rects that end exactly at the page border after float arithmetic
+BOUNDS_TOLERANCE = 1e-6
+
+_RECT_DICT_SCHEMA = core_schema.typed_dict_schema({
+    name: core_schema.typed_dict_field(core_schema.float_schema())
+    for name in ("top", "left", "width", "height")
+})
+_HIGHLIGHT_DICT_SCHEMA = core_schema.typed_dict_schema({
+    "page": core_schema.typed_dict_field(core_schema.int_schema()),
+    "rect": core_schema.typed_dict_field(_RECT_DICT_SCHEMA),
+    "highlightColorRgba": core_schema.typed_dict_field(core_schema.str_schema(), required=False),
+})
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("HighlightArray requires numpy, install it with `pip install lexio[numpy]`") from e
+    return numpy
+
+
+def _serialize_highlight_array(value: Any) -> List[Dict[str, Any]]:
+    if not isinstance(value, HighlightArray):
+        # lets the union serializer of `Source.highlights` move on to the list members
+        raise PydanticSerializationUnexpectedValue("expected a HighlightArray")
+    return value.to_list()
+
+
+class HighlightArray:
+    """
+    A columnar collection of PDF highlights.
+
+    Rects are relative to the page, i.e. all coordinates are in [0, 1], in the column
+    order of `Rect`: top, left, width, height.
+
+    Args:
+        pages: 1-based page number per highlight, shape (n,)
+        rects: Rect per highlight as (top, left, width, height), shape (n, 4)
+        colors: Optional RGBA color, either one color for all highlights or one
+            (optional) color per highlight
+        validate: Check page numbers and that all rects lie within the page
+
+    Raises:
+        ValueError: If the arrays have inconsistent shapes or validation fails
+    """
+
+    __slots__ = ("pages", "rects", "colors")
+
+    def __init__(
+        self,
+        pages: Any,
+        rects: Any,
+        colors: Optional[Union[str, Sequence[Optional[str]]]] = None,
+        validate: bool = True,
+    ):
+        np = _numpy()
+        self.pages: "np.ndarray" = np.ascontiguousarray(pages, dtype=np.int32).reshape(-1)
+        self.rects: "np.ndarray" = np.ascontiguousarray(rects, dtype=np.float64).reshape(-1, 4)
+        if len(self.pages) != len(self.rects):
+            raise ValueError(f"got {len(self.pages)} pages but {len(self.rects)} rects")
+
+        if colors is None or isinstance(colors, str):
+            self.colors: Optional[Union[str, List[Optional[str]]]] = colors
+        else:
+            self.colors = list(colors)
+            if len(self.colors) != len(self.pages):
+                raise ValueError(f"got {len(self.pages)} pages but {len(self.colors)} colors")
+
+        if validate:
+            self.validate()
+
+    def validate(self) -> None:
+        """
+        Check that all page numbers are >= 1 and all rects lie within the page.
+
+        Raises:
+            ValueError: Naming the first invalid highlight
+        """
+        np = _numpy()
+        invalid_pages = np.flatnonzero(self.pages < 1)
+        if len(invalid_pages):
+            index = invalid_pages[0]
+            raise ValueError(f"highlight {index}: page must be >= 1, got {self.pages[index]}")
+
+        top, left, width, height = self.rects.T
+        valid = (
+            np.isfinite(self.rects).all(axis=1)
+            & (top >= -BOUNDS_TOLERANCE)
+            & (left >= -BOUNDS_TOLERANCE)
+            & (width >= 0)
+            & (height >= 0)
+            & (top + height <= 1 + BOUNDS_TOLERANCE)
+            & (left + width <= 1 + BOUNDS_TOLERANCE)
+        )
+        invalid_rects = np.flatnonzero(~valid)
+        if len(invalid_rects):
+            index = invalid_rects[0]
+            raise ValueError(
+                f"highlight {index}: rect {self.rects[index].tolist()} is not within the page, "
+                "expected relative coordinates in [0, 1]"
+            )
+
+    @classmethod
+    def from_highlights(cls, highlights: Sequence["PDFHighlight"], validate: bool = True) -> "HighlightArray":
+        """
+        Create a `HighlightArray` from a list of `PDFHighlight`s.
+
+        Args:
+            highlights: The highlights
+            validate: Check page numbers and rect bounds
+
+        Returns:
+            HighlightArray: The columnar highlights
+        """
+        pages = [h.page for h in highlights]
+        rects = [(h.rect.top, h.rect.left, h.rect.width, h.rect.height) for h in highlights]
+        colors = [h.highlightColorRgba for h in highlights]
+        return cls(pages, rects, colors if any(c is not None for c in colors) else None, validate=validate)
+
+    @classmethod
+    def from_bboxes(
+        cls,
+        pages: Any,
+        bboxes: Any,
+        page_width: Any,
+        page_height: Any,
+        colors: Optional[Union[str, Sequence[Optional[str]]]] = None,
+        validate: bool = True,
+    ) -> "HighlightArray":
+        """
+        Create a `HighlightArray` from absolute bounding boxes, e.g. PDF text spans.
+
+        Args:
+            pages: 1-based page number, one for all boxes or one per box
+            bboxes: Boxes as (x0, y0, x1, y1) in page coordinates with a top-left origin, shape (n, 4)
+            page_width: Page width, one for all boxes or one per box
+            page_height: Page height, one for all boxes or one per box
+            colors: Optional RGBA color for all or per highlight
+            validate: Check page numbers and rect bounds
+
+        Returns:
+            HighlightArray: The highlights with rects relative to the page
+        """
+        np = _numpy()
+        bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        width = np.asarray(page_width, dtype=np.float64)
+        height = np.asarray(page_height, dtype=np.float64)
+        x0, y0, x1, y1 = bboxes.T
+        rects = np.stack([y0 / height, x0 / width, (x1 - x0) / width, (y1 - y0) / height], axis=1)
+        pages = np.broadcast_to(np.asarray(pages, dtype=np.int32), (len(bboxes),))
+        return cls(pages, rects, colors, validate=validate)
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def __repr__(self) -> str:
+        return f"HighlightArray(<{len(self)} highlights>)"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, HighlightArray):
+            return NotImplemented
+        np = _numpy()
+        return (
+            np.array_equal(self.pages, other.pages)
+            and np.array_equal(self.rects, other.rects)
+            and self._color_list() == other._color_list()
+        )
+
+    def _color(self, index: int) -> Optional[str]:
+        if self.colors is None or isinstance(self.colors, str):
+            return self.colors
+        return self.colors[index]
+
+    def _color_list(self) -> List[Optional[str]]:
+        if self.colors is None or isinstance(self.colors, str):
+            return [self.colors] * len(self)
+        return list(self.colors)
+
+    def __getitem__(self, index: Any) -> Union["PDFHighlight", "HighlightArray"]:
+        if isinstance(index, slice):
+            colors = self.colors if self.colors is None or isinstance(self.colors, str) else self.colors[index]
+            return HighlightArray(self.pages[index], self.rects[index], colors, validate=False)
+        return self._highlight(int(index) if index >= 0 else len(self) + int(index))
+
+    def __iter__(self) -> Iterator["PDFHighlight"]:
+        for index in range(len(self)):
+            yield self._highlight(index)
+
+    def _highlight(self, index: int) -> "PDFHighlight":
+        from lexio.types import PDFHighlight, Rect
+
+        top, left, width, height = self.rects[index].tolist()
+        return PDFHighlight(
+            page=int(self.pages[index]),
+            rect=Rect(top=top, left=left, width=width, height=height),
+            highlightColorRgba=self._color(index),
+        )
+
+    def to_highlights(self) -> List["PDFHighlight"]:
+        """Convert to a list of `PDFHighlight` models."""
+        return list(self)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Convert to a list of dicts in the JSON shape of `PDFHighlight`."""
+        pages = self.pages.tolist()
+        rects = self.rects.tolist()
+        highlights = [
+            {"page": page, "rect": {"top": top, "left": left, "width": width, "height": height}}
+            for page, (top, left, width, height) in zip(pages, rects)
+        ]
+        if self.colors is not None:
+            for highlight, color in zip(highlights, self._color_list()):
+                if color is not None:
+                    highlight["highlightColorRgba"] = color
+        return highlights
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                _serialize_highlight_array,
+                # a typed return schema is considerably faster to serialize than inferring the dicts
+                return_schema=core_schema.list_schema(_HIGHLIGHT_DICT_SCHEMA),
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler
+    ) -> JsonSchemaValue:
+        return {"type": "array", "items": {"type": "object"}}
+
+
+def _segment_starts(breaks: "np.ndarray") -> "np.ndarray":
+    """Indices where a new segment starts, given a boolean array that marks breaks after index 0."""
+    np = _numpy()
+    return np.flatnonzero(np.concatenate(([True], breaks)))
+
+
+def _reduce_groups(starts: "np.ndarray", pages, keys, top, left, bottom, right):
+    np = _numpy()
+    return (
+        pages[starts],
+        keys[starts],
+        np.minimum.reduceat(top, starts),
+        np.minimum.reduceat(left, starts),
+        np.maximum.reduceat(bottom, starts),
+        np.maximum.reduceat(right, starts),
+    )
+
+
+def _merge_lines(pages, keys, top, left, bottom, right, tolerance: float):
+    """Merge rects whose vertical centers are aligned and which touch or overlap horizontally."""
+    np = _numpy()
+    height = bottom - top
+    center = (top + bottom) / 2
+
+    # 1) sort by (color, page, vertical center) and start a new line where the center jumps
+    order = np.lexsort((center, pages, keys))
+    pages, keys, top, left, bottom, right = (a[order] for a in (pages, keys, top, left, bottom, right))
+    center, height = center[order], height[order]
+    line_tolerance = np.maximum(tolerance, 0.5 * np.minimum(height[1:], height[:-1]))
+    new_line = (keys[1:] != keys[:-1]) | (pages[1:] != pages[:-1]) | (center[1:] - center[:-1] > line_tolerance)
+    line = np.cumsum(np.concatenate(([0], new_line)))
+
+    # 2) sort each line by left and split it where the gap to all rects before exceeds the tolerance
+    order = np.lexsort((left, line))
+    pages, keys, top, left, bottom, right, line = (a[order] for a in (pages, keys, top, left, bottom, right, line))
+    # segmented running maximum of `right`: offset every line so that the maximum never
+    # carries over from one line to the next
+    offset = line * (float(right.max() - left.min()) + 1)
+    reach = np.maximum.accumulate(right + offset) - offset
+    # word spacing scales with the font size, so gaps of up to half a rect height are bridged
+    gap_tolerance = np.maximum(tolerance, 0.5 * (bottom[1:] - top[1:]))
+    new_group = (line[1:] != line[:-1]) | (left[1:] > reach[:-1] + gap_tolerance)
+    return _reduce_groups(_segment_starts(new_group), pages, keys, top, left, bottom, right)
+
+
+def _merge_blocks(pages, keys, top, left, bottom, right, tolerance: float):
+    """
+    Merge line rects with the block above them which they overlap horizontally, if the vertical gap is small.
+
+    Lines are swept from top to bottom and one block is kept open per column, so the
+    interleaved lines of multi-column pages form one block per column. A line which
+    joins several open blocks (e.g. one spanning two columns) merges them. Lines are
+    few after `_merge_lines`, the sweep takes O(n * c) for c columns.
+    """
+    np = _numpy()
+    order = np.lexsort((left, top, pages, keys))
+    pages, keys, top, left, bottom, right = (a[order] for a in (pages, keys, top, left, bottom, right))
+
+    # block of each line, and the block each block was merged into
+    labels = np.empty(len(top), dtype=np.int64)
+    parent: List[int] = []
+
+    def find(block: int) -> int:
+        while parent[block] != block:
+            parent[block] = block = parent[parent[block]]
+        return block
+
+    # open blocks of the current (color, page) as [block, left, bottom, right, height of its last line]
+    open_blocks: List[List[Any]] = []
+    segment = None
+    rows = zip(pages.tolist(), keys.tolist(), top.tolist(), left.tolist(), bottom.tolist(), right.tolist())
+    for i, (page, key, line_top, line_left, line_bottom, line_right) in enumerate(rows):
+        if (key, page) != segment:
+            segment = (key, page)
+            open_blocks = []
+        line_height = line_bottom - line_top
+        # blocks too far above this line are also too far above all later lines
+        open_blocks = [b for b in open_blocks if line_top <= b[2] + max(tolerance, 0.5 * b[4])]
+        joined = [
+            b for b in open_blocks
+            if line_top <= b[2] + max(tolerance, 0.5 * min(line_height, b[4]))
+            and line_left <= b[3] + tolerance and line_right >= b[1] - tolerance
+        ]
+        if not joined:
+            parent.append(len(parent))
+            open_blocks.append([len(parent) - 1, line_left, line_bottom, line_right, line_height])
+            labels[i] = len(parent) - 1
+            continue
+        block = joined[0]
+        for other in joined[1:]:
+            parent[find(other[0])] = find(block[0])
+            block[1], block[2], block[3] = min(block[1], other[1]), max(block[2], other[2]), max(block[3], other[3])
+            open_blocks.remove(other)
+        block[1], block[2], block[3], block[4] = (
+            min(block[1], line_left), max(block[2], line_bottom), max(block[3], line_right), line_height
+        )
+        labels[i] = block[0]
+
+    labels = np.array([find(label) for label in labels.tolist()], dtype=np.int64)
+    order = np.argsort(labels, kind="stable")
+    labels = labels[order]
+    pages, keys, top, left, bottom, right = (a[order] for a in (pages, keys, top, left, bottom, right))
+    return _reduce_groups(_segment_starts(labels[1:] != labels[:-1]), pages, keys, top, left, bottom, right)
+
+
+def coalesce_highlights(
+    highlights: Union[HighlightArray, Sequence["PDFHighlight"]],
+    level: str = "line",
+    tolerance: float = 0.002,
+) -> Union[HighlightArray, List["PDFHighlight"]]:
+    """
+    Merge overlapping and adjacent highlight rects into line-level or block-level rects.
+
+    Text extraction typically yields one rect per text span, word or even punctuation
+    fragment. Merging them shrinks the highlight payload and the render work in the
+    frontend while covering the same area: every input rect lies within one of the
+    output rects.
+
+    - `line`: rects on the same page whose vertical centers are aligned (within half
+      a rect height or `tolerance`) are merged when they overlap horizontally or the
+      horizontal gap is at most half a rect height (or `tolerance`), which bridges
+      the spaces between words.
+    - `block`: line rects are merged in addition with the block above them when the
+      two overlap horizontally and the vertical gap is at most half a line height (or
+      `tolerance`). The columns of multi-column pages form separate blocks.
+
+    Highlights with different colors are never merged. Merging lines is vectorized
+    and runs in O(n log n) for n rects, blocks are built by a sweep over the lines.
+
+    Args:
+        highlights: A `HighlightArray` or a list of `PDFHighlight`s with relative coordinates
+        level: `line` or `block`
+        tolerance: Maximum gap between rects to merge, relative to the page size
+
+    Returns:
+        The merged highlights sorted by page, top and left, as `HighlightArray` if the
+        input was one, otherwise as a list of `PDFHighlight`s.
+    """
+    if level not in ("line", "block"):
+        raise ValueError(f"level must be 'line' or 'block', got {level!r}")
+    np = _numpy()
+
+    is_array = isinstance(highlights, HighlightArray)
+    array = highlights if is_array else HighlightArray.from_highlights(highlights, validate=False)
+    if len(array) == 0:
+        return array if is_array else []
+
+    colors = array._color_list()
+    palette, keys = np.unique(np.array(["" if c is None else c for c in colors], dtype=object), return_inverse=True)
+    top, left, width, height = array.rects.T
+    groups = _merge_lines(array.pages, keys.reshape(-1), top, left, top + height, left + width, tolerance)
+    if level == "block":
+        groups = _merge_blocks(*groups, tolerance=tolerance)
+
+    pages, keys, top, left, bottom, right = groups
+    order = np.lexsort((left, top, pages))
+    pages, keys, top, left, bottom, right = (a[order] for a in (pages, keys, top, left, bottom, right))
+    merged_colors = None if array.colors is None else [palette[key] or None for key in keys.tolist()]
+    if isinstance(array.colors, str):
+        merged_colors = array.colors
+    merged = HighlightArray(
+        pages, np.stack([top, left, right - left, bottom - top], axis=1), merged_colors, validate=False
+    )
+    return merged if is_array else merged.to_highlights()
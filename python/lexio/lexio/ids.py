@@ -0,0 +1,153 @@
+"""
+Deterministic, content-addressed IDs for sources and chunks.
+
+IDs generated with `uuid.uuid4()` change on every re-index, so nothing that keys on
+them (HTTP caches, the source cache of the frontend, embedding caches) can ever hit.
+The helpers in this module derive name-based UUIDs (version 5) from
+
+- the identity of the document, e.g. its path or URL,
+- a hash of the content, and
+- the position of the chunk within the document.
+
+Re-indexing unchanged content yields the same IDs; changing a chunk changes its ID.
+
+```python
+from lexio.ids import chunk_ids, source_id
+
+doc_id = source_id("docs/report.pdf")
+ids = chunk_ids("docs/report.pdf", [chunk.text for chunk in chunks])
+```
+"""
+
+import hashlib
+import re
+import uuid
+from typing import Iterable, List, Optional, Union
+
+# Namespace of all lexio IDs, uuid5(NAMESPACE_URL, "https://github.com/renumics/lexio")
+LEXIO_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "https://github.com/renumics/lexio")
+
+# canonical lowercase 8-4-4-4-12 form with a valid version (1-8) and RFC 4122 variant
+_UUID_PATTERN = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[1-8][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$")
+
+_SEPARATOR = "\x00"
+
+Content = Union[str, bytes]
+
+
+def _encode(value: Content) -> bytes:
+    return value.encode("utf-8") if isinstance(value, str) else value
+
+
+def content_hash(content: Content) -> str:
+    """
+    Hash the content of a document or chunk.
+
+    Args:
+        content: Text or binary content
+
+    Returns:
+        str: 32 hex digits of the BLAKE2b digest of the content
+    """
+    return hashlib.blake2b(_encode(content), digest_size=16).hexdigest()
+
+
+def _name(document: str, content: Optional[Content], position: Optional[int]) -> str:
+    parts = [document]
+    if content is not None:
+        parts.append(content_hash(content))
+    if position is not None:
+        parts.append(str(position))
+    return _SEPARATOR.join(parts)
+
+
+def source_id(
+    document: str,
+    content: Optional[Content] = None,
+    position: Optional[int] = None,
+    namespace: uuid.UUID = LEXIO_NAMESPACE,
+) -> str:
+    """
+    Derive a stable ID from the identity of a document, its content and a position.
+
+    Args:
+        document: Identity of the document, e.g. a relative path or URL
+        content: Optional content to include, so that the ID changes with the content
+        position: Optional position of a chunk within the document
+        namespace: UUID namespace, use your own to separate ID spaces
+
+    Returns:
+        str: A version 5 UUID in canonical form
+    """
+    return str(uuid.uuid5(namespace, _name(document, content, position)))
+
+
+def chunk_ids(
+    document: str,
+    contents: Iterable[Content],
+    start: int = 0,
+    namespace: uuid.UUID = LEXIO_NAMESPACE,
+) -> List[str]:
+    """
+    Derive the IDs of consecutive chunks of a document in one batch.
+
+    The result equals `[source_id(document, content, start + i, namespace) for i, content
+    in enumerate(contents)]`, but the hash state of the namespace and document prefix is
+    computed once and no `uuid.UUID` objects are created.
+
+    Args:
+        document: Identity of the document, e.g. a relative path or URL
+        contents: Contents of the chunks in document order
+        start: Position of the first chunk
+        namespace: UUID namespace
+
+    Returns:
+        List[str]: One version 5 UUID per chunk
+    """
+    separator = _SEPARATOR.encode("ascii")
+    prefix = hashlib.sha1(namespace.bytes + document.encode("utf-8") + separator)
+    blake2b = hashlib.blake2b
+    ids = []
+    for position, content in enumerate(contents, start):
+        digest = prefix.copy()
+        digest.update(blake2b(_encode(content), digest_size=16).hexdigest().encode("ascii"))
+        digest.update(separator + str(position).encode("ascii"))
+        ids.append(_format_uuid5(digest.digest()))
+    return ids
+
+
+def _format_uuid5(digest: bytes) -> str:
+    # set version 5 and the RFC 4122 variant like uuid.uuid5 does
+    value = bytearray(digest[:16])
+    value[6] = (value[6] & 0x0F) | 0x50
+    value[8] = (value[8] & 0x3F) | 0x80
+    hex_value = value.hex()
+    return f"{hex_value[:8]}-{hex_value[8:12]}-{hex_value[12:16]}-{hex_value[16:20]}-{hex_value[20:]}"
+
+
+def is_valid_id(value: str) -> bool:
+    """
+    Check whether a value is a UUID in canonical lowercase form.
+
+    Unlike the loose pattern of `lexio.types.UUID`, this requires hex digits, the
+    8-4-4-4-12 grouping, a valid version and the RFC 4122 variant.
+    """
+    return isinstance(value, str) and _UUID_PATTERN.match(value) is not None
+
+
+def validate_id(value: str) -> str:
+    """
+    Validate that a value is a UUID in canonical lowercase form.
+
+    Args:
+        value: The ID to check
+
+    Returns:
+        str: The unchanged ID
+
+    Raises:
+        ValueError: If the value is not a canonical UUID
+    """
+    if not is_valid_id(value):
+        raise ValueError(f"invalid ID {value!r}, expected a canonical lowercase UUID")
+    return value
@@ -0,0 +1,280 @@
+"""
+Low-overhead latency instrumentation for the stages of a RAG request.
+
+Records histograms for the standard stages of a request and exports them in the
+Prometheus text format:
+
+- `lexio_stage_seconds{stage=...}`: query embedding, vector search, highlight
+  building, prompt assembly (and any custom stage),
+- `lexio_time_to_first_token_seconds`, `lexio_tokens_per_second` and
+  `lexio_stream_seconds` for the generated answer.
+
+Instrumentation is disabled by default and then costs a single flag check per call.
+Enable it with the environment variable `LEXIO_METRICS=1` or `set_metrics_enabled(True)`.
+
+```python
+from lexio.instrumentation import render_metrics, stage_timer, track_tokens
+
+with stage_timer("vector_search"):
+    results = table.search(query).to_list()
+
+async for token in track_tokens(llm.astream(prompt)):
+    ...
+
+@app.get("/metrics")
+async def metrics():
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+```
+"""
+
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+from typing import AsyncIterable, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# standard stages of a request, the values are used in the `stage` label
+QUERY_EMBEDDING = "query_embedding"
+VECTOR_SEARCH = "vector_search"
+HIGHLIGHT_BUILDING = "highlight_building"
+PROMPT_ASSEMBLY = "prompt_assembly"
+
+# upper bounds in seconds, from sub-millisecond lookups to minute-long generations
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RATE_BUCKETS = (1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0, 320.0)
+
+_metrics_enabled = os.environ.get("LEXIO_METRICS", "").lower() in ("1", "true", "yes")
+
+
+def set_metrics_enabled(enabled: bool) -> None:
+    """
+    Enable or disable recording of metrics.
+
+    Args:
+        enabled: If True, timers and histograms record observations
+    """
+    global _metrics_enabled
+    _metrics_enabled = enabled
+
+
+def get_metrics_enabled() -> bool:
+    """Return whether metrics are currently recorded."""
+    return _metrics_enabled
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Histogram:
+    """
+    A Prometheus histogram with fixed buckets and optional labels.
+
+    Args:
+        name: Metric name
+        help: Description shown in the exposition
+        buckets: Sorted upper bounds of the buckets, `+Inf` is added automatically
+        label_names: Names of the labels, values are passed to `observe`
+    """
+
+    __slots__ = ("name", "help", "buckets", "label_names", "_series", "_lock")
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS, label_names: Sequence[str] = ()):
+        if list(buckets) != sorted(buckets):
+            raise ValueError("buckets must be sorted")
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value: The observed value, e.g. a duration in seconds
+            label_values: One value per label name
+        """
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"expected {len(self.label_names)} label values")
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            # counts are stored per bucket and accumulated on export
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *label_values: str) -> int:
+        """Number of observations for the label values."""
+        with self._lock:
+            series = self._series.get(label_values)
+            return int(sum(series[:-1])) if series else 0
+
+    def reset(self) -> None:
+        """Remove all observations."""
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> str:
+        """Render the histogram in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        for label_values, values in series:
+            labels = tuple(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                cumulative += count
+                bucket_labels = _format_labels(labels + (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {int(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {int(cumulative)}")
+        return "\n".join(lines) + "\n"
+
+
+class Registry:
+    """A collection of histograms rendered together on the metrics route."""
+
+    def __init__(self) -> None:
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = Lock()
+
+    def histogram(
+        self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS, label_names: Sequence[str] = ()
+    ) -> Histogram:
+        """Get or create a histogram."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(name, help, buckets, label_names)
+            return histogram
+
+    def render(self) -> str:
+        """Render all histograms in the Prometheus text format."""
+        with self._lock:
+            histograms = list(self._histograms.values())
+        return "".join(histogram.render() for histogram in histograms)
+
+    def reset(self) -> None:
+        """Remove all observations of all histograms."""
+        with self._lock:
+            histograms = list(self._histograms.values())
+        for histogram in histograms:
+            histogram.reset()
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "lexio_stage_seconds", "Duration of the stages of a request in seconds.", label_names=("stage",)
+)
+TIME_TO_FIRST_TOKEN = REGISTRY.histogram(
+    "lexio_time_to_first_token_seconds", "Time from the start of the request to the first generated token in seconds."
+)
+TOKENS_PER_SECOND = REGISTRY.histogram(
+    "lexio_tokens_per_second", "Generated tokens per second after the first token.", buckets=RATE_BUCKETS
+)
+STREAM_SECONDS = REGISTRY.histogram("lexio_stream_seconds", "Total duration of a generated stream in seconds.")
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+@contextmanager
+def _stage_timer(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage)
+
+
+def stage_timer(stage: str):
+    """
+    Time a stage of the request, e.g. `with stage_timer(VECTOR_SEARCH): ...`.
+
+    Returns a shared no-op context manager when metrics are disabled.
+
+    Args:
+        stage: Name of the stage, used as the `stage` label
+    """
+    if not _metrics_enabled:
+        return _NOOP_TIMER
+    return _stage_timer(stage)
+
+
+def request_start() -> Optional[float]:
+    """Timestamp to pass as `start` to `track_tokens`, None when metrics are disabled."""
+    return time.perf_counter() if _metrics_enabled else None
+
+
+async def _track_tokens(tokens: AsyncIterable[T], start: float) -> AsyncIterator[T]:
+    first: Optional[float] = None
+    count = 0
+    try:
+        async for token in tokens:
+            if first is None:
+                first = time.perf_counter()
+                TIME_TO_FIRST_TOKEN.observe(first - start)
+            count += 1
+            yield token
+    finally:
+        end = time.perf_counter()
+        STREAM_SECONDS.observe(end - start)
+        if first is not None and count > 1 and end > first:
+            TOKENS_PER_SECOND.observe((count - 1) / (end - first))
+
+
+def track_tokens(tokens: AsyncIterable[T], start: Optional[float] = None) -> AsyncIterable[T]:
+    """
+    Record time-to-first-token, tokens per second and the total stream time of a token stream.
+
+    Returns the stream unchanged when metrics are disabled.
+
+    Args:
+        tokens: The generated tokens
+        start: Start of the request from `request_start()`, defaults to now
+
+    Returns:
+        The same tokens
+    """
+    if not _metrics_enabled:
+        return tokens
+    return _track_tokens(tokens, time.perf_counter() if start is None else start)
+
+
+def render_metrics(registry: Registry = REGISTRY) -> str:
+    """Render all metrics in the Prometheus text format for a `/metrics` route."""
+    return registry.render()
@@ -0,0 +1,87 @@
+"""
+Parsing of raw lexio JSON payloads into models in a single pass.
+
+The functions in this module validate JSON bytes directly with pydantic-core's JSON
+parser, without building intermediate dicts with `json.loads` first. The `TypeAdapter`s
+are created on first use and cached.
+
+```python
+from lexio.parsing import parse_sse_data, parse_sources_json
+
+sources = parse_sources_json(response.content)      # b'[{"id": ..., "title": ...}, ...]'
+chunk = parse_sse_data(b'data: {"content":"Hello","done":false}\\n\\n')
+```
+"""
+
+from functools import lru_cache
+from typing import Any, List, Union
+
+from pydantic import TypeAdapter
+
+from lexio.types import Source, StreamChunk
+
+JsonInput = Union[str, bytes, bytearray]
+
+_SSE_DATA_PREFIX = b"data:"
+
+
+@lru_cache(maxsize=None)
+def _adapter(tp: Any) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+
+def parse_sources_json(data: JsonInput) -> List[Source]:
+    """
+    Validate a JSON array of sources.
+
+    Args:
+        data: The JSON document, e.g. the body of a search response
+
+    Returns:
+        List[Source]: The validated sources
+
+    Raises:
+        pydantic.ValidationError: If the JSON is invalid or does not match the schema
+    """
+    return _adapter(List[Source]).validate_json(data)
+
+
+def parse_stream_chunk(data: JsonInput) -> StreamChunk:
+    """
+    Validate a JSON stream chunk, e.g. `{"content": "...", "done": false}` or `{"sources": [...]}`.
+
+    Args:
+        data: The JSON payload of an SSE event
+
+    Returns:
+        StreamChunk: The validated chunk
+
+    Raises:
+        pydantic.ValidationError: If the JSON is invalid or does not match the schema
+    """
+    return _adapter(StreamChunk).validate_json(data)
+
+
+def parse_sse_data(frame: Union[str, bytes]) -> StreamChunk:
+    """
+    Validate a single-line SSE data frame, e.g. `data: {"content": "..."}\\n\\n`.
+
+    Only frames with a single `data:` line are supported, which is what `lexio.sse`
+    and `sse_starlette` produce for JSON payloads.
+
+    Args:
+        frame: The frame with or without the trailing blank line
+
+    Returns:
+        StreamChunk: The validated chunk
+
+    Raises:
+        ValueError: If the frame is not a data frame
+        pydantic.ValidationError: If the payload does not match the schema
+    """
+    if isinstance(frame, str):
+        frame = frame.encode("utf-8")
+    frame = frame.strip()
+    if not frame.startswith(_SSE_DATA_PREFIX):
+        raise ValueError("expected an SSE frame starting with 'data:'")
+    return parse_stream_chunk(frame[len(_SSE_DATA_PREFIX):])
@@ -0,0 +1,245 @@
+"""
+Zero-copy and lazy binary payloads for `Source.data`.
+
+Besides `str`, `Source.data` accepts
+
+- `bytes`,
+- buffers (`memoryview`, `bytearray`, `mmap.mmap`), which are kept as a `memoryview`
+  without copying the underlying memory, and
+- `FileRef`, a lazy reference to (a slice of) a file on disk which is only read when
+  the source is serialized.
+
+`model_dump()` returns these values unchanged. In JSON they are always encoded as a
+standard base64 string, also `bytes` which happen to be valid UTF-8. `model_dump_json()`
+has to build that string in memory; use `iter_source_json` (or `lexio.sse.iter_sources`)
+to stream a source with a large binary payload in fixed-size base64 blocks instead.
+"""
+
+import base64
+import mmap
+import os
+from typing import Any, Iterator, Optional, Union
+
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import core_schema
+
+from lexio._deferred import serializer
+
+# 48 KiB of raw data per block, a multiple of 3 so that blocks can be base64 encoded
+# independently and concatenated without padding in between
+DEFAULT_BLOCK_SIZE = 3 * 16 * 1024
+
+
+class FileRef:
+    """
+    A lazy reference to a file (or a byte range of a file) used as `Source.data`.
+
+    The file is not read until the data is serialized, and then only block by block
+    when streamed with `iter_source_json`.
+
+    Args:
+        path: Path to the file
+        offset: Byte offset of the referenced range
+        length: Number of bytes to reference, defaults to the rest of the file
+    """
+
+    __slots__ = ("path", "offset", "length")
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"], offset: int = 0, length: Optional[int] = None):
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+        if length is not None and length < 0:
+            raise ValueError("length must not be negative")
+        self.path = os.fspath(path)
+        self.offset = offset
+        self.length = length
+
+    def __repr__(self) -> str:
+        return f"FileRef(path={self.path!r}, offset={self.offset}, length={self.length})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, FileRef):
+            return NotImplemented
+        return (self.path, self.offset, self.length) == (other.path, other.offset, other.length)
+
+    def __hash__(self) -> int:
+        return hash((self.path, self.offset, self.length))
+
+    @property
+    def size(self) -> int:
+        """Number of referenced bytes."""
+        available = max(os.path.getsize(self.path) - self.offset, 0)
+        return available if self.length is None else min(self.length, available)
+
+    def iter_bytes(self, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[bytes]:
+        """
+        Read the referenced bytes block by block.
+
+        Args:
+            block_size: Maximum number of bytes per block
+
+        Yields:
+            bytes: The next block of the file
+        """
+        remaining = self.size
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            while remaining > 0:
+                block = f.read(min(block_size, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                yield block
+
+    def read_bytes(self) -> bytes:
+        """Read all referenced bytes into memory."""
+        return b"".join(self.iter_bytes())
+
+    def open_buffer(self) -> memoryview:
+        """
+        Memory-map the referenced bytes.
+
+        The returned memoryview stays valid as long as it is referenced and does not
+        copy the file into memory. Empty ranges return an empty memoryview.
+        """
+        size = self.size
+        if size == 0:
+            return memoryview(b"")
+        # mmap offsets have to be a multiple of the allocation granularity
+        start = self.offset - self.offset % mmap.ALLOCATIONGRANULARITY
+        with open(self.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), self.offset - start + size, offset=start, access=mmap.ACCESS_READ)
+        return memoryview(mapped)[self.offset - start:]
+
+
+def _validate_binary(value: Any) -> Union[bytes, memoryview, FileRef]:
+    if isinstance(value, (bytes, FileRef)):
+        return value
+    if isinstance(value, memoryview):
+        return value
+    if isinstance(value, (bytearray, mmap.mmap)):
+        return memoryview(value)
+    raise ValueError("expected bytes, a memoryview, bytearray, mmap or FileRef")
+
+
+def _serialize_binary(value: Union[bytes, memoryview, FileRef], info: core_schema.SerializationInfo) -> Any:
+    if info.mode_is_json():
+        return b"".join(iter_base64(value)).decode("ascii")
+    return value
+
+
+class BinaryData:
+    """
+    Pydantic type for binary data, zero-copy buffers and lazy file references in `Source.data`.
+
+    Accepts `bytes`, `memoryview`, `bytearray`, `mmap.mmap` (stored as `memoryview`) and
+    `FileRef`. Serialized unchanged in python mode and as a base64 string in JSON mode.
+    """
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            _validate_binary,
+            serialization=core_schema.plain_serializer_function_ser_schema(_serialize_binary, info_arg=True),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler
+    ) -> JsonSchemaValue:
+        return {"type": "string", "contentEncoding": "base64"}
+
+
+def iter_data_bytes(data: Union[bytes, memoryview, FileRef], block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[Union[bytes, memoryview]]:
+    """
+    Iterate over a binary payload in blocks without copying in-memory buffers.
+
+    Args:
+        data: The payload
+        block_size: Maximum number of bytes per block
+
+    Yields:
+        The next block as bytes or memoryview slice
+    """
+    if isinstance(data, FileRef):
+        yield from data.iter_bytes(block_size)
+        return
+    view = memoryview(data)
+    if view.ndim != 1 or view.itemsize != 1:
+        view = view.cast("B")
+    for start in range(0, len(view), block_size):
+        yield view[start:start + block_size]
+
+
+def iter_base64(data: Union[bytes, memoryview, FileRef], block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Encode a binary payload as base64 block by block.
+
+    The concatenation of all blocks equals `base64.b64encode(data)`.
+
+    Args:
+        data: The payload
+        block_size: Raw bytes per block, rounded down to a multiple of 3
+
+    Yields:
+        bytes: The next base64 encoded block
+    """
+    block_size = max(block_size - block_size % 3, 3)
+    pending = b""
+    for block in iter_data_bytes(data, block_size):
+        if pending:
+            # only file reads can return short blocks, re-align them to multiples of 3
+            block = pending + bytes(block)
+            pending = b""
+        cut = len(block) - len(block) % 3
+        if cut < len(block):
+            pending = bytes(block[cut:])
+            block = block[:cut]
+        if block:
+            yield base64.b64encode(block)
+    if pending:
+        yield base64.b64encode(pending)
+
+
+def iter_source_json(source: Any, block_size: int = DEFAULT_BLOCK_SIZE, exclude_none: bool = True) -> Iterator[bytes]:
+    """
+    Serialize a `Source` to JSON, streaming binary `data` in base64 blocks.
+
+    The concatenated output is the JSON object of the source. Binary data (`bytes`,
+    buffers and `FileRef`) is written as a base64 string without materializing the
+    whole encoded payload. All other fields are serialized by pydantic-core.
+
+    Args:
+        source: The source to serialize
+        block_size: Raw bytes per base64 block
+        exclude_none: Omit fields which are None
+
+    Yields:
+        bytes: Consecutive fragments of the JSON document
+    """
+    data = source.data
+    if data is None or isinstance(data, str):
+        yield source.model_dump_json(exclude_none=exclude_none).encode("utf-8")
+        return
+
+    head = serializer(type(source)).to_json(source, exclude={"data"}, exclude_none=exclude_none)
+    # `id`, `title` and `type` are required, so the object is never empty
+    yield head[:-1] + b',"data":"'
+    yield from iter_base64(data, block_size)
+    yield b'"}'
+
+
+def source_json_size(source: Any, exclude_none: bool = True) -> int:
+    """
+    Compute the size in bytes of the output of `iter_source_json` without encoding the data.
+
+    Useful for setting a `Content-Length` header when streaming a single source.
+    """
+    data = source.data
+    if data is None or isinstance(data, str):
+        return len(source.model_dump_json(exclude_none=exclude_none).encode("utf-8"))
+    head = serializer(type(source)).to_json(source, exclude={"data"}, exclude_none=exclude_none)
+    raw_size = data.size if isinstance(data, FileRef) else memoryview(data).nbytes
+    return len(head) - 1 + len(b',"data":"') + 4 * ((raw_size + 2) // 3) + len(b'"}')
+
@@ -0,0 +1,346 @@
+"""
+A1 range parsing and merging for `SpreadsheetHighlight.ranges`.
+
+Highlighting many cells of a large sheet easily produces long lists of overlapping
+and adjacent ranges such as `["A1:F1", "A2:F2", "C2:D9", ...]`. A `RangeSet` parses
+them into integer rectangles, merges them into a small set of disjoint rectangles
+covering exactly the same cells, answers containment queries with binary searches
+and emits compact A1 ranges again:
+
+```python
+from lexio.ranges import RangeSet
+
+ranges = RangeSet([f"A{row}:F{row}" for row in range(1, 100001)])
+ranges.to_ranges()      # ["A1:F100000"]
+"C500" in ranges        # True
+```
+
+Whole columns (`"A:C"`) and whole rows (`"3:5"`) extend to the sheet limits of Excel.
+"""
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Tuple, Union
+
+if TYPE_CHECKING:
+    from lexio.types import SpreadsheetHighlight
+
+# sheet limits of Excel, used for whole column and whole row ranges
+MAX_ROW = 1048576
+MAX_COLUMN = 16384
+
+# two corners, each with optional column letters and row digits, `$` marks absolute references
+_RANGE_PATTERN = re.compile(r"\$?([A-Za-z]*)\$?([0-9]*)(?::\$?([A-Za-z]*)\$?([0-9]*))?\Z")
+
+
+class CellRange(NamedTuple):
+    """A rectangle of cells with 1-based, inclusive row and column bounds."""
+
+    first_row: int
+    first_column: int
+    last_row: int
+    last_column: int
+
+    @property
+    def cell_count(self) -> int:
+        return (self.last_row - self.first_row + 1) * (self.last_column - self.first_column + 1)
+
+
+@lru_cache(maxsize=1024)
+def column_index(name: str) -> int:
+    """
+    Convert a column name to its 1-based index, e.g. `"A"` -> 1, `"AB"` -> 28.
+
+    Raises:
+        ValueError: If the name is not a valid column name
+    """
+    if not name or not name.isascii() or not name.isalpha():
+        raise ValueError(f"invalid column name {name!r}")
+    index = 0
+    for char in name.upper():
+        index = index * 26 + ord(char) - 64
+    if index > MAX_COLUMN:
+        raise ValueError(f"column {name!r} is beyond the last column")
+    return index
+
+
+def column_name(index: int) -> str:
+    """
+    Convert a 1-based column index to its name, e.g. 28 -> `"AB"`.
+
+    Raises:
+        ValueError: If the index is out of bounds
+    """
+    if not 1 <= index <= MAX_COLUMN:
+        raise ValueError(f"column index {index} is out of bounds")
+    name = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+
+def parse_range(value: str) -> CellRange:
+    """
+    Parse an A1 range such as `"B2:D10"`, `"C3"`, `"$A$1:$B$2"`, `"A:C"` or `"3:5"`.
+
+    The corners may be given in any order.
+
+    Args:
+        value: The range
+
+    Returns:
+        CellRange: The rectangle
+
+    Raises:
+        ValueError: If the range is not a valid A1 range
+    """
+    match = _RANGE_PATTERN.match(value)
+    if match is None:
+        raise ValueError(f"invalid range {value!r}")
+    first_letters, first_digits, last_letters, last_digits = match.groups()
+    if last_letters is None:
+        # a single cell
+        if not first_letters or not first_digits:
+            raise ValueError(f"invalid range {value!r}: a single reference must be a cell")
+        last_letters, last_digits = first_letters, first_digits
+    if bool(first_letters) != bool(last_letters) or bool(first_digits) != bool(last_digits):
+        raise ValueError(f"invalid range {value!r}: corners must be of the same kind")
+    if not first_letters and not first_digits:
+        raise ValueError(f"invalid range {value!r}")
+
+    try:
+        if first_letters:
+            first_column, last_column = column_index(first_letters), column_index(last_letters)
+        else:
+            first_column, last_column = 1, MAX_COLUMN
+    except ValueError as e:
+        raise ValueError(f"invalid range {value!r}: {e}") from None
+    if first_digits:
+        first_row, last_row = int(first_digits), int(last_digits)
+        if not (1 <= first_row <= MAX_ROW and 1 <= last_row <= MAX_ROW):
+            raise ValueError(f"invalid range {value!r}: rows must be within 1 and {MAX_ROW}")
+    else:
+        first_row, last_row = 1, MAX_ROW
+
+    if first_row > last_row:
+        first_row, last_row = last_row, first_row
+    if first_column > last_column:
+        first_column, last_column = last_column, first_column
+    return CellRange(first_row, first_column, last_row, last_column)
+
+
+def format_range(cell_range: CellRange) -> str:
+    """
+    Format a rectangle as a compact A1 range, e.g. `"C3"` for a single cell or `"A:C"` for whole columns.
+
+    Args:
+        cell_range: The rectangle
+
+    Returns:
+        str: The A1 range
+    """
+    first_row, first_column, last_row, last_column = cell_range
+    whole_columns = first_row == 1 and last_row == MAX_ROW
+    whole_rows = first_column == 1 and last_column == MAX_COLUMN
+    if whole_columns and not whole_rows:
+        return f"{column_name(first_column)}:{column_name(last_column)}"
+    if whole_rows and not whole_columns:
+        return f"{first_row}:{last_row}"
+    start = f"{column_name(first_column)}{first_row}"
+    if first_row == last_row and first_column == last_column:
+        return start
+    return f"{start}:{column_name(last_column)}{last_row}"
+
+
+def _merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge overlapping and adjacent inclusive intervals."""
+    intervals.sort()
+    merged: List[Tuple[int, int]] = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class RangeSet:
+    """
+    The union of A1 ranges as disjoint rectangles.
+
+    The columns are cut into strips at the first and after the last column of every
+    range. Within each strip, the row intervals of the ranges covering it are merged.
+    Consecutive strips with the same row interval are then joined into one rectangle.
+    Building takes O(s * a log a) for s strips with at most a ranges covering a strip,
+    highlights of query hits typically span only a few distinct columns. Cell lookups
+    are two binary searches.
+
+    Args:
+        ranges: A1 ranges or `CellRange`s
+
+    Raises:
+        ValueError: If a range is not a valid A1 range
+    """
+
+    __slots__ = ("_strip_starts", "_strip_ends", "_row_starts", "_row_ends", "_rects")
+
+    def __init__(self, ranges: Iterable[Union[str, CellRange]] = ()):
+        rects = [parse_range(r) if isinstance(r, str) else CellRange(*r) for r in ranges]
+
+        # column boundaries of the strips and the ranges starting and ending at them
+        boundaries = sorted({r.first_column for r in rects} | {r.last_column + 1 for r in rects})
+        starting: Dict[int, List[int]] = {}
+        ending: Dict[int, List[int]] = {}
+        for i, r in enumerate(rects):
+            starting.setdefault(r.first_column, []).append(i)
+            ending.setdefault(r.last_column + 1, []).append(i)
+
+        self._strip_starts: List[int] = []
+        self._strip_ends: List[int] = []
+        self._row_starts: List[List[int]] = []
+        self._row_ends: List[List[int]] = []
+        active: Dict[int, None] = {}
+        for column, next_column in zip(boundaries, boundaries[1:]):
+            for i in ending.get(column, ()):
+                del active[i]
+            for i in starting.get(column, ()):
+                active[i] = None
+            if not active:
+                continue
+            rows = _merge_intervals([(rects[i].first_row, rects[i].last_row) for i in active])
+            if self._strip_ends and self._strip_ends[-1] == column - 1 and self._row_intervals(-1) == rows:
+                # same rows as the strip to the left, extend it
+                self._strip_ends[-1] = next_column - 1
+                continue
+            self._strip_starts.append(column)
+            self._strip_ends.append(next_column - 1)
+            self._row_starts.append([start for start, _ in rows])
+            self._row_ends.append([end for _, end in rows])
+
+        self._rects = self._join_strips()
+
+    def _row_intervals(self, strip: int) -> List[Tuple[int, int]]:
+        return list(zip(self._row_starts[strip], self._row_ends[strip]))
+
+    def _join_strips(self) -> List[CellRange]:
+        """Join the row intervals of adjacent strips into rectangles spanning several strips."""
+        rects: List[CellRange] = []
+        # (first row, last row) -> first column of the rectangle still open on the left
+        open_rects: Dict[Tuple[int, int], int] = {}
+        previous_end = None
+        for strip, (start, end) in enumerate(zip(self._strip_starts, self._strip_ends)):
+            rows = self._row_intervals(strip)
+            adjacent = previous_end is not None and previous_end == start - 1
+            current = set(rows)
+            for interval, first_column in list(open_rects.items()):
+                if not adjacent or interval not in current:
+                    rects.append(CellRange(interval[0], first_column, interval[1], previous_end))
+                    del open_rects[interval]
+            for interval in rows:
+                open_rects.setdefault(interval, start)
+            previous_end = end
+        for interval, first_column in open_rects.items():
+            rects.append(CellRange(interval[0], first_column, interval[1], previous_end))
+        rects.sort()
+        return rects
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    def __iter__(self):
+        return iter(self._rects)
+
+    def __repr__(self) -> str:
+        return f"RangeSet({self.to_ranges()!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RangeSet):
+            return NotImplemented
+        return self._rects == other._rects
+
+    @property
+    def cell_count(self) -> int:
+        """The number of cells covered."""
+        return sum(r.cell_count for r in self._rects)
+
+    def _strip_rows(self, column: int) -> Tuple[List[int], List[int]]:
+        strip = bisect_right(self._strip_starts, column) - 1
+        if strip < 0 or column > self._strip_ends[strip]:
+            return [], []
+        return self._row_starts[strip], self._row_ends[strip]
+
+    def contains_cell(self, row: int, column: int) -> bool:
+        """Whether the cell at the 1-based row and column is covered."""
+        row_starts, row_ends = self._strip_rows(column)
+        interval = bisect_right(row_starts, row) - 1
+        return interval >= 0 and row <= row_ends[interval]
+
+    def contains(self, value: Union[str, CellRange]) -> bool:
+        """
+        Whether all cells of a range are covered.
+
+        Args:
+            value: An A1 range or a `CellRange`
+
+        Returns:
+            bool: True if every cell of the range is covered
+        """
+        first_row, first_column, last_row, last_column = parse_range(value) if isinstance(value, str) else value
+        column = first_column
+        while column <= last_column:
+            strip = bisect_right(self._strip_starts, column) - 1
+            if strip < 0 or column > self._strip_ends[strip]:
+                return False
+            row_starts, row_ends = self._row_starts[strip], self._row_ends[strip]
+            interval = bisect_right(row_starts, first_row) - 1
+            if interval < 0 or last_row > row_ends[interval]:
+                return False
+            column = self._strip_ends[strip] + 1
+        return True
+
+    def __contains__(self, value: Union[str, CellRange]) -> bool:
+        return self.contains(value)
+
+    def to_ranges(self) -> List[str]:
+        """The covered cells as compact A1 ranges, sorted by first row and column."""
+        return [format_range(r) for r in self._rects]
+
+
+def compact_ranges(ranges: Iterable[str]) -> List[str]:
+    """
+    Merge overlapping and adjacent A1 ranges into a small list of disjoint ranges.
+
+    Args:
+        ranges: A1 ranges, e.g. `SpreadsheetHighlight.ranges`
+
+    Returns:
+        List[str]: Ranges covering exactly the same cells
+
+    Raises:
+        ValueError: If a range is not a valid A1 range
+    """
+    return RangeSet(ranges).to_ranges()
+
+
+def compact_highlights(highlights: Iterable["SpreadsheetHighlight"]) -> List["SpreadsheetHighlight"]:
+    """
+    Merge the ranges of spreadsheet highlights, one highlight per sheet.
+
+    Args:
+        highlights: The highlights, several may refer to the same sheet
+
+    Returns:
+        List[SpreadsheetHighlight]: One highlight per sheet in order of first appearance
+    """
+    from lexio.types import SpreadsheetHighlight
+
+    sheets: Dict[str, List[str]] = {}
+    for highlight in highlights:
+        sheets.setdefault(highlight.sheetName, []).extend(highlight.ranges)
+    return [
+        SpreadsheetHighlight(sheetName=sheet, ranges=compact_ranges(ranges))
+        for sheet, ranges in sheets.items()
+    ]
@@ -0,0 +1,180 @@
+"""
+Per-session registry of the sources already sent to a client.
+
+In a multi-turn chat the same sources are retrieved again and again, and sending
+them in full every turn makes up most of the payload of long sessions. A
+`SourceRegistry` remembers which sources were delivered in a session. Sources sent
+before are replaced by a reference which only carries the `id` (plus the fields
+required by the protocol and the per-request fields in `reference_fields`, e.g. the
+relevance), so the client resolves them from the sources it already received:
+
+```python
+from lexio.registry import SourceRegistry
+
+registry = SourceRegistry(max_sessions=1000, max_sources_per_session=256)
+
+sources = registry.register(session_id, sources)  # repeats become references
+yield encode_chunk(StreamChunk(sources=sources))
+```
+
+The server can also resolve ids sent back by the client without querying the vector
+store again with `resolve`. Memory is bounded by evicting the least recently used
+sessions and, within a session, the least recently used sources. Evicted sources are
+simply sent in full again.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from lexio._fastbase import FastStruct
+
+# fields which a `Source` requires and which are therefore always kept in references
+_REQUIRED_FIELDS = ("id", "title", "type")
+
+
+def _source_id(source: Any) -> str:
+    if isinstance(source, Mapping):
+        return str(source["id"])
+    source_id = source.id
+    # `Source.id` is a root model, fast structs store the plain value
+    return str(getattr(source_id, "root", source_id))
+
+
+class SourceRegistry:
+    """
+    Remembers the sources sent per session, with LRU bounds on the number of
+    sessions and the number of sources per session.
+
+    Sources can be `lexio.types.Source` models, `lexio.fast.Source` structs or plain
+    dicts with an `id` key. The registry is thread-safe.
+
+    Args:
+        max_sessions: Maximum number of sessions, the least recently used session is
+            dropped when a new one is added
+        max_sources_per_session: Maximum number of sources remembered per session
+        reference_fields: Fields which are kept in references in addition to the `id`
+            (and `title` and `type` for models), e.g. the relevance which differs per query
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1024,
+        max_sources_per_session: int = 256,
+        reference_fields: Sequence[str] = ("relevance",),
+    ):
+        if max_sessions < 1 or max_sources_per_session < 1:
+            raise ValueError("max_sessions and max_sources_per_session must be at least 1")
+        self.max_sessions = max_sessions
+        self.max_sources_per_session = max_sources_per_session
+        self.reference_fields = tuple(reference_fields)
+        self._sessions: "OrderedDict[str, OrderedDict[str, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._sessions
+
+    def _session(self, session_id: str) -> "OrderedDict[str, Any]":
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = OrderedDict()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def reference(self, source: Any) -> Any:
+        """
+        Create the reference sent instead of a source which the client already has.
+
+        Args:
+            source: The full source
+
+        Returns:
+            A source of the same kind which only carries the `id`, the required fields
+            and the `reference_fields`
+        """
+        if isinstance(source, Mapping):
+            return {
+                key: source[key] for key in ("id",) + self.reference_fields
+                if key in source and source[key] is not None
+            }
+        fields = {
+            name: getattr(source, name)
+            for name in _REQUIRED_FIELDS + self.reference_fields
+            if getattr(source, name, None) is not None
+        }
+        if isinstance(source, FastStruct):
+            return type(source)(**fields)
+        if isinstance(source, BaseModel):
+            return type(source).model_construct(**fields)
+        raise TypeError(f"unsupported source type {type(source).__name__}")
+
+    def register(self, session_id: str, sources: Iterable[Any]) -> List[Any]:
+        """
+        Record the sources as sent in a session and replace the ones sent before by references.
+
+        Args:
+            session_id: Id of the session, e.g. the conversation
+            sources: The sources to send
+
+        Returns:
+            List: The sources in the same order, full for new sources and references for
+            sources which were already sent in the session
+        """
+        result = []
+        with self._lock:
+            session = self._session(session_id)
+            for source in sources:
+                source_id = _source_id(source)
+                if source_id in session:
+                    session.move_to_end(source_id)
+                    result.append(self.reference(source))
+                    continue
+                session[source_id] = source
+                if len(session) > self.max_sources_per_session:
+                    session.popitem(last=False)
+                result.append(source)
+        return result
+
+    def get(self, session_id: str, source_id: str) -> Optional[Any]:
+        """Return a source sent in a session, None if it is unknown or was evicted."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or source_id not in session:
+                return None
+            self._sessions.move_to_end(session_id)
+            session.move_to_end(source_id)
+            return session[source_id]
+
+    def resolve(self, session_id: str, source_ids: Iterable[str]) -> Tuple[List[Any], List[str]]:
+        """
+        Look up the full sources of ids sent back by the client.
+
+        Args:
+            session_id: Id of the session
+            source_ids: The requested source ids
+
+        Returns:
+            The known sources and the ids which are not (or no longer) in the registry
+        """
+        found = []
+        missing = []
+        for source_id in source_ids:
+            source = self.get(session_id, source_id)
+            if source is None:
+                missing.append(source_id)
+            else:
+                found.append(source)
+        return found, missing
+
+    def forget(self, session_id: str) -> None:
+        """Remove a session, e.g. when the conversation is closed."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
@@ -0,0 +1,137 @@
+"""
+Server-sent event (SSE) frame encoding for lexio stream payloads.
+
+The encoders in this module turn `StreamChunk` and `Source` models into ready
+`data: ...\\n\\n` byte frames using the pydantic-core serializer directly, so no
+intermediate dicts are built and no `json.dumps` call is needed per frame.
+
+Optional fields are omitted from the payload (``exclude_none``), which matches what
+the lexio frontend expects when fields are missing.
+
+The frames are plain bytes and can be yielded from a generator passed to
+``sse_starlette.EventSourceResponse`` (bytes are forwarded unchanged) or to a
+``StreamingResponse`` with ``media_type=SSE_MEDIA_TYPE``.
+"""
+
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Union
+
+from pydantic_core import to_json
+
+from lexio._deferred import serializer
+from lexio._fastbase import FastStruct
+from lexio.payload import DEFAULT_BLOCK_SIZE, iter_source_json
+from lexio.types import Source, StreamChunk
+
+if TYPE_CHECKING:
+    from lexio import fast
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+_FRAME_PREFIX = b"data: "
+_FRAME_SUFFIX = b"\n\n"
+
+_CONTENT_PREFIX = b'data: {"content":'
+_CONTENT_SUFFIX = b',"done":false}\n\n'
+
+_DONE_FRAME = b'data: {"content":"","done":true}\n\n'
+
+
+def encode_frame(payload: bytes) -> bytes:
+    """
+    Wrap an already serialized JSON payload into an SSE data frame.
+
+    Args:
+        payload: JSON payload without line breaks
+
+    Returns:
+        bytes: The complete `data: ...\\n\\n` frame
+    """
+    return _FRAME_PREFIX + payload + _FRAME_SUFFIX
+
+
+def encode_chunk(chunk: Union[StreamChunk, "fast.StreamChunk"]) -> bytes:
+    """
+    Encode a `StreamChunk` into an SSE data frame.
+
+    Args:
+        chunk: The stream chunk to encode, a pydantic model or a `lexio.fast.StreamChunk`
+
+    Returns:
+        bytes: The complete `data: ...\\n\\n` frame
+    """
+    if isinstance(chunk, FastStruct):
+        return _FRAME_PREFIX + chunk.to_json() + _FRAME_SUFFIX
+    return _FRAME_PREFIX + serializer(StreamChunk).to_json(chunk, exclude_none=True) + _FRAME_SUFFIX
+
+
+def encode_content(content: str) -> bytes:
+    """
+    Encode a single content token into an SSE data frame.
+
+    This is the fast path for per-token frames. It is equivalent to
+    `encode_chunk(StreamChunk(content=content, done=False))` but skips model
+    construction and only serializes the string itself.
+
+    Args:
+        content: The generated text
+
+    Returns:
+        bytes: The complete `data: {"content": ..., "done": false}\\n\\n` frame
+    """
+    return _CONTENT_PREFIX + to_json(content) + _CONTENT_SUFFIX
+
+
+def encode_done(content: Optional[str] = None) -> bytes:
+    """
+    Encode the final frame of a stream.
+
+    Args:
+        content: Optional trailing content sent together with the done flag
+
+    Returns:
+        bytes: The complete `data: {"content": ..., "done": true}\\n\\n` frame
+    """
+    if not content:
+        return _DONE_FRAME
+    return _CONTENT_PREFIX + to_json(content) + b',"done":true}\n\n'
+
+
+def encode_sources(sources: Iterable[Union[Source, "fast.Source"]]) -> bytes:
+    """
+    Encode a list of sources into an SSE data frame of the form `{"sources": [...]}`.
+
+    Args:
+        sources: The sources to send to the frontend, pydantic models or `lexio.fast.Source`s
+
+    Returns:
+        bytes: The complete `data: {"sources": [...]}\\n\\n` frame
+    """
+    source_serializer = serializer(Source)
+    payload = b",".join(
+        source.to_json() if isinstance(source, FastStruct) else source_serializer.to_json(source, exclude_none=True)
+        for source in sources
+    )
+    return b'data: {"sources":[' + payload + b"]}\n\n"
+
+
+def iter_sources(sources: Iterable[Source], block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Stream the sources frame in fragments, encoding binary `data` in base64 blocks.
+
+    Use this instead of `encode_sources` when sources carry large binary payloads
+    (e.g. a `FileRef` to a PDF), so that the encoded file is never held in memory
+    as a whole. The concatenated fragments form a single `data: {"sources": [...]}\\n\\n` frame.
+
+    Args:
+        sources: The sources to send to the frontend
+        block_size: Raw bytes per base64 block
+
+    Yields:
+        bytes: Consecutive fragments of the frame
+    """
+    yield b'data: {"sources":['
+    for index, source in enumerate(sources):
+        if index:
+            yield b","
+        yield from iter_source_json(source, block_size)
+    yield b"]}\n\n"
@@ -0,0 +1,147 @@
+"""
+Coalescing of generated text tokens into `StreamChunk` frames.
+
+Language models produce one token every few milliseconds. Sending every token as its
+own SSE event means one JSON encode, one network write and one frontend state update
+per token. `coalesce_tokens` batches the tokens of a short time window (or up to a
+byte budget) into a single `StreamChunk` instead:
+
+- the first token is sent immediately, so the time to first token is unchanged,
+- following tokens are collected until `window` seconds have passed since the first
+  buffered token or the buffered content reaches `max_bytes`,
+- the final chunk with `done=True` is sent as soon as the token stream ends.
+
+```python
+from lexio.sse import encode_chunk
+from lexio.streaming import coalesce_tokens
+
+async def event_generator():
+    async for chunk in coalesce_tokens(llm.astream(prompt)):
+        yield encode_chunk(chunk)
+```
+
+Blocking token iterators (e.g. `transformers.TextIteratorStreamer`) can be wrapped
+with `iterate_in_thread` so that waiting for the next token does not block the event loop.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import AsyncIterable, AsyncIterator, Iterable, List, Optional, TypeVar
+
+from lexio.types import StreamChunk
+
+T = TypeVar("T")
+
+# 20 ms is below the perception threshold for text appearing and still collects
+# several tokens per frame at typical generation speeds
+DEFAULT_WINDOW = 0.02
+DEFAULT_MAX_BYTES = 1024
+
+_SENTINEL = object()
+
+
+async def coalesce_tokens(
+    tokens: AsyncIterable[str],
+    window: float = DEFAULT_WINDOW,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> AsyncIterator[StreamChunk]:
+    """
+    Coalesce an async stream of text tokens into `StreamChunk`s.
+
+    Empty tokens are skipped. The last chunk always has `done=True` and carries the
+    content that was still buffered (possibly an empty string).
+
+    Args:
+        tokens: The generated text tokens
+        window: Maximum time in seconds a token is buffered before it is sent
+        max_bytes: Send the buffered content as soon as it reaches this UTF-8 size
+
+    Yields:
+        StreamChunk: Chunks with the concatenated content of the coalesced tokens
+    """
+    if window < 0:
+        raise ValueError("window must not be negative")
+    if max_bytes < 1:
+        raise ValueError("max_bytes must be positive")
+
+    loop = asyncio.get_running_loop()
+    iterator = tokens.__aiter__()
+    buffer: List[str] = []
+    size = 0
+    deadline = 0.0
+    first = True
+    # the pending `__anext__` call while waiting with a timeout; it is kept across
+    # flushes so that no token gets lost when the window expires
+    pending: Optional["asyncio.Future[str]"] = None
+
+    try:
+        while True:
+            if buffer:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+                timeout = deadline - loop.time()
+                if timeout > 0:
+                    await asyncio.wait((pending,), timeout=timeout)
+                if not pending.done():
+                    yield StreamChunk(content="".join(buffer), done=False)
+                    buffer.clear()
+                    size = 0
+                    continue
+                next_token, pending = pending, None
+                try:
+                    token = next_token.result()
+                except StopAsyncIteration:
+                    break
+            elif pending is not None:
+                next_token, pending = pending, None
+                try:
+                    token = await next_token
+                except StopAsyncIteration:
+                    break
+            else:
+                try:
+                    token = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+
+            if not token:
+                continue
+            if first:
+                first = False
+                yield StreamChunk(content=token, done=False)
+                continue
+            if not buffer:
+                deadline = loop.time() + window
+            buffer.append(token)
+            size += len(token.encode("utf-8"))
+            if size >= max_bytes:
+                yield StreamChunk(content="".join(buffer), done=False)
+                buffer.clear()
+                size = 0
+
+        yield StreamChunk(content="".join(buffer), done=True)
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+
+
+async def iterate_in_thread(iterable: Iterable[T], executor: Optional[Executor] = None) -> AsyncIterator[T]:
+    """
+    Iterate over a blocking iterable without blocking the event loop.
+
+    Every `next()` call runs in `executor` (the default executor of the loop if None).
+
+    Args:
+        iterable: The blocking iterable, e.g. a `TextIteratorStreamer`
+        executor: Optional executor to run the `next()` calls in
+
+    Yields:
+        The items of the iterable
+    """
+    loop = asyncio.get_running_loop()
+    iterator = iter(iterable)
+    while True:
+        item = await loop.run_in_executor(executor, next, iterator, _SENTINEL)
+        if item is _SENTINEL:
+            return
+        yield item
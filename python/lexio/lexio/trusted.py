@@ -0,0 +1,292 @@
+"""
+Trusted construction of lexio models without re-validation.
+
+Use these builders for data that has already been validated, e.g. sources loaded from
+your own vector store that were checked at index time. The models are built with
+`model_construct`, nested models (highlights, rects, ids) are constructed recursively
+from the field annotations. No value is checked or coerced: no constraints (`ge`,
+`le`, `pattern`), no literal checks and no `extra='forbid'`. Nested highlights and
+rects still become `PDFHighlight`, `SpreadsheetHighlight` and `Rect` instances, so the
+result serializes exactly like a validated model.
+
+Invalid values are not reported in trusted mode, unknown keys are dropped and missing
+required fields are left unset. Set the environment variable `LEXIO_VALIDATE_TRUSTED=1`
+(or call `set_validate_trusted(True)`) to run full validation in all builders while
+debugging.
+"""
+
+import os
+from collections import abc
+from functools import lru_cache
+from typing import (
+    Annotated, Any, Callable, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, Union, get_args, get_origin,
+)
+
+from pydantic import BaseModel, RootModel
+
+from lexio._deferred import ensure_built
+from lexio.types import PDFHighlight, Rect, Source, SpreadsheetHighlight
+
+_validate_trusted = os.environ.get("LEXIO_VALIDATE_TRUSTED", "").lower() in ("1", "true", "yes")
+
+HighlightInput = Union[PDFHighlight, SpreadsheetHighlight, Mapping[str, Any]]
+
+# builds the models in a value of some annotation
+_Convert = Callable[[Any], Any]
+
+
+def set_validate_trusted(enabled: bool) -> None:
+    """
+    Enable or disable full validation in the trusted builders.
+
+    Args:
+        enabled: If True, all builders validate their input like the regular constructors
+    """
+    global _validate_trusted
+    _validate_trusted = enabled
+
+
+def get_validate_trusted() -> bool:
+    """Return whether the trusted builders currently validate their input."""
+    return _validate_trusted
+
+
+def _should_validate(validate: Optional[bool]) -> bool:
+    return _validate_trusted if validate is None else validate
+
+
+def _is_mapping(value: Any) -> bool:
+    return type(value) is dict or isinstance(value, abc.Mapping)
+
+
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _unwrap(annotation: Any) -> Any:
+    while get_origin(annotation) is Annotated:
+        annotation = get_args(annotation)[0]
+    return annotation
+
+
+def _list_item(annotation: Any) -> Any:
+    """The item annotation of a `List[...]` annotation, None for other annotations."""
+    if get_origin(annotation) is list:
+        args = get_args(annotation)
+        return _unwrap(args[0]) if args else None
+    return None
+
+
+def _choose(models: Sequence[Type[BaseModel]]) -> _Convert:
+    """
+    Return a function building a mapping as the first of `models` whose required
+    fields are all present in it.
+    """
+    if len(models) == 1:
+        return _builder(models[0])
+    choices = []
+    for model in models:
+        fields = ensure_built(model).model_fields
+        # root models wrap the whole value
+        required = frozenset(
+            () if issubclass(model, RootModel)
+            else (field.alias or name for name, field in fields.items() if field.is_required())
+        )
+        choices.append((required, _builder(model)))
+
+    def choose(value: Any) -> Any:
+        if _is_mapping(value):
+            for required, build in choices:
+                if required <= value.keys():
+                    return build(value)
+        return value
+
+    return choose
+
+
+def _converter(annotation: Any) -> Optional[_Convert]:
+    """
+    Return a function building the models in a value of `annotation`, or None if the
+    annotation holds no models. Values which are not mappings (or lists of them) are
+    returned as they are, including model instances.
+    """
+    annotation = _unwrap(annotation)
+    if _is_model(annotation):
+        return _builder(annotation)
+    if get_origin(annotation) is Union:
+        members = [_unwrap(arg) for arg in get_args(annotation)]
+    else:
+        members = [annotation]
+
+    models = [member for member in members if _is_model(member)]
+    items = [item for item in map(_list_item, members) if _is_model(item)]
+    build = _choose(models) if models else None
+    build_item = _choose(items) if items else None
+    if build is None and build_item is None:
+        return None
+
+    def convert(value: Any) -> Any:
+        if build_item is not None and isinstance(value, list):
+            return [build_item(item) for item in value]
+        if build is not None:
+            return build(value)
+        return value
+
+    return convert
+
+
+# markers of fields without a static default
+_REQUIRED = object()
+_FACTORY = object()
+# defaults which pydantic does not copy for each instance
+_IMMUTABLE_DEFAULTS = (type(None), bool, int, float, str, bytes)
+
+
+def _fields(model: Type[BaseModel]) -> List[Tuple[str, str, Any, Optional[_Convert]]]:
+    """The (input key, name, default, converter) of all fields of `model` in their order."""
+    fields = []
+    for name, field in ensure_built(model).model_fields.items():
+        if field.is_required():
+            default = _REQUIRED
+        elif field.default_factory is None and isinstance(field.default, _IMMUTABLE_DEFAULTS):
+            default = field.default
+        else:
+            default = _FACTORY
+        fields.append((field.alias or name, name, default, _converter(field.annotation)))
+    return fields
+
+
+@lru_cache(maxsize=None)
+def _builder(model: Type[BaseModel]) -> _Convert:
+    """
+    Return a function constructing `model` from a mapping without validation.
+
+    The instance is set up like `model_construct` does, models with private attributes,
+    `model_post_init` or extra fields are built with `model_construct`. The fields are
+    resolved on the first call, so that models may refer to each other.
+    """
+    fields: List[Tuple[str, str, Any, Optional[_Convert]]] = []
+
+    if issubclass(model, RootModel):
+        def build_root(value: Any) -> Any:
+            if isinstance(value, model):
+                return value
+            if not fields:
+                fields.extend(_fields(model))
+            convert = fields[0][3]
+            return model.model_construct(value if convert is None else convert(value))
+
+        return build_root
+
+    direct: List[bool] = []
+    new = object.__new__
+    set_attribute = object.__setattr__
+
+    def build(value: Any) -> Any:
+        if not _is_mapping(value):
+            return value
+        if not fields:
+            fields.extend(_fields(model))
+            # instances of other models are built with `model_construct`
+            direct.append(
+                not model.__private_attributes__
+                and not model.__pydantic_post_init__
+                and model.model_config.get("extra") != "allow"
+            )
+        # in the order of the fields like validated models, missing fields get their default
+        values = {}
+        fields_set = set()
+        for key, name, default, convert in fields:
+            if key in value:
+                item = value[key]
+                values[name] = item if convert is None else convert(item)
+                fields_set.add(name)
+            elif default is _FACTORY:
+                values[name] = model.model_fields[name].get_default(call_default_factory=True)
+            elif default is not _REQUIRED:
+                values[name] = default
+        if not direct[0]:
+            return model.model_construct(fields_set, **values)
+        instance = new(model)
+        set_attribute(instance, "__dict__", values)
+        set_attribute(instance, "__pydantic_fields_set__", fields_set)
+        set_attribute(instance, "__pydantic_extra__", None)
+        set_attribute(instance, "__pydantic_private__", None)
+        return instance
+
+    return build
+
+
+def _build(model: Type[BaseModel], data: Any, validate: Optional[bool]) -> Any:
+    if _should_validate(validate):
+        return model.model_validate(data)
+    return _builder(model)(data)
+
+
+def trusted_rect(rect: Mapping[str, Any], validate: Optional[bool] = None) -> Rect:
+    """
+    Create a `Rect` from trusted data.
+
+    Args:
+        rect: Mapping with `top`, `left`, `width` and `height`
+        validate: Override the global validation switch for this call
+
+    Returns:
+        Rect: The rect model
+    """
+    return _build(Rect, rect, validate)
+
+
+def trusted_highlights(
+    highlights: Iterable[HighlightInput],
+    validate: Optional[bool] = None,
+) -> Union[List[PDFHighlight], List[SpreadsheetHighlight]]:
+    """
+    Create a list of highlights from trusted data.
+
+    Mappings containing a `sheetName` key become `SpreadsheetHighlight`s, all others
+    become `PDFHighlight`s with a nested `Rect`. Model instances are kept as they are.
+
+    Args:
+        highlights: Highlight mappings or models
+        validate: Override the global validation switch for this call
+
+    Returns:
+        list: The highlight models
+    """
+    return [
+        _build(SpreadsheetHighlight if "sheetName" in h else PDFHighlight, h, validate)
+        if isinstance(h, Mapping) else h
+        for h in highlights
+    ]
+
+
+def trusted_source(fields: Mapping[str, Any], validate: Optional[bool] = None) -> Source:
+    """
+    Create a `Source` from trusted data, including nested highlights.
+
+    Args:
+        fields: Mapping with the source fields, highlights may be mappings or models
+        validate: Override the global validation switch for this call
+
+    Returns:
+        Source: The source model
+    """
+    return _build(Source, fields, validate)
+
+
+def trusted_sources(rows: Iterable[Mapping[str, Any]], validate: Optional[bool] = None) -> List[Source]:
+    """
+    Create a list of `Source`s from trusted data, e.g. the rows of a retrieval result.
+
+    Args:
+        rows: Mappings with the source fields, highlights may be mappings or models
+        validate: Override the global validation switch for this call
+
+    Returns:
+        List[Source]: The source models
+    """
+    if _should_validate(validate):
+        return [Source.model_validate(row) for row in rows]
+    build = _builder(Source)
+    return [build(row) for row in rows]
@@ -8,8 +8,14 @@ from typing import Annotated, Any, Dict, List, Literal, Optional, Union
 
 from pydantic import BaseModel, ConfigDict, Field, RootModel
 
+from lexio.highlights import HighlightArray
+from lexio.payload import BinaryData
+
 
 class Model(RootModel[Any]):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Any
 
 
@@ -19,6 +25,7 @@ class Rect(BaseModel):
     """
 
     model_config = ConfigDict(
+        defer_build=True,
         extra='forbid',
     )
     top: Annotated[float, Field(title='top')]
@@ -46,6 +53,7 @@ class PDFHighlight(BaseModel):
     """
 
     model_config = ConfigDict(
+        defer_build=True,
         extra='forbid',
     )
     page: Annotated[int, Field(ge=1, title='page')]
@@ -70,6 +78,7 @@ class SpreadsheetHighlight(BaseModel):
     """
 
     model_config = ConfigDict(
+        defer_build=True,
         extra='forbid',
     )
     sheetName: Annotated[str, Field(title='sheetName')]
@@ -83,6 +92,9 @@ class SpreadsheetHighlight(BaseModel):
 
 
 class UUID(RootModel[str]):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Annotated[str, Field(pattern='^.*-.*-.*-.*-.*$', title='UUID')]
     """
     A UUID string in the format "xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx".
@@ -91,18 +103,30 @@ class UUID(RootModel[str]):
 
 
 class Citation(RootModel[Any]):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Any
 
 
 class MessageHighlight(RootModel[Any]):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Any
 
 
 class OmitCitationId(RootModel[Any]):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Any
 
 
 class UUID1(RootModel[Any]):
+    model_config = ConfigDict(
+        defer_build=True,
+    )
     root: Any
 
 
@@ -112,6 +136,7 @@ class Message(BaseModel):
     """
 
     model_config = ConfigDict(
+        defer_build=True,
         extra='forbid',
     )
     id: Annotated[UUID1, Field(title='id')]
@@ -128,6 +153,7 @@ class Source(BaseModel):
     """
 
     model_config = ConfigDict(
+        defer_build=True,
         extra='forbid',
     )
     id: Annotated[UUID1, Field(title='id')]
@@ -156,7 +182,7 @@ class Source(BaseModel):
     """
     Optional href to display a link to the source in the SourcesDisplay component.
     """
-    data: Annotated[Optional[Union[str, bytes]], Field(title='data')] = None
+    data: Annotated[Optional[Union[str, BinaryData]], Field(title='data')] = None
     """
     Optional data to display in the ContentDisplay component. This can be set initially
     or lazily loaded when the `SET_SELECTED_SOURCE` action is handled. Simply return the data
@@ -174,8 +200,8 @@ class Source(BaseModel):
     Properties with a leading underscore (e.g., '_page') are hidden from display in the UI.
     """
     highlights: Annotated[
-        Optional[Union[List[PDFHighlight], List[SpreadsheetHighlight]]],
-        Field(title='highlights'),
+        Optional[Union[HighlightArray, List[PDFHighlight], List[SpreadsheetHighlight]]],
+        Field(title='highlights', union_mode='left_to_right'),
     ] = None
     """
     Highlight annotations in the PDF document and Microsoft Excel spreadsheet. Only applicable for PDF and Microsoft Excel sources.
@@ -190,6 +216,7 @@ class StreamChunk(BaseModel):
     """
 
     model_config = ConfigDict(
+        defer_build=True,
         extra='forbid',
     )
     content: Annotated[Optional[str], Field(title='content')] = None
@@ -0,0 +1,201 @@
+"""
+Optional MessagePack wire encoding for lexio payloads.
+
+JSON has no binary type, so `bytes` in `Source.data` are sent as base64, which makes
+inline PDFs and spreadsheets a third larger and costs encode and decode time on both
+ends. MessagePack carries the raw bytes instead. It is opt-in: JSON (and SSE for
+streams) stays the default, and MessagePack is only used when a client asks for it
+in the `Accept` header. Requires the `msgpack` package (`pip install lexio[msgpack]`).
+
+```python
+from fastapi import Request, Response
+from lexio.wire import encode, negotiate
+
+@app.get("/sources")
+async def get_sources(request: Request):
+    media_type = negotiate(request.headers.get("accept"))
+    return Response(encode(sources, media_type), media_type=media_type)
+```
+
+Streams are encoded as consecutive MessagePack objects (MessagePack is self-delimiting)
+and can be read back with `iter_msgpack_stream`.
+"""
+
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from lexio._fastbase import FastStruct
+from lexio.highlights import HighlightArray
+from lexio.payload import FileRef
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/vnd.msgpack"
+# older clients still use the unregistered type
+_MSGPACK_ALIASES = {MSGPACK_MEDIA_TYPE, "application/msgpack", "application/x-msgpack"}
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ImportError("the MessagePack encoding requires msgpack, install it with `pip install lexio[msgpack]`") from e
+    return msgpack
+
+
+def _to_python(value: Any) -> Any:
+    """Plain python data of models, fast structs and lists of them with binary fields kept as bytes."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(exclude_none=True)
+    if isinstance(value, FastStruct):
+        return value.to_dict()
+    if isinstance(value, (list, tuple)):
+        return [_to_python(item) for item in value]
+    return value
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, FileRef):
+        return value.read_bytes()
+    if isinstance(value, FastStruct):
+        return value.to_dict()
+    if isinstance(value, HighlightArray):
+        return value.to_list()
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+
+def encode_msgpack(value: Any) -> bytes:
+    """
+    Encode a model, a fast struct or a list of them as MessagePack with raw binary data.
+
+    Fields which are None are omitted like in the JSON encoding of `lexio.sse`.
+
+    Args:
+        value: E.g. a `StreamChunk`, a `Source` or a list of sources
+
+    Returns:
+        bytes: The MessagePack document
+    """
+    return _msgpack().packb(_to_python(value), default=_msgpack_default, use_bin_type=True)
+
+
+def decode_msgpack(data: Union[bytes, bytearray, memoryview], type_: Any = None) -> Any:
+    """
+    Decode a MessagePack document and validate it.
+
+    Args:
+        data: The MessagePack document
+        type_: The expected type, e.g. `StreamChunk` or `List[Source]`. If None, the
+            plain decoded data is returned.
+
+    Returns:
+        The validated value
+    """
+    value = _msgpack().unpackb(data, raw=False)
+    if type_ is None:
+        return value
+    from lexio.parsing import _adapter
+
+    return _adapter(type_).validate_python(value)
+
+
+def iter_msgpack_stream(chunks: Iterable[bytes], type_: Any = None) -> Iterator[Any]:
+    """
+    Decode a stream of consecutive MessagePack objects, e.g. the body of a streamed response.
+
+    Args:
+        chunks: The received byte chunks, objects may span several chunks
+        type_: The expected type of every object, e.g. `StreamChunk`
+
+    Yields:
+        The decoded (and validated) objects
+    """
+    unpacker = _msgpack().Unpacker(raw=False)
+    adapter = None
+    if type_ is not None:
+        from lexio.parsing import _adapter
+
+        adapter = _adapter(type_)
+    for chunk in chunks:
+        unpacker.feed(chunk)
+        for value in unpacker:
+            yield value if adapter is None else adapter.validate_python(value)
+
+
+def _parse_accept(accept: str) -> List[Tuple[str, float]]:
+    media_types = []
+    for part in accept.split(","):
+        media_type, *params = part.strip().split(";")
+        quality = 1.0
+        for param in params:
+            key, _, param_value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(param_value)
+                except ValueError:
+                    quality = 0.0
+        media_types.append((media_type.strip().lower(), quality))
+    return media_types
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """
+    Choose the response encoding from an `Accept` header.
+
+    MessagePack is only chosen if the client lists it with a higher quality than JSON
+    (or does not accept JSON). Missing headers and wildcards select JSON.
+
+    Args:
+        accept: The value of the `Accept` request header
+
+    Returns:
+        str: `JSON_MEDIA_TYPE` or `MSGPACK_MEDIA_TYPE`
+    """
+    if not accept:
+        return JSON_MEDIA_TYPE
+    msgpack_quality = 0.0
+    json_quality = 0.0
+    for media_type, quality in _parse_accept(accept):
+        if media_type in _MSGPACK_ALIASES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            json_quality = max(json_quality, quality)
+    if msgpack_quality > 0 and msgpack_quality > json_quality:
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def encode_json(value: Any) -> bytes:
+    """
+    Encode a model, a fast struct or a list of them as JSON, omitting fields which are None.
+
+    Args:
+        value: The value to encode
+
+    Returns:
+        bytes: The JSON document
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump_json(exclude_none=True).encode("utf-8")
+    if isinstance(value, FastStruct):
+        return value.to_json()
+    if isinstance(value, (list, tuple)):
+        return b"[" + b",".join(encode_json(item) for item in value) + b"]"
+    return to_json(value)
+
+
+def encode(value: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    """
+    Encode a model, a fast struct or a list of them in the negotiated media type.
+
+    Args:
+        value: The value to encode
+        media_type: A media type returned by `negotiate`
+
+    Returns:
+        bytes: The encoded body
+    """
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return encode_msgpack(value)
+    return encode_json(value)
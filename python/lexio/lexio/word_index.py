@@ -0,0 +1,216 @@
+"""
+Page-level word index for mapping chunk text to PDF highlights.
+
+A `WordIndex` is built once per document from the words of its pages (e.g. from
+PyMuPDF's `page.get_text("words")` or pdfplumber's `page.extract_words()`). It stores
+the document text and, per word, its character range and its rect on the page as
+sorted arrays. The highlights of a chunk are then found with a binary search over
+the word offsets instead of rescanning all words of the page for every chunk:
+
+```python
+from lexio.word_index import WordIndex
+
+index = WordIndex.from_pages(
+    (page.number + 1, page.rect.width, page.rect.height, page.get_text("words"))
+    for page in pdf
+)
+start, end = index.locate(chunk_text)
+highlights = index.highlights(start, end)  # List[PDFHighlight], one rect per line
+```
+
+Requires numpy (`pip install lexio[numpy]`).
+"""
+
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Sequence, Tuple
+
+from lexio.highlights import HighlightArray, _numpy, coalesce_highlights
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from lexio.types import PDFHighlight
+
+# words are separated by a single space in the document text, also across lines and pages
+SEPARATOR = " "
+# number of characters matched at both ends of a chunk whose full text is not found
+ANCHOR_LENGTH = 32
+
+
+def _normalize(text: str) -> str:
+    return SEPARATOR.join(text.split())
+
+
+class WordIndex:
+    """
+    Character offsets and page rects of the words of a document.
+
+    Use `from_pages` to build an index.
+
+    Args:
+        text: The document text, the words joined by `SEPARATOR`
+        starts: Offset of the first character of each word in `text`, sorted, shape (n,)
+        ends: Offset after the last character of each word, shape (n,)
+        words: The rect of each word relative to its page
+    """
+
+    __slots__ = ("text", "starts", "ends", "words")
+
+    def __init__(self, text: str, starts: Any, ends: Any, words: HighlightArray):
+        np = _numpy()
+        self.text = text
+        self.starts: "np.ndarray" = np.ascontiguousarray(starts, dtype=np.int64).reshape(-1)
+        self.ends: "np.ndarray" = np.ascontiguousarray(ends, dtype=np.int64).reshape(-1)
+        self.words = words
+        if not len(self.starts) == len(self.ends) == len(words):
+            raise ValueError(f"got {len(self.starts)} starts, {len(self.ends)} ends and {len(words)} words")
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[Tuple[int, float, float, Iterable[Sequence[Any]]]]) -> "WordIndex":
+        """
+        Build the index from the words of each page.
+
+        Args:
+            pages: Per page in ascending order a tuple of the 1-based page number, the
+                page width, the page height and the words of the page in reading order.
+                Each word is a sequence starting with `(x0, top, x1, bottom, text)` in page
+                coordinates with a top-left origin, which is the layout of PyMuPDF's
+                `get_text("words")`. Words without text are skipped.
+
+        Returns:
+            WordIndex: The index
+        """
+        parts: List[str] = []
+        starts: List[int] = []
+        ends: List[int] = []
+        page_numbers: List[int] = []
+        bboxes: List[Tuple[float, float, float, float]] = []
+        widths: List[float] = []
+        heights: List[float] = []
+        offset = 0
+        for page, width, height, words in pages:
+            for word in words:
+                text = _normalize(word[4])
+                if not text:
+                    continue
+                if parts:
+                    offset += len(SEPARATOR)
+                parts.append(text)
+                starts.append(offset)
+                offset += len(text)
+                ends.append(offset)
+                page_numbers.append(page)
+                bboxes.append((word[0], word[1], word[2], word[3]))
+                widths.append(width)
+                heights.append(height)
+
+        words = HighlightArray.from_bboxes(page_numbers, bboxes, widths, heights, validate=False)
+        return cls(SEPARATOR.join(parts), starts, ends, words)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __repr__(self) -> str:
+        return f"WordIndex(<{len(self)} words>)"
+
+    def word_range(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        Indices of the words overlapping the character range [start, end).
+
+        Args:
+            start: First character offset in `text`
+            end: Offset after the last character
+
+        Returns:
+            Tuple[int, int]: The words `[first, last)`, empty if no word overlaps
+        """
+        np = _numpy()
+        first = int(np.searchsorted(self.ends, start, side="right"))
+        last = int(np.searchsorted(self.starts, end, side="left"))
+        return first, max(first, last)
+
+    def page_range(self, page: int) -> Tuple[int, int]:
+        """
+        Character range of a page in `text`.
+
+        Args:
+            page: 1-based page number
+
+        Returns:
+            Tuple[int, int]: The range `(start, end)`, empty if the page has no words
+        """
+        np = _numpy()
+        first = int(np.searchsorted(self.words.pages, page, side="left"))
+        last = int(np.searchsorted(self.words.pages, page, side="right"))
+        if first == last:
+            start = int(self.starts[first]) if first < len(self) else len(self.text)
+            return start, start
+        return int(self.starts[first]), int(self.ends[last - 1])
+
+    def highlight_array(self, start: int, end: int, level: Optional[str] = "line") -> HighlightArray:
+        """
+        Highlights of the character range [start, end) as a `HighlightArray`.
+
+        Args:
+            start: First character offset in `text`
+            end: Offset after the last character
+            level: Merge the word rects with `coalesce_highlights` into one rect per
+                `line` or `block`, or None to keep one rect per word
+
+        Returns:
+            HighlightArray: The highlights
+        """
+        first, last = self.word_range(start, end)
+        highlights = self.words[first:last]
+        if level is None:
+            return highlights
+        return coalesce_highlights(highlights, level=level)
+
+    def highlights(self, start: int, end: int, level: Optional[str] = "line") -> List["PDFHighlight"]:
+        """
+        Highlights of the character range [start, end) as a list of `PDFHighlight`s.
+
+        Args:
+            start: First character offset in `text`
+            end: Offset after the last character
+            level: `line`, `block` or None, see `highlight_array`
+
+        Returns:
+            List[PDFHighlight]: The highlights
+        """
+        return self.highlight_array(start, end, level).to_highlights()
+
+    def locate(self, text: str, start: int = 0, end: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        """
+        Find the character range of a chunk in the document text.
+
+        Whitespace is normalized before matching. Chunks whose text was extracted by a
+        different tool than the words may not match exactly, in which case they are
+        located by their first and last `ANCHOR_LENGTH` characters.
+
+        Args:
+            text: The text of the chunk
+            start: Offset to start searching from, e.g. the end of the previous chunk
+            end: Offset to stop searching at, e.g. the end of the page of the chunk
+                from `page_range`. The whole match must lie before it.
+
+        Returns:
+            The range `(start, end)` in `text`, None if the chunk is not found
+        """
+        text = _normalize(text)
+        if not text:
+            return None
+        if end is None:
+            end = len(self.text)
+        found = self.text.find(text, start, end)
+        if found >= 0:
+            return found, found + len(text)
+        if len(text) <= ANCHOR_LENGTH:
+            return None
+        head = self.text.find(text[:ANCHOR_LENGTH], start, end)
+        if head < 0:
+            return None
+        # the end has to follow within about the length of the chunk
+        tail = self.text.find(text[-ANCHOR_LENGTH:], head + ANCHOR_LENGTH, min(end, head + 2 * len(text)))
+        if tail < 0:
+            return None
+        return head, tail + ANCHOR_LENGTH
@@ -25,3 +25,6 @@ python3 $(dirname "$0")/post_process_types.py "$OUTPUT_FILE"
 
 echo "✅ Post-processed types in $OUTPUT_FILE"
 
+
+# Generate the slotted mirror types in lexio.fast from the post-processed models
+python3 $(dirname "$0")/generate_fast.py
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+"""
+Script to generate the lexio/fast/__init__.py module from the pydantic models in lexio.types.
+
+For every model in lexio.types a slotted class with the same fields is generated. The
+classes are constructed without validation and convert losslessly to and from the
+pydantic models. Root models (e.g. `UUID1`) are represented by their plain value.
+"""
+
+import sys
+import typing
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+from pydantic import BaseModel, RootModel
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lexio import types  # noqa: E402
+from lexio.highlights import HighlightArray  # noqa: E402
+from lexio.payload import BinaryData  # noqa: E402
+
+# Get UTC timezone in a version-compatible way
+UTC = timezone.utc
+
+# types which are used by name in the annotations and imported for type checking only
+_EXTERNAL_TYPES = {HighlightArray: "HighlightArray", BinaryData: "BinaryData"}
+
+
+def get_models() -> List[type]:
+    """All (non-root) models of lexio.types in definition order."""
+    return [
+        value for value in vars(types).values()
+        if isinstance(value, type) and issubclass(value, BaseModel) and not issubclass(value, RootModel)
+        and value.__module__ == types.__name__
+    ]
+
+
+def annotation_to_str(annotation: Any, models: Set[type]) -> str:
+    """Render a field annotation, replacing root models by their value type."""
+    if annotation is type(None):
+        return "None"
+    if annotation is Any:
+        return "Any"
+    if annotation in _EXTERNAL_TYPES:
+        return _EXTERNAL_TYPES[annotation]
+    if isinstance(annotation, type) and issubclass(annotation, RootModel):
+        return annotation_to_str(annotation.model_fields["root"].annotation, models)
+    if annotation in models:
+        return annotation.__name__
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Literal:
+        return f"Literal[{', '.join(repr(arg) for arg in args)}]"
+    if origin is typing.Union:
+        # root models can map different members to the same type, e.g. List[Any]
+        members = list(dict.fromkeys(annotation_to_str(arg, models) for arg in args if arg is not type(None)))
+        member = members[0] if len(members) == 1 else f"Union[{', '.join(members)}]"
+        return f"Optional[{member}]" if type(None) in args else member
+    if origin is list:
+        return f"List[{annotation_to_str(args[0], models)}]"
+    if origin is dict:
+        return f"Dict[{annotation_to_str(args[0], models)}, {annotation_to_str(args[1], models)}]"
+    if isinstance(annotation, type):
+        return annotation.__name__
+    raise ValueError(f"unsupported annotation {annotation!r}")
+
+
+def contains_models(annotation: Any, root_models: bool = True) -> bool:
+    """Whether values of this annotation can contain pydantic models (optionally ignoring root models)."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return root_models or not issubclass(annotation, RootModel)
+    return any(contains_models(arg, root_models) for arg in typing.get_args(annotation))
+
+
+def contains_binary(annotation: Any) -> bool:
+    """Whether values of this annotation can be binary data, which is base64 encoded in JSON."""
+    return annotation is BinaryData or any(contains_binary(arg) for arg in typing.get_args(annotation))
+
+
+def generate_class(model: type, models: Set[type]) -> str:
+    fields = model.model_fields
+    required = [name for name, field in fields.items() if field.is_required()]
+    optional = [name for name, field in fields.items() if not field.is_required()]
+
+    params = [f"{name}: {annotation_to_str(fields[name].annotation, models)}" for name in required]
+    params += [
+        f"{name}: {annotation_to_str(fields[name].annotation, models)} = {fields[name].default!r}"
+        for name in optional
+    ]
+    # fields with nested models are converted recursively, root models become their value
+    dump_nested = {name for name, field in fields.items() if contains_models(field.annotation, root_models=False)}
+    load_nested = {name for name, field in fields.items() if contains_models(field.annotation)}
+    dump_binary = {name for name, field in fields.items() if contains_binary(field.annotation)}
+
+    def dumped(name: str) -> str:
+        if name in dump_binary:
+            return f"dump_binary(self.{name}, mode)"
+        return f"dump_value(self.{name}, mode)" if name in dump_nested else f"self.{name}"
+
+    def loaded(name: str) -> str:
+        return f"from_model_value(model.{name})" if name in load_nested else f"model.{name}"
+
+    required_items = ", ".join(f'"{name}": {dumped(name)}' for name in required)
+    lines = [
+        "@register",
+        f"class {model.__name__}(FastStruct):",
+        f'    """Slotted mirror of `lexio.types.{model.__name__}`."""',
+        "",
+        f"    __slots__ = ({', '.join(f'{name!r}' for name in fields)}{',' if len(fields) == 1 else ''})".replace("'", '"'),
+        f'    _model_name = "{model.__name__}"',
+        "",
+        "    def __init__(",
+        "        self,",
+        *(f"        {param}," for param in params),
+        "    ) -> None:",
+        *(f"        self.{name} = {name}" for name in fields),
+        "",
+        '    def to_dict(self, mode: str = "python") -> Dict[str, Any]:',
+    ]
+    if optional:
+        lines.append(f"        result = {{{required_items}}}")
+        for name in optional:
+            lines += [
+                f"        if self.{name} is not None:",
+                f'            result["{name}"] = {dumped(name)}',
+            ]
+        lines.append("        return result")
+    else:
+        lines.append(f"        return {{{required_items}}}")
+    lines += [
+        "",
+        "    @classmethod",
+        f'    def from_model(cls, model: Any) -> "{model.__name__}":',
+        f'        """Create from a `lexio.types.{model.__name__}` without validation."""',
+        "        return cls(",
+        *(f"            {loaded(name)}," for name in fields),
+        "        )",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def generate_fast() -> None:
+    models = get_models()
+    model_set = set(models)
+    classes = "\n\n".join(generate_class(model, model_set) for model in models)
+    names = "\n".join(f'    "{model.__name__}",' for model in models)
+
+    # Get current timestamp
+    timestamp = datetime.now(UTC).astimezone(timezone(timedelta(hours=1))).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+    template = '''"""
+Slotted, low-overhead mirror types of the lexio protocol models.
+This file is auto-generated by scripts/generate_fast.py. Do not edit directly.
+
+The classes have the same fields as the pydantic models in `lexio.types`, but are
+plain `__slots__` classes that are constructed without any validation. Root models
+such as the `id` of a source are stored as their plain value. Use them on hot paths
+(e.g. per-token frames) and convert at the edges:
+
+- `Model.from_model(model)` creates a fast instance from a pydantic model,
+- `instance.to_model(validate=False)` creates the pydantic model,
+- `instance.to_json()` encodes JSON equal to `model_dump_json(exclude_none=True)`.
+
+Generated from:
+  source:    lexio.types
+  timestamp: {timestamp}
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional, Union
+
+from lexio._fastbase import FastStruct, dump_binary, dump_value, encode_json, from_model_value, register
+
+if TYPE_CHECKING:
+    from lexio.highlights import HighlightArray
+    from lexio.payload import BinaryData
+
+
+{classes}
+
+__all__ = [
+{names}
+    "FastStruct",
+    "encode_json",
+]
+'''
+
+    fast_path = Path(__file__).parent.parent / 'lexio' / 'fast' / '__init__.py'
+    fast_path.parent.mkdir(exist_ok=True)
+    fast_path.write_text(template.format(timestamp=timestamp, classes=classes, names=names))
+    print(f"✅ Generated {fast_path}")
+
+
+if __name__ == '__main__':
+    generate_fast()
@@ -16,8 +16,8 @@ def generate_init(types_to_include: list):
     # Remove duplicates and sort
     types = sorted(set(types_to_include))
     
-    # Generate the import statement
-    imports = '\n'.join(f'    {type_name},' for type_name in types)
+    # Generate the import statement for type checkers
+    imports = '\n'.join(f'        {type_name},' for type_name in types)
     
     # Generate the __all__ list
     all_list = '\n'.join(f'    "{type_name}",' for type_name in types)
@@ -25,7 +25,8 @@ def generate_init(types_to_include: list):
     # Get current timestamp
     timestamp = datetime.now(UTC).astimezone(timezone(timedelta(hours=1))).strftime("%Y-%m-%dT%H:%M:%S+00:00")
     
-    # Template for the __init__.py file
+    # Template for the __init__.py file. The types are resolved lazily through the
+    # module `__getattr__`, so `import lexio` does not import pydantic or build the models.
     template = '''"""
 Lexio - API types for the lexio frontend library
 This file is auto-generated. Do not edit directly.
@@ -35,14 +36,35 @@ Generated from:
   timestamp: {timestamp}
 """
 
-from lexio.types import (
-{imports}
-)
+from typing import TYPE_CHECKING, Any, List
+
 from lexio._version import __version__
 
+if TYPE_CHECKING:
+    from lexio.types import (
+{imports}
+    )
+
 __all__ = [
 {all_list}
 ]
+
+_LAZY_TYPES = frozenset(__all__)
+
+
+def __getattr__(name: str) -> Any:
+    # import lexio.types on first access of one of its types
+    if name in _LAZY_TYPES:
+        from lexio import types
+
+        value = getattr(types, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {{__name__!r}} has no attribute {{name!r}}")
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | _LAZY_TYPES)
 '''
     
     # Get the path to the __init__.py file
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """
 Post-process the generated Pydantic models to fix type conversions.
-This script specifically replaces the complex Data model with a simple bytes type
-and replaces UUID with str.
+This script specifically replaces the complex Data model with a simple bytes type,
+replaces UUID with str, adds the lexio payload and highlight array types to Source
+and defers building the model schemas until first use.
 """
 
 import re
@@ -64,6 +65,50 @@ def post_process_types(file_path):
             'from typing import Annotated, Any, Union,'
         )
     
+    # 9. Accept zero-copy buffers and lazy file references in Source.data. BinaryData also
+    #    takes bytes, so all binary data is serialized to JSON as base64 in the same way
+    content = content.replace(
+        "data: Annotated[Optional[Union[str, bytes]], Field(title='data')]",
+        "data: Annotated[Optional[Union[str, BinaryData]], Field(title='data')]"
+    )
+    
+    # 10. Accept columnar highlight arrays in Source.highlights. The union is validated
+    #     left to right, which stops at the first matching member instead of trying all
+    #     of them. HighlightArray is iterable and has to come first, so it is not
+    #     converted into a list of PDFHighlight.
+    content = content.replace(
+        "Optional[Union[List[PDFHighlight], List[SpreadsheetHighlight]]],\n        Field(title='highlights'),",
+        "Optional[Union[HighlightArray, List[PDFHighlight], List[SpreadsheetHighlight]]],\n"
+        "        Field(title='highlights', union_mode='left_to_right'),"
+    )
+    
+    # 11. Import the lexio types used by steps 9 and 10
+    lexio_imports = [
+        'from lexio.highlights import HighlightArray',
+        'from lexio.payload import BinaryData',
+    ]
+    missing_imports = [line for line in lexio_imports if line not in content]
+    if missing_imports:
+        content = re.sub(
+            r'(from pydantic import [^\n]+\n)',
+            lambda match: match.group(1) + '\n' + '\n'.join(missing_imports) + '\n',
+            content,
+            count=1
+        )
+    
+    # 12. Defer building the model schemas until a model is used for the first time,
+    #     so that importing the types does not build every validator and serializer
+    if 'defer_build=True' not in content:
+        content = content.replace(
+            '    model_config = ConfigDict(\n',
+            '    model_config = ConfigDict(\n        defer_build=True,\n'
+        )
+        content = re.sub(
+            r'(class \w+\(RootModel\[[^\n]+\]\):\n)(    root: )',
+            r'\1    model_config = ConfigDict(\n        defer_build=True,\n    )\n\2',
+            content
+        )
+    
     # Write the modified content back to the file
     with open(file_path, 'w') as f:
         f.write(content)
@@ -0,0 +1,74 @@
+"""Tests for the lexio.types benchmark suite in benchmarks/bench_types.py."""
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+
+BENCHMARK_PATH = Path(__file__).parent.parent / "benchmarks" / "bench_types.py"
+
+
+@pytest.fixture(scope="module")
+def bench():
+    spec = importlib.util.spec_from_file_location("bench_types", BENCHMARK_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_cases_run(bench):
+    """Test that every case runs and produces a normalized time."""
+    cases = bench.make_cases()
+    results = bench.run(cases, scale=0.001)
+
+    assert set(results["cases"]) == set(cases)
+    assert all(result["normalized"] > 0 for result in results["cases"].values())
+
+
+def test_baseline_covers_all_cases(bench):
+    """Test that the persisted baseline contains every case."""
+    baseline = bench.load_baseline()
+
+    assert baseline is not None
+    assert set(bench.make_cases()) <= set(baseline["cases"])
+
+
+def test_compare_detects_regressions(bench):
+    """Test that only cases slower than the threshold are reported."""
+    baseline = {"cases": {"fast": {"normalized": 1.0}, "slow": {"normalized": 1.0}}}
+    results = {"cases": {"fast": {"normalized": 1.2}, "slow": {"normalized": 2.0}, "new": {"normalized": 5.0}}}
+
+    assert bench.compare(results, baseline, threshold=1.5) == ["slow"]
+
+
+def test_keep_best(bench):
+    """Test that the faster result of each case is kept."""
+    previous = {"cases": {"a": {"normalized": 1.0}, "b": {"normalized": 1.0}, "old": {"normalized": 3.0}}}
+    results = {"calibration_seconds": 0.1, "cases": {"a": {"normalized": 0.5}, "b": {"normalized": 2.0}}}
+
+    best = bench.keep_best(results, previous)
+
+    assert best["calibration_seconds"] == 0.1
+    assert best["cases"] == {"a": {"normalized": 0.5}, "b": {"normalized": 1.0}, "old": {"normalized": 3.0}}
+
+
+def test_compare_stored_results(bench, tmp_path):
+    """Test comparing two stored result files without measuring."""
+    baseline = {"calibration_seconds": 0.1, "cases": {"fast": {"seconds": 1.0, "normalized": 1.0}}}
+    bench.save_baseline(baseline, tmp_path / "base.json")
+    bench.save_baseline(baseline, tmp_path / "head.json")
+
+    assert bench.main(["--baseline", str(tmp_path / "base.json"), "--results", str(tmp_path / "head.json")]) == 0
+
+    slower = {"calibration_seconds": 0.1, "cases": {"fast": {"seconds": 2.0, "normalized": 2.0}}}
+    bench.save_baseline(slower, tmp_path / "head.json")
+
+    assert bench.main(["--baseline", str(tmp_path / "base.json"), "--results", str(tmp_path / "head.json")]) == 1
+
+
+@pytest.mark.skipif(not os.environ.get("LEXIO_BENCHMARK"), reason="set LEXIO_BENCHMARK=1 to run the benchmarks")
+def test_no_regression(bench):
+    """Run the full suite against the baseline, the threshold can be set with LEXIO_BENCHMARK_THRESHOLD."""
+    threshold = os.environ.get("LEXIO_BENCHMARK_THRESHOLD", str(bench.DEFAULT_THRESHOLD))
+
+    assert bench.main(["--threshold", threshold]) == 0
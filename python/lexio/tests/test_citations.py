@@ -0,0 +1,101 @@
+"""Tests for streaming citation extraction."""
+import time
+
+import pytest
+
+from lexio.citations import CitationExtractor, attach_citations
+from lexio.types import PDFHighlight, Rect, StreamChunk
+
+SOURCES = [
+    "The quick brown fox jumps over the lazy dog near the river bank.",
+    "Retrieval augmented generation combines a search index with a language model to answer questions.",
+]
+ANSWER = (
+    "As the documents say, retrieval augmented generation combines a search index with a language model. "
+    "Also, the quick brown fox jumps over the lazy dog."
+)
+
+
+def cited_text(answer, citation):
+    highlight = citation["messageHighlight"]
+    return answer[highlight["startChar"]:highlight["endChar"]]
+
+
+def feed_in_parts(extractor, text, size):
+    citations = []
+    for i in range(0, len(text), size):
+        citations += extractor.feed(text[i:i + size])
+    return citations + extractor.finish()
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_citations_are_independent_of_the_frames(size):
+    """Test that matches are found however the answer is split into frames."""
+    extractor = CitationExtractor(SOURCES)
+
+    citations = feed_in_parts(extractor, ANSWER, size)
+
+    assert extractor.text == ANSWER
+    assert [c["sourceIndex"] for c in citations] == [1, 0]
+    assert cited_text(ANSWER, citations[0]) == "retrieval augmented generation combines a search index with a language model"
+    assert cited_text(ANSWER, citations[1]) == "the quick brown fox jumps over the lazy dog"
+
+
+def test_short_matches_are_ignored():
+    extractor = CitationExtractor(SOURCES, min_words=6)
+
+    assert feed_in_parts(extractor, "the quick brown fox is fast", 5) == []
+    with pytest.raises(ValueError):
+        CitationExtractor(SOURCES, shingle_size=4, min_words=3)
+
+
+def test_source_ids_and_highlights():
+    """Test that source ids and the highlight of the matched source range are included."""
+    calls = []
+
+    def source_highlight(source, start, end):
+        calls.append(SOURCES[source][start:end])
+        return PDFHighlight(page=source + 1, rect=Rect(top=0.1, left=0.1, width=0.5, height=0.1))
+
+    extractor = CitationExtractor(SOURCES, source_highlight=source_highlight, source_ids=["a", "b"])
+    citations = feed_in_parts(extractor, ANSWER, 10)
+
+    assert [c["sourceId"] for c in citations] == ["b", "a"]
+    assert calls == [
+        "Retrieval augmented generation combines a search index with a language model",
+        "The quick brown fox jumps over the lazy dog",
+    ]
+    assert citations[0]["sourceHighlight"] == {"page": 2, "rect": {"top": 0.1, "left": 0.1, "width": 0.5, "height": 0.1}}
+
+
+@pytest.mark.asyncio
+async def test_attach_citations():
+    """Test that citations are attached to the chunks as they are found."""
+    async def chunks():
+        yield StreamChunk(content=ANSWER[:110])
+        yield StreamChunk(content=ANSWER[110:], done=True)
+
+    extractor = CitationExtractor(SOURCES)
+    result = [chunk async for chunk in attach_citations(chunks(), extractor)]
+
+    assert "".join(chunk.content for chunk in result) == ANSWER
+    assert len(result[0].citations) == 1
+    assert len(result[1].citations) == 1
+    assert result[1].done
+    assert result[1].model_dump(exclude_none=True)["citations"][0]["sourceIndex"] == 0
+
+
+def test_time_per_frame():
+    """Test that feeding a frame takes well below a millisecond with many large sources."""
+    words = [f"word{i % 5000}" for i in range(20000)]
+    sources = [" ".join(words[i:i + 2000]) for i in range(0, len(words), 2000)]
+    extractor = CitationExtractor(sources)
+    answer = " ".join(words[100:1100]) + " unrelated text " * 200
+    frames = [answer[i:i + 40] for i in range(0, len(answer), 40)]
+
+    start = time.perf_counter()
+    citations = [c for frame in frames for c in extractor.feed(frame)] + extractor.finish()
+    elapsed = time.perf_counter() - start
+
+    assert len(citations) == 1
+    assert elapsed / len(frames) < 1e-3
@@ -0,0 +1,124 @@
+"""Tests for the generated slotted mirror types in lexio.fast."""
+import pytest
+
+from lexio import fast
+from lexio.highlights import HighlightArray
+from lexio.payload import FileRef
+from lexio.sse import encode_chunk, encode_sources
+from lexio.types import Message, PDFHighlight, Rect, Source, SpreadsheetHighlight, StreamChunk
+
+SOURCE_ID = "12345678-1234-5678-1234-567812345678"
+
+
+def make_models():
+    return [
+        Source(
+            id=SOURCE_ID,
+            title="Document",
+            type="pdf",
+            relevance=0.5,
+            metadata={"page": 1, "nested": {"key": [1, 2]}},
+            highlights=[
+                PDFHighlight(page=1, rect=Rect(top=0.1, left=0.2, width=0.3, height=0.05)),
+                PDFHighlight(page=2, rect=Rect(top=0.5, left=0.0, width=1.0, height=0.5), highlightColorRgba="red"),
+            ],
+        ),
+        Source(id=SOURCE_ID, title="Sheet", type="xlsx", highlights=[SpreadsheetHighlight(sheetName="Sheet1", ranges=["A1:B2"])]),
+        Source(id=SOURCE_ID, title="Binary", type="pdf", data=b"%PDF-1.4"),
+        Message(id=SOURCE_ID, role="user", content="Hello", highlights=[{"color": "red", "text": "Hello"}]),
+        StreamChunk(content="Hello", done=False),
+        StreamChunk(sources=[Source(id=SOURCE_ID, title="Text", type="text", data="text")], citations=[{"sourceIndex": 0}]),
+        StreamChunk(),
+    ]
+
+
+@pytest.mark.parametrize("model", make_models())
+def test_roundtrip(model):
+    """Test lossless conversion to fast types and back."""
+    instance = getattr(fast, type(model).__name__).from_model(model)
+
+    assert isinstance(instance, fast.FastStruct)
+    assert instance.to_model() == model
+    assert instance.to_model(validate=True) == model
+    assert instance.to_json() == model.model_dump_json(exclude_none=True).encode()
+
+
+@pytest.mark.parametrize("model", make_models() + [Source(id=SOURCE_ID, title="Binary", type="pdf", data=b"\xff\x00")])
+def test_generic_to_dict(model):
+    """Test that the generic FastStruct.to_dict converts fields like the generated ones."""
+    instance = getattr(fast, type(model).__name__).from_model(model)
+
+    assert fast.FastStruct.to_dict(instance) == instance.to_dict()
+    assert fast.FastStruct.to_dict(instance, "json") == instance.to_dict("json")
+
+
+def test_construction_without_validation():
+    """Test that fast types are built without validation, validation happens in to_model."""
+    chunk = fast.StreamChunk(content="Hello", done=False)
+    assert chunk.to_json() == b'{"content":"Hello","done":false}'
+    assert chunk == fast.StreamChunk(content="Hello", done=False)
+    assert repr(chunk) == "StreamChunk(content='Hello', done=False)"
+
+    source = fast.Source(id="invalid", title="Text", type="unknown")
+    assert source.to_dict() == {"id": "invalid", "title": "Text", "type": "unknown"}
+    with pytest.raises(ValueError):
+        source.to_model(validate=True)
+
+    with pytest.raises(AttributeError):
+        chunk.unknown = 1
+
+
+def test_nested_fast_types():
+    """Test that nested fast types are converted to the nested pydantic models."""
+    source = fast.Source(
+        id=SOURCE_ID,
+        title="Document",
+        type="pdf",
+        highlights=[fast.PDFHighlight(page=1, rect=fast.Rect(top=0.1, left=0.2, width=0.3, height=0.05))],
+    )
+
+    model = source.to_model()
+
+    assert model == make_models()[0].model_copy(update={"relevance": None, "metadata": None, "highlights": model.highlights})
+    assert model.highlights == [PDFHighlight(page=1, rect=Rect(top=0.1, left=0.2, width=0.3, height=0.05))]
+    assert fast.encode_json([source]) == b"[" + source.to_json() + b"]"
+
+
+def test_binary_and_array_payloads(tmp_path):
+    """Test that lazy payloads and highlight arrays are kept and encoded like the models."""
+    np = pytest.importorskip("numpy")
+    path = tmp_path / "document.pdf"
+    path.write_bytes(b"%PDF-1.4 binary")
+    highlights = HighlightArray(np.array([1]), np.array([[0.1, 0.2, 0.3, 0.05]]))
+    model = Source(id=SOURCE_ID, title="Document", type="pdf", data=FileRef(path), highlights=highlights)
+
+    instance = fast.Source.from_model(model)
+
+    assert instance.data is model.data
+    assert instance.highlights is highlights
+    assert instance.to_json() == model.model_dump_json(exclude_none=True).encode()
+    assert instance.to_model().highlights is highlights
+
+
+def test_non_utf8_bytes():
+    """Test that binary bytes are encoded as base64 like the models and kept in python mode."""
+    data = b"%PDF-1.4\n\xe2\xe3\xcf\xd3\xff\x00"
+    model = Source(id=SOURCE_ID, title="Document", type="pdf", data=data)
+    instance = fast.Source(id=SOURCE_ID, title="Document", type="pdf", data=data)
+
+    assert instance.to_json() == model.model_dump_json(exclude_none=True).encode()
+    assert encode_sources([instance]) == encode_sources([model])
+    assert fast.encode_json(fast.StreamChunk(sources=[instance])) == StreamChunk(sources=[model]).model_dump_json(
+        exclude_none=True
+    ).encode()
+    assert instance.to_dict()["data"] == data
+    assert instance.to_dict("json") == model.model_dump(mode="json", exclude_none=True)
+
+
+def test_sse_encoders_accept_fast_types():
+    """Test that the SSE encoders produce the same frames for fast types."""
+    chunk = StreamChunk(content="Hello", done=True)
+    sources = make_models()[:3]
+
+    assert encode_chunk(fast.StreamChunk.from_model(chunk)) == encode_chunk(chunk)
+    assert encode_sources([fast.Source.from_model(source) for source in sources]) == encode_sources(sources)
@@ -0,0 +1,204 @@
+"""Tests for the columnar HighlightArray."""
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from lexio.highlights import HighlightArray, coalesce_highlights
+from lexio.types import PDFHighlight, Rect, Source
+
+SOURCE_ID = "12345678-1234-5678-1234-567812345678"
+
+
+def make_highlights():
+    return [
+        PDFHighlight(page=1, rect=Rect(top=0.1, left=0.2, width=0.3, height=0.05)),
+        PDFHighlight(page=2, rect=Rect(top=0.5, left=0.0, width=1.0, height=0.5), highlightColorRgba="rgba(255, 0, 0, 0.3)"),
+    ]
+
+
+def test_highlight_array_creation():
+    """Test creating a HighlightArray from arrays."""
+    highlights = HighlightArray([1, 2], [[0.1, 0.2, 0.3, 0.05], [0.5, 0.0, 1.0, 0.5]])
+
+    assert len(highlights) == 2
+    assert highlights.pages.dtype == np.int32
+    assert highlights.rects.shape == (2, 4)
+    assert highlights[1] == PDFHighlight(page=2, rect=Rect(top=0.5, left=0.0, width=1.0, height=0.5))
+    assert highlights[-1].page == 2
+
+
+def test_highlight_array_round_trip():
+    """Test converting from and to PDFHighlight models."""
+    highlights = make_highlights()
+    array = HighlightArray.from_highlights(highlights)
+
+    assert array.to_highlights() == highlights
+    assert array[0:1].to_highlights() == highlights[0:1]
+
+
+def test_highlight_array_validation():
+    """Test the vectorized validation of pages and rect bounds."""
+    with pytest.raises(ValueError, match="page must be >= 1"):
+        HighlightArray([1, 0], [[0, 0, 0.1, 0.1], [0, 0, 0.1, 0.1]])
+    with pytest.raises(ValueError, match="highlight 1: rect"):
+        HighlightArray([1, 1], [[0, 0, 0.1, 0.1], [0.5, 0.5, 0.6, 0.1]])
+    with pytest.raises(ValueError, match="highlight 0: rect"):
+        HighlightArray([1], [[0, 0, -0.1, 0.1]])
+    with pytest.raises(ValueError, match="highlight 0: rect"):
+        HighlightArray([1], [[np.nan, 0, 0.1, 0.1]])
+    with pytest.raises(ValueError, match="pages but"):
+        HighlightArray([1, 2], [[0, 0, 0.1, 0.1]])
+    with pytest.raises(ValueError, match="colors"):
+        HighlightArray([1], [[0, 0, 0.1, 0.1]], colors=["red", "blue"])
+
+    # validation can be skipped for trusted data
+    assert len(HighlightArray([0], [[0, 0, 2, 2]], validate=False)) == 1
+
+
+def test_highlight_array_from_bboxes():
+    """Test creating highlights from absolute span boxes."""
+    array = HighlightArray.from_bboxes(3, [[10, 20, 110, 40], [0, 0, 200, 400]], page_width=200, page_height=400)
+
+    assert array.pages.tolist() == [3, 3]
+    np.testing.assert_allclose(array.rects, [[0.05, 0.05, 0.5, 0.05], [0, 0, 1, 1]])
+
+
+def test_source_accepts_highlight_array():
+    """Test that Source.highlights accepts a HighlightArray and keeps it."""
+    array = HighlightArray.from_highlights(make_highlights())
+    source = Source(id=SOURCE_ID, title="Document", type="pdf", highlights=array)
+
+    assert source.highlights is array
+
+
+def test_highlight_array_serialization_matches_models():
+    """Test that a HighlightArray serializes like a list of PDFHighlight."""
+    highlights = make_highlights()
+    with_models = Source(id=SOURCE_ID, title="Document", type="pdf", highlights=highlights)
+    with_array = Source(id=SOURCE_ID, title="Document", type="pdf", highlights=HighlightArray.from_highlights(highlights))
+
+    expected = json.loads(with_models.model_dump_json(exclude_none=True))
+    assert json.loads(with_array.model_dump_json(exclude_none=True)) == expected
+    assert with_array.model_dump(exclude_none=True) == with_models.model_dump(exclude_none=True)
+
+    # a JSON round trip results in regular PDFHighlight models
+    parsed = Source.model_validate_json(with_array.model_dump_json())
+    assert parsed.highlights == highlights
+
+
+def test_highlight_array_equality():
+    """Test comparing highlight arrays."""
+    highlights = make_highlights()
+
+    assert HighlightArray.from_highlights(highlights) == HighlightArray.from_highlights(highlights)
+    assert HighlightArray.from_highlights(highlights) != HighlightArray.from_highlights(highlights[:1])
+
+
+def make_paragraphs(paragraphs=2, lines=10, words=8):
+    """Word rects laid out in paragraphs of lines, with small gaps between words and lines."""
+    rects = []
+    for paragraph in range(paragraphs):
+        for line in range(lines):
+            for word in range(words):
+                rects.append((0.1 + paragraph * 0.4 + line * 0.015, 0.1 + word * 0.045, 0.04, 0.012))
+    return HighlightArray([1] * len(rects), rects)
+
+
+def assert_covered(original, merged):
+    """Assert that every original rect lies within a merged rect on the same page."""
+    top, left, width, height = merged.rects.T
+    for page, (t, l, w, h) in zip(original.pages.tolist(), original.rects.tolist()):
+        inside = (
+            (merged.pages == page)
+            & (top <= t + 1e-12) & (left <= l + 1e-12)
+            & (top + height >= t + h - 1e-12) & (left + width >= l + w - 1e-12)
+        )
+        assert inside.any()
+
+
+def test_coalesce_lines():
+    """Test merging word rects into one rect per line."""
+    words = make_paragraphs()
+    lines = coalesce_highlights(words, level="line")
+
+    assert isinstance(lines, HighlightArray)
+    assert len(lines) == 20
+    np.testing.assert_allclose(lines.rects[0], [0.1, 0.1, 0.355, 0.012])
+    assert_covered(words, lines)
+
+
+def test_coalesce_blocks():
+    """Test merging word rects into one rect per paragraph."""
+    words = make_paragraphs()
+    blocks = coalesce_highlights(words, level="block")
+
+    assert len(blocks) == 2
+    np.testing.assert_allclose(blocks.rects[0], [0.1, 0.1, 0.355, 0.147])
+    assert_covered(words, blocks)
+
+
+def test_coalesce_blocks_of_columns():
+    """Test that the interleaved lines of a two-column page are merged into one block per column."""
+    rects = []
+    for line in range(3):
+        for column in range(2):
+            rects.append((0.1 + line * 0.015, 0.1 + column * 0.45, 0.35, 0.012))
+    lines = HighlightArray([1] * len(rects), rects)
+
+    blocks = coalesce_highlights(lines, level="block")
+
+    assert len(blocks) == 2
+    np.testing.assert_allclose(blocks.rects, [[0.1, 0.1, 0.35, 0.042], [0.1, 0.55, 0.35, 0.042]])
+    assert_covered(lines, blocks)
+
+    # a line spanning both columns below them joins both blocks
+    spanning = HighlightArray([1] * (len(rects) + 1), rects + [(0.145, 0.1, 0.8, 0.012)])
+    blocks = coalesce_highlights(spanning, level="block")
+    assert len(blocks) == 1
+    np.testing.assert_allclose(blocks.rects, [[0.1, 0.1, 0.8, 0.057]])
+
+
+def test_coalesce_keeps_pages_and_colors_apart():
+    """Test that rects on different pages or with different colors are not merged."""
+    rects = [(0.1, 0.1, 0.1, 0.01), (0.1, 0.2, 0.1, 0.01), (0.1, 0.3, 0.1, 0.01), (0.1, 0.4, 0.1, 0.01)]
+    highlights = HighlightArray([1, 1, 2, 2], rects, colors=["red", "blue", "red", "red"])
+
+    merged = coalesce_highlights(highlights)
+
+    assert merged.pages.tolist() == [1, 1, 2]
+    assert merged._color_list() == ["red", "blue", "red"]
+    assert_covered(highlights, merged)
+
+
+def test_coalesce_separates_distant_rects():
+    """Test that rects with a large gap on the same line stay separate."""
+    highlights = HighlightArray([1, 1], [(0.1, 0.1, 0.1, 0.01), (0.1, 0.6, 0.1, 0.01)])
+
+    assert len(coalesce_highlights(highlights)) == 2
+
+
+def test_coalesce_list_of_models():
+    """Test that a list of PDFHighlight models returns a list of models."""
+    merged = coalesce_highlights(make_highlights() + make_highlights())
+
+    assert len(merged) == len(make_highlights())
+    for highlight, expected in zip(merged, make_highlights()):
+        assert highlight.page == expected.page
+        assert highlight.rect.model_dump() == pytest.approx(expected.rect.model_dump())
+    assert coalesce_highlights([]) == []
+    with pytest.raises(ValueError):
+        coalesce_highlights(make_highlights(), level="page")
+
+
+def test_coalesce_many_rects():
+    """Test that random rects are always covered after merging."""
+    rng = np.random.default_rng(0)
+    rects = np.column_stack([rng.random((5000, 2)) * 0.9, rng.random((5000, 2)) * 0.05])
+    highlights = HighlightArray(rng.integers(1, 4, 5000), rects)
+
+    merged = coalesce_highlights(highlights, level="block")
+
+    assert len(merged) < len(highlights)
+    assert_covered(highlights[:500], merged)
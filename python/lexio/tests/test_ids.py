@@ -0,0 +1,75 @@
+"""Tests for deterministic source and chunk IDs."""
+import uuid
+
+import pytest
+
+from lexio.ids import LEXIO_NAMESPACE, chunk_ids, content_hash, is_valid_id, source_id, validate_id
+from lexio.types import Source
+
+
+def test_source_id_is_deterministic():
+    """Test that IDs only depend on document, content and position."""
+    first = source_id("docs/report.pdf", "text", 3)
+
+    assert first == source_id("docs/report.pdf", "text", 3)
+    assert first == source_id("docs/report.pdf", b"text", 3)
+    assert uuid.UUID(first).version == 5
+    assert len({
+        first,
+        source_id("docs/report.pdf"),
+        source_id("docs/report.pdf", "text"),
+        source_id("docs/report.pdf", "other text", 3),
+        source_id("docs/report.pdf", "text", 4),
+        source_id("docs/other.pdf", "text", 3),
+        source_id("docs/report.pdf", "text", 3, namespace=uuid.NAMESPACE_URL),
+    }) == 7
+
+
+def test_source_id_matches_uuid5():
+    """Test that IDs are regular uuid5 values of the lexio namespace."""
+    name = "docs/report.pdf\x00" + content_hash("text") + "\x003"
+
+    assert source_id("docs/report.pdf", "text", 3) == str(uuid.uuid5(LEXIO_NAMESPACE, name))
+
+
+def test_chunk_ids_match_source_id():
+    """Test that the batch generator returns the same IDs as source_id."""
+    contents = ["first chunk", "second chunk", b"binary", "", "äöü"]
+
+    ids = chunk_ids("docs/ümlaut.pdf", contents, start=10)
+
+    assert ids == [source_id("docs/ümlaut.pdf", content, 10 + i) for i, content in enumerate(contents)]
+    assert all(is_valid_id(chunk_id) for chunk_id in ids)
+    assert chunk_ids("docs/report.pdf", []) == []
+
+
+def test_ids_are_valid_source_ids():
+    """Test that generated IDs are accepted by Source."""
+    source = Source(id=source_id("docs/report.pdf"), title="Report", type="pdf")
+
+    assert source.id.root == source_id("docs/report.pdf")
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "12345678-1234-5678-1234-567812345678",  # variant bits are not RFC 4122
+        "8D1F50A6-4691-575E-A4E1-909EC844A671",  # upper case
+        "8d1f50a6-4691-575e-a4e1-909ec844a67",
+        "8d1f50a64691575ea4e1909ec844a671",
+        "a-b-c-d-e",
+        "",
+        None,
+    ],
+)
+def test_validate_id_rejects_invalid(value):
+    """Test that non-canonical UUIDs are rejected."""
+    assert not is_valid_id(value)
+    with pytest.raises(ValueError):
+        validate_id(value)
+
+
+def test_validate_id_accepts_uuids():
+    """Test that canonical UUIDs of all common versions are accepted."""
+    for value in (str(uuid.uuid4()), str(uuid.uuid1()), source_id("docs/report.pdf")):
+        assert validate_id(value) == value
@@ -0,0 +1,80 @@
+"""Tests and benchmark for the lazy `lexio` package import."""
+import json
+import subprocess
+import sys
+import textwrap
+
+import lexio
+
+
+def run_python(code: str) -> dict:
+    """Run code in a fresh interpreter and return the JSON it prints."""
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def test_import_does_not_load_types():
+    """Test that `import lexio` and `lexio.__version__` do not import pydantic or the types."""
+    result = run_python(
+        """
+        import json, sys
+        import lexio
+        lexio.__version__
+        print(json.dumps({"types": "lexio.types" in sys.modules, "pydantic": "pydantic" in sys.modules}))
+        """
+    )
+
+    assert result == {"types": False, "pydantic": False}
+
+
+def test_types_are_resolved_lazily():
+    """Test that exported types resolve to the classes in lexio.types."""
+    from lexio import types
+
+    for name in lexio.__all__:
+        assert getattr(lexio, name) is getattr(types, name)
+    assert set(lexio.__all__) <= set(dir(lexio))
+
+
+def test_unknown_attribute():
+    """Test that unknown attributes raise AttributeError."""
+    import pytest
+
+    with pytest.raises(AttributeError):
+        lexio.NotAType
+
+
+def test_model_build_is_deferred():
+    """Test that model schemas are built on first use only."""
+    result = run_python(
+        """
+        import json
+        from lexio import Source, StreamChunk
+        before = Source.__pydantic_complete__
+        Source(id="12345678-1234-5678-1234-567812345678", title="Title", type="text")
+        print(json.dumps({
+            "before": before,
+            "after": Source.__pydantic_complete__,
+            "unused": StreamChunk.__pydantic_complete__,
+        }))
+        """
+    )
+
+    assert result == {"before": False, "after": True, "unused": False}
+
+
+def test_import_time_benchmark():
+    """Benchmark `import lexio` against importing the types, best of 5 fresh interpreters."""
+    code = """
+        import json, time
+        start = time.perf_counter()
+        import {module}
+        print(json.dumps(time.perf_counter() - start))
+        """
+    lazy = min(run_python(code.format(module="lexio")) for _ in range(5))
+    eager = min(run_python(code.format(module="lexio.types")) for _ in range(5))
+
+    print(f"\nimport lexio: {lazy * 1000:.2f} ms, import lexio.types: {eager * 1000:.2f} ms")
+    assert lazy < eager
@@ -0,0 +1,118 @@
+"""Tests for the stage latency instrumentation."""
+import asyncio
+import re
+
+import pytest
+
+from lexio import instrumentation
+from lexio.instrumentation import (
+    STAGE_SECONDS,
+    STREAM_SECONDS,
+    TIME_TO_FIRST_TOKEN,
+    TOKENS_PER_SECOND,
+    VECTOR_SEARCH,
+    Histogram,
+    render_metrics,
+    request_start,
+    stage_timer,
+    track_tokens,
+)
+
+
+@pytest.fixture
+def metrics_enabled():
+    enabled = instrumentation.get_metrics_enabled()
+    instrumentation.set_metrics_enabled(True)
+    instrumentation.REGISTRY.reset()
+    yield
+    instrumentation.set_metrics_enabled(enabled)
+    instrumentation.REGISTRY.reset()
+
+
+async def generate(tokens, delay=0.0):
+    for token in tokens:
+        if delay:
+            await asyncio.sleep(delay)
+        yield token
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test that bucket counts are cumulative and +Inf, sum and count are exported."""
+    histogram = Histogram("test_seconds", "Test histogram.", buckets=(0.1, 1.0), label_names=("stage",))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "a")
+
+    text = histogram.render()
+
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="a",le="1.0"} 3' in text
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 4' in text
+    assert 'test_seconds_sum{stage="a"} 6.05' in text
+    assert 'test_seconds_count{stage="a"} 4' in text
+    assert histogram.count("a") == 4
+
+
+def test_histogram_validation():
+    """Test that unsorted buckets and wrong label values are rejected."""
+    with pytest.raises(ValueError):
+        Histogram("test", "Test.", buckets=(1.0, 0.1))
+    histogram = Histogram("test", "Test.", label_names=("stage",))
+    with pytest.raises(ValueError):
+        histogram.observe(1.0)
+
+
+def test_label_values_are_escaped():
+    histogram = Histogram("test", "Test.", label_names=("stage",))
+    histogram.observe(1.0, 'a "b"\\')
+    assert 'stage="a \\"b\\"\\\\"' in histogram.render()
+
+
+def test_disabled_is_noop():
+    """Test that nothing is recorded and streams are returned unchanged when disabled."""
+    instrumentation.set_metrics_enabled(False)
+    tokens = generate(["a"])
+
+    assert stage_timer(VECTOR_SEARCH) is stage_timer("other")
+    assert track_tokens(tokens) is tokens
+    assert request_start() is None
+    with stage_timer(VECTOR_SEARCH):
+        pass
+    assert STAGE_SECONDS.count(VECTOR_SEARCH) == 0
+
+
+def test_stage_timer(metrics_enabled):
+    with stage_timer(VECTOR_SEARCH):
+        pass
+    with pytest.raises(RuntimeError):
+        with stage_timer(VECTOR_SEARCH):
+            raise RuntimeError()
+
+    assert STAGE_SECONDS.count(VECTOR_SEARCH) == 2
+    assert 'lexio_stage_seconds_count{stage="vector_search"} 2' in render_metrics()
+
+
+@pytest.mark.asyncio
+async def test_track_tokens(metrics_enabled):
+    """Test that time-to-first-token, tokens/sec and the stream time are recorded."""
+    start = request_start()
+    tokens = [token async for token in track_tokens(generate(["a", "b", "c"], delay=0.01), start)]
+
+    assert tokens == ["a", "b", "c"]
+    assert TIME_TO_FIRST_TOKEN.count() == 1
+    assert TOKENS_PER_SECOND.count() == 1
+    assert STREAM_SECONDS.count() == 1
+    match = re.search(r"lexio_tokens_per_second_sum ([0-9.e+-]+)", render_metrics())
+    assert 0 < float(match.group(1)) < 1000
+
+
+@pytest.mark.asyncio
+async def test_track_tokens_closed_early(metrics_enabled):
+    """Test that the stream time is recorded when the client stops reading."""
+    stream = track_tokens(generate(["a", "b", "c"]))
+    async for _ in stream:
+        break
+    await stream.aclose()
+
+    assert TIME_TO_FIRST_TOKEN.count() == 1
+    assert STREAM_SECONDS.count() == 1
@@ -0,0 +1,70 @@
+"""Tests for parsing raw JSON payloads into lexio models."""
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from lexio.parsing import parse_sources_json, parse_sse_data, parse_stream_chunk
+from lexio.sse import encode_chunk, encode_content, encode_done, encode_sources
+from lexio.types import PDFHighlight, Rect, Source, StreamChunk
+
+SOURCE_ID = "12345678-1234-5678-1234-567812345678"
+
+
+def make_sources():
+    return [
+        Source(
+            id=SOURCE_ID,
+            title="Document",
+            type="pdf",
+            relevance=0.5,
+            metadata={"page": 1},
+            highlights=[PDFHighlight(page=1, rect=Rect(top=0.1, left=0.2, width=0.3, height=0.05))],
+        ),
+        Source(id=SOURCE_ID, title="Text", type="text", data="some text"),
+    ]
+
+
+def test_parse_sources_json():
+    """Test that parsing JSON bytes equals constructing the sources from dicts."""
+    sources = make_sources()
+    data = json.dumps([source.model_dump(exclude_none=True) for source in sources]).encode()
+
+    parsed = parse_sources_json(data)
+
+    assert parsed == [Source(**item) for item in json.loads(data)]
+    assert parsed == sources
+    assert parse_sources_json(data.decode()) == sources
+
+
+def test_parse_sources_json_invalid():
+    """Test that invalid JSON and invalid sources raise a ValidationError."""
+    with pytest.raises(ValidationError):
+        parse_sources_json(b"[{")
+    with pytest.raises(ValidationError):
+        parse_sources_json(b'[{"id": "invalid", "title": "Text", "type": "unknown"}]')
+
+
+def test_parse_stream_chunk():
+    """Test parsing content and sources chunks."""
+    assert parse_stream_chunk(b'{"content": "Hello", "done": false}') == StreamChunk(content="Hello", done=False)
+
+    chunk = parse_stream_chunk(b'{"sources": ' + json.dumps([make_sources()[1].model_dump(exclude_none=True)]).encode() + b"}")
+    assert chunk.sources == [make_sources()[1]]
+
+    with pytest.raises(ValidationError):
+        parse_stream_chunk(b'{"content": "Hello", "unknown": 1}')
+
+
+def test_parse_sse_data_roundtrip():
+    """Test that frames encoded by lexio.sse parse back to the same chunks."""
+    sources = make_sources()
+
+    assert parse_sse_data(encode_content("Hello")) == StreamChunk(content="Hello", done=False)
+    assert parse_sse_data(encode_done()) == StreamChunk(content="", done=True)
+    assert parse_sse_data(encode_sources(sources)).sources == sources
+    chunk = StreamChunk(content="Hi", done=True)
+    assert parse_sse_data(encode_chunk(chunk).decode()) == chunk
+
+    with pytest.raises(ValueError):
+        parse_sse_data(b"event: ping\n\n")
@@ -0,0 +1,138 @@
+"""Tests for zero-copy and lazy binary payloads in Source.data."""
+import base64
+import json
+import mmap
+
+import pytest
+
+from lexio.payload import FileRef, iter_base64, iter_source_json, source_json_size
+from lexio.sse import iter_sources
+from lexio.types import Source
+
+SOURCE_ID = "12345678-1234-5678-1234-567812345678"
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    """A file with 10000 bytes of binary content."""
+    path = tmp_path / "document.pdf"
+    path.write_bytes(bytes(range(256)) * 39 + bytes(16))
+    return path
+
+
+def test_source_accepts_memoryview_without_copy():
+    """Test that buffers are stored as memoryview over the same memory."""
+    buffer = bytearray(b"binary data")
+    source = Source(id=SOURCE_ID, title="Buffer", type="pdf", data=memoryview(buffer))
+
+    assert isinstance(source.data, memoryview)
+    buffer[0:6] = b"BINARY"
+    assert bytes(source.data) == b"BINARY data"
+
+
+def test_source_accepts_bytearray_and_mmap(pdf_file):
+    """Test that bytearray and mmap objects are wrapped in a memoryview."""
+    source = Source(id=SOURCE_ID, title="Buffer", type="pdf", data=bytearray(b"abc"))
+    assert isinstance(source.data, memoryview)
+
+    with open(pdf_file, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    source = Source(id=SOURCE_ID, title="Mapped", type="pdf", data=mapped)
+    assert isinstance(source.data, memoryview)
+    assert bytes(source.data) == pdf_file.read_bytes()
+
+
+def test_str_and_bytes_are_unchanged():
+    """Test that str and bytes data keep their type."""
+    assert isinstance(Source(id=SOURCE_ID, title="Text", type="text", data="text").data, str)
+    assert isinstance(Source(id=SOURCE_ID, title="Binary", type="pdf", data=b"bytes").data, bytes)
+
+
+def test_file_ref(pdf_file):
+    """Test reading a file reference and a byte range."""
+    ref = FileRef(pdf_file)
+    assert ref.size == 10000
+    assert ref.read_bytes() == pdf_file.read_bytes()
+
+    part = FileRef(pdf_file, offset=100, length=50)
+    assert part.size == 50
+    assert part.read_bytes() == pdf_file.read_bytes()[100:150]
+    assert bytes(part.open_buffer()) == pdf_file.read_bytes()[100:150]
+
+    with pytest.raises(ValueError):
+        FileRef(pdf_file, offset=-1)
+
+
+def test_source_accepts_file_ref(pdf_file):
+    """Test that a FileRef is kept lazily and serialized as base64 in JSON."""
+    ref = FileRef(pdf_file)
+    source = Source(id=SOURCE_ID, title="Document", type="pdf", data=ref)
+
+    assert source.data is ref
+    assert source.model_dump()["data"] is ref
+    assert json.loads(source.model_dump_json())["data"] == base64.b64encode(pdf_file.read_bytes()).decode()
+
+
+@pytest.mark.parametrize("block_size", [3, 4, 1000, 4096, 1 << 20])
+def test_iter_base64_matches_b64encode(pdf_file, block_size):
+    """Test that block-wise encoding concatenates to the regular base64 string."""
+    data = pdf_file.read_bytes()
+    expected = base64.b64encode(data)
+
+    assert b"".join(iter_base64(data, block_size)) == expected
+    assert b"".join(iter_base64(memoryview(data), block_size)) == expected
+    assert b"".join(iter_base64(FileRef(pdf_file), block_size)) == expected
+
+
+def test_iter_source_json(pdf_file):
+    """Test streaming a source with binary data as JSON."""
+    source = Source(id=SOURCE_ID, title="Document", type="pdf", metadata={"page": 1}, data=FileRef(pdf_file))
+
+    fragments = list(iter_source_json(source, block_size=999))
+    document = b"".join(fragments)
+    parsed = json.loads(document)
+
+    assert len(fragments) > 3
+    assert base64.b64decode(parsed["data"]) == pdf_file.read_bytes()
+    assert parsed["title"] == "Document"
+    assert parsed["metadata"] == {"page": 1}
+    assert "description" not in parsed
+    assert source_json_size(source) == len(document)
+
+
+def test_iter_source_json_without_binary_data():
+    """Test that sources without binary data are serialized in one piece."""
+    source = Source(id=SOURCE_ID, title="Text", type="text", data="some text")
+
+    assert list(iter_source_json(source)) == [source.model_dump_json(exclude_none=True).encode()]
+    assert source_json_size(source) == len(source.model_dump_json(exclude_none=True))
+
+
+def test_bytes_are_base64_in_all_json_paths():
+    """Test that bytes, also valid UTF-8 bytes, are encoded the same by all JSON serializers."""
+    from lexio.sse import encode_sources
+
+    for data in (b"abc", b"%PDF-1.4", bytes(range(256))):
+        source = Source(id=SOURCE_ID, title="Document", type="pdf", data=data)
+        expected = base64.b64encode(data).decode("ascii")
+
+        dumped = source.model_dump_json(exclude_none=True).encode()
+        assert json.loads(dumped)["data"] == expected
+        assert b"".join(iter_source_json(source)) == dumped
+        assert b"".join(iter_sources([source])) == encode_sources([source])
+        assert source.model_dump()["data"] == data
+
+
+def test_iter_sources_frame(pdf_file):
+    """Test streaming an SSE sources frame."""
+    sources = [
+        Source(id=SOURCE_ID, title="Document", type="pdf", data=FileRef(pdf_file)),
+        Source(id=SOURCE_ID, title="Text", type="text"),
+    ]
+
+    frame = b"".join(iter_sources(sources, block_size=3000))
+
+    assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+    parsed = json.loads(frame[len(b"data: "):-2])
+    assert base64.b64decode(parsed["sources"][0]["data"]) == pdf_file.read_bytes()
+    assert parsed["sources"][1] == {"id": SOURCE_ID, "title": "Text", "type": "text"}
@@ -0,0 +1,109 @@
+"""Tests for parsing and merging A1 ranges."""
+import random
+
+import pytest
+
+from lexio.ranges import (
+    MAX_COLUMN,
+    MAX_ROW,
+    CellRange,
+    RangeSet,
+    column_index,
+    column_name,
+    compact_highlights,
+    compact_ranges,
+    format_range,
+    parse_range,
+)
+from lexio.types import SpreadsheetHighlight
+
+
+def cells(rects):
+    return {(row, column) for r in rects for row in range(r[0], r[2] + 1) for column in range(r[1], r[3] + 1)}
+
+
+def test_column_names():
+    for index, name in [(1, "A"), (26, "Z"), (27, "AA"), (28, "AB"), (702, "ZZ"), (703, "AAA"), (MAX_COLUMN, "XFD")]:
+        assert column_index(name) == index
+        assert column_name(index) == name
+    assert column_index("ab") == 28
+    for invalid in ["", "A1", "XFE"]:
+        with pytest.raises(ValueError):
+            column_index(invalid)
+    with pytest.raises(ValueError):
+        column_name(0)
+
+
+def test_parse_and_format():
+    assert parse_range("B2:D10") == CellRange(2, 2, 10, 4)
+    assert parse_range("D10:B2") == CellRange(2, 2, 10, 4)
+    assert parse_range("$A$1:$B$2") == CellRange(1, 1, 2, 2)
+    assert parse_range("C3") == CellRange(3, 3, 3, 3)
+    assert parse_range("A:C") == CellRange(1, 1, MAX_ROW, 3)
+    assert parse_range("3:5") == CellRange(3, 1, 5, MAX_COLUMN)
+
+    for value in ["B2:D10", "C3", "A:C", "3:5"]:
+        assert format_range(parse_range(value)) == value
+    for invalid in ["", "A", "3", "A1:B", "A0", "1A", "A1:B2:C3", "A1048577"]:
+        with pytest.raises(ValueError):
+            parse_range(invalid)
+
+
+def test_merge_rows_into_one_range():
+    """Test that adjacent per-row ranges are merged into one range."""
+    ranges = [f"A{row}:F{row}" for row in range(1, 100001)]
+
+    assert compact_ranges(ranges) == ["A1:F100000"]
+
+
+def test_merge_overlapping_and_adjacent():
+    assert compact_ranges(["A1:B2", "B2:C3"]) == ["A1:A2", "B1:B3", "C2:C3"]
+    assert compact_ranges(["A1:B2", "C1:D2"]) == ["A1:D2"]
+    assert compact_ranges(["A1:A3", "C1:C3"]) == ["A1:A3", "C1:C3"]
+    assert compact_ranges(["C3", "C3:C3", "C3"]) == ["C3"]
+    assert compact_ranges([]) == []
+
+
+def test_merge_is_exact_cover():
+    """Test that random ranges are merged into disjoint rects covering exactly the same cells."""
+    rng = random.Random(0)
+    rects = []
+    for _ in range(200):
+        row, column = rng.randint(1, 60), rng.randint(1, 20)
+        rects.append(CellRange(row, column, row + rng.randint(0, 8), column + rng.randint(0, 4)))
+
+    ranges = RangeSet(format_range(r) for r in rects)
+    merged = list(ranges)
+
+    assert cells(merged) == cells(rects)
+    assert sum(r.cell_count for r in merged) == len(cells(rects)) == ranges.cell_count
+    assert len(merged) < len(rects)
+    assert RangeSet(ranges.to_ranges()) == ranges
+
+
+def test_containment():
+    ranges = RangeSet(["A1:C3", "D1:D2", "B10:B20", "F:F"])
+
+    assert "B2" in ranges
+    assert "A1:D2" in ranges
+    assert "A1:D3" not in ranges
+    assert "B12:B15" in ranges
+    assert "B9:B11" not in ranges
+    assert "F1000:F2000" in ranges
+    assert not ranges.contains_cell(4, 1)
+    assert ranges.contains_cell(20, 2)
+    assert not ranges.contains_cell(1, 5)
+    assert "A1" not in RangeSet()
+
+
+def test_compact_highlights():
+    highlights = [
+        SpreadsheetHighlight(sheetName="Sheet1", ranges=["A1:B1", "A2:B2"]),
+        SpreadsheetHighlight(sheetName="Sheet2", ranges=["C3"]),
+        SpreadsheetHighlight(sheetName="Sheet1", ranges=["A3:B3"]),
+    ]
+
+    assert compact_highlights(highlights) == [
+        SpreadsheetHighlight(sheetName="Sheet1", ranges=["A1:B3"]),
+        SpreadsheetHighlight(sheetName="Sheet2", ranges=["C3"]),
+    ]
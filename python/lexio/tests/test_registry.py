@@ -0,0 +1,91 @@
+"""Tests for the per-session source registry."""
+import json
+
+import pytest
+
+from lexio import fast
+from lexio.registry import SourceRegistry
+from lexio.sse import encode_chunk
+from lexio.types import Source, StreamChunk
+
+SOURCE_IDS = [f"12345678-1234-5678-1234-56781234567{i}" for i in range(10)]
+
+
+def make_source(i, relevance=0.5):
+    return Source(
+        id=SOURCE_IDS[i], title=f"Document {i}", type="text", relevance=relevance,
+        description="a long chunk text " * 100, metadata={"page": i},
+    )
+
+
+def test_repeated_sources_become_references():
+    """Test that sources sent before are replaced by id-only references."""
+    registry = SourceRegistry()
+
+    first = registry.register("session", [make_source(0), make_source(1)])
+    second = registry.register("session", [make_source(1, relevance=0.9), make_source(2)])
+
+    assert first == [make_source(0), make_source(1)]
+    assert second[1] == make_source(2)
+    reference = second[0]
+    assert isinstance(reference, Source)
+    assert reference.model_dump(exclude_none=True) == {
+        "id": SOURCE_IDS[1], "title": "Document 1", "type": "text", "relevance": 0.9,
+    }
+    # references are valid protocol frames
+    frame = encode_chunk(StreamChunk(sources=second))
+    data = json.loads(frame[len(b"data: "):])
+    assert data["sources"][0] == {"id": SOURCE_IDS[1], "title": "Document 1", "type": "text", "relevance": 0.9}
+
+
+def test_sessions_are_separate():
+    registry = SourceRegistry()
+    registry.register("a", [make_source(0)])
+
+    assert registry.register("b", [make_source(0)]) == [make_source(0)]
+    assert registry.get("a", SOURCE_IDS[0]) == make_source(0)
+    assert registry.get("c", SOURCE_IDS[0]) is None
+
+
+def test_dicts_and_fast_structs():
+    registry = SourceRegistry(reference_fields=("score",))
+    chunk = {"id": "chunk-1", "text": "long text", "score": 0.3}
+    fast_source = fast.Source.from_model(make_source(3))
+
+    registry.register("session", [chunk, fast_source])
+    references = registry.register("session", [dict(chunk, score=0.7), fast_source])
+
+    assert references[0] == {"id": "chunk-1", "score": 0.7}
+    assert references[1] == fast.Source(id=SOURCE_IDS[3], title="Document 3", type="text")
+
+
+def test_lru_bounds():
+    """Test that the least recently used sessions and sources are evicted."""
+    registry = SourceRegistry(max_sessions=2, max_sources_per_session=2)
+    registry.register("a", [make_source(0)])
+    registry.register("b", [make_source(0)])
+    registry.get("a", SOURCE_IDS[0])
+    registry.register("c", [make_source(0)])
+
+    assert "a" in registry and "c" in registry and "b" not in registry
+    assert len(registry) == 2
+
+    registry.register("a", [make_source(1), make_source(2)])
+    # source 0 was evicted and is sent in full again
+    assert registry.register("a", [make_source(0)]) == [make_source(0)]
+
+    with pytest.raises(ValueError):
+        SourceRegistry(max_sessions=0)
+
+
+def test_resolve_and_forget():
+    registry = SourceRegistry()
+    registry.register("session", [make_source(0), make_source(1)])
+
+    found, missing = registry.resolve("session", [SOURCE_IDS[1], SOURCE_IDS[5]])
+
+    assert found == [make_source(1)]
+    assert missing == [SOURCE_IDS[5]]
+    registry.forget("session")
+    assert "session" not in registry
+    assert registry.resolve("session", [SOURCE_IDS[0]]) == ([], [SOURCE_IDS[0]])
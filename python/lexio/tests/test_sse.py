@@ -0,0 +1,67 @@
+"""Tests for the SSE frame encoders."""
+import json
+
+from lexio.sse import encode_chunk, encode_content, encode_done, encode_frame, encode_sources
+from lexio.types import PDFHighlight, Rect, Source, StreamChunk
+
+
+def _parse_frame(frame: bytes) -> dict:
+    """Parse a single `data: ...\\n\\n` frame back into a dict."""
+    assert frame.startswith(b"data: ")
+    assert frame.endswith(b"\n\n")
+    payload = frame[len(b"data: "):-2]
+    assert b"\n" not in payload
+    return json.loads(payload)
+
+
+def test_encode_frame():
+    """Test wrapping a raw payload."""
+    assert encode_frame(b'{"a":1}') == b'data: {"a":1}\n\n'
+
+
+def test_encode_content_matches_json_dumps():
+    """Test that the token fast path produces the same payload as the dict path."""
+    for token in ["Hello", " world", 'with "quotes"', "line\nbreak", "tab\t", "ümläut", " ", ""]:
+        frame = encode_content(token)
+        assert _parse_frame(frame) == json.loads(json.dumps({"content": token, "done": False}))
+
+
+def test_encode_content_matches_encode_chunk():
+    """Test that the fast path matches the generic StreamChunk encoder."""
+    assert encode_content("token") == encode_chunk(StreamChunk(content="token", done=False))
+
+
+def test_encode_done():
+    """Test the final frame with and without trailing content."""
+    assert _parse_frame(encode_done()) == {"content": "", "done": True}
+    assert _parse_frame(encode_done("bye")) == {"content": "bye", "done": True}
+
+
+def test_encode_chunk_excludes_none():
+    """Test that optional fields which are not set are omitted."""
+    frame = encode_chunk(StreamChunk(done=True))
+    assert _parse_frame(frame) == {"done": True}
+
+
+def test_encode_sources():
+    """Test that the sources frame matches model_dump(exclude_none=True)."""
+    sources = [
+        Source(
+            id="12345678-1234-5678-1234-567812345678",
+            title="Example Document",
+            type="pdf",
+            relevance=0.5,
+            metadata={"page": 2},
+            highlights=[PDFHighlight(page=2, rect=Rect(top=0.1, left=0.1, width=0.5, height=0.1))],
+        ),
+        Source(id="12345678-1234-5678-1234-567812345679", title="Text", type="text", data="some text"),
+    ]
+
+    parsed = _parse_frame(encode_sources(sources))
+
+    assert parsed == {"sources": [source.model_dump(exclude_none=True) for source in sources]}
+
+
+def test_encode_sources_empty():
+    """Test encoding an empty list of sources."""
+    assert _parse_frame(encode_sources([])) == {"sources": []}
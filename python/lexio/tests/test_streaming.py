@@ -0,0 +1,90 @@
+"""Tests for coalescing generated tokens into StreamChunks."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from lexio.streaming import coalesce_tokens, iterate_in_thread
+from lexio.types import StreamChunk
+
+
+async def generate(tokens, delay=0.0):
+    """Yield tokens with a delay before each token."""
+    for token in tokens:
+        if delay:
+            await asyncio.sleep(delay)
+        yield token
+
+
+async def collect(iterator):
+    return [chunk async for chunk in iterator]
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_coalesced():
+    """Test that fast tokens are combined and the content is preserved."""
+    tokens = [f"token{i} " for i in range(100)]
+
+    chunks = await collect(coalesce_tokens(generate(tokens), window=10.0))
+
+    assert chunks[0] == StreamChunk(content="token0 ", done=False)
+    assert chunks[-1].done is True
+    assert all(chunk.done is False for chunk in chunks[:-1])
+    assert "".join(chunk.content for chunk in chunks) == "".join(tokens)
+    assert len(chunks) == 2
+
+
+@pytest.mark.asyncio
+async def test_byte_budget_flushes():
+    """Test that the buffer is sent as soon as it reaches the byte budget."""
+    tokens = ["ab"] * 21
+
+    chunks = await collect(coalesce_tokens(generate(tokens), window=10.0, max_bytes=10))
+
+    assert [chunk.content for chunk in chunks] == ["ab"] + ["ababababab"] * 4 + [""]
+    assert chunks[-1].done is True
+
+
+@pytest.mark.asyncio
+async def test_window_flushes_slow_streams():
+    """Test that buffered tokens are sent when the window expires before the next token."""
+    chunks = await collect(coalesce_tokens(generate(["a", "b", "c"], delay=0.05), window=0.01))
+
+    assert [(chunk.content, chunk.done) for chunk in chunks] == [("a", False), ("b", False), ("c", True)]
+
+
+@pytest.mark.asyncio
+async def test_empty_and_skipped_tokens():
+    """Test empty streams and empty tokens."""
+    assert await collect(coalesce_tokens(generate([]))) == [StreamChunk(content="", done=True)]
+
+    chunks = await collect(coalesce_tokens(generate(["", "a", "", "b"]), window=10.0))
+    assert chunks == [StreamChunk(content="a", done=False), StreamChunk(content="b", done=True)]
+
+
+@pytest.mark.asyncio
+async def test_invalid_arguments():
+    """Test that invalid window and byte budget are rejected."""
+    with pytest.raises(ValueError):
+        await collect(coalesce_tokens(generate(["a"]), window=-1))
+    with pytest.raises(ValueError):
+        await collect(coalesce_tokens(generate(["a"]), max_bytes=0))
+
+
+@pytest.mark.asyncio
+async def test_iterate_in_thread():
+    """Test that a blocking iterator is consumed without blocking the event loop."""
+    main_thread = threading.get_ident()
+    threads = set()
+
+    def blocking_tokens():
+        for token in ["a", "b", "c"]:
+            threads.add(threading.get_ident())
+            time.sleep(0.01)
+            yield token
+
+    chunks = await collect(coalesce_tokens(iterate_in_thread(blocking_tokens()), window=10.0))
+
+    assert "".join(chunk.content for chunk in chunks) == "abc"
+    assert main_thread not in threads
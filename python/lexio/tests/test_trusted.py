@@ -0,0 +1,136 @@
+"""Tests for the trusted construction builders."""
+import pytest
+from pydantic import ValidationError
+from lexio.trusted import (
+    get_validate_trusted,
+    set_validate_trusted,
+    trusted_highlights,
+    trusted_rect,
+    trusted_source,
+    trusted_sources,
+)
+from lexio.types import PDFHighlight, Rect, Source, SpreadsheetHighlight
+
+SOURCE_ROW = {
+    "id": "12345678-1234-5678-1234-567812345678",
+    "title": "Example Document",
+    "type": "pdf",
+    "relevance": 0.5,
+    "metadata": {"page": 2, "_page": 2},
+    "highlights": [
+        {"page": 2, "rect": {"top": 0.1, "left": 0.2, "width": 0.3, "height": 0.05}},
+        {"page": 3, "rect": {"top": 0.4, "left": 0.2, "width": 0.3, "height": 0.05}, "highlightColorRgba": "rgba(0, 0, 0, 0.3)"},
+    ],
+}
+
+
+@pytest.fixture
+def restore_validate_trusted():
+    """Restore the global validation switch after the test."""
+    previous = get_validate_trusted()
+    yield
+    set_validate_trusted(previous)
+
+
+def test_trusted_source_matches_validated_source():
+    """Test that a trusted source equals and serializes like a validated one."""
+    trusted = trusted_source(SOURCE_ROW, validate=False)
+    validated = Source.model_validate(SOURCE_ROW)
+
+    assert isinstance(trusted.highlights[0], PDFHighlight)
+    assert isinstance(trusted.highlights[0].rect, Rect)
+    assert trusted.id.root == validated.id.root
+    assert trusted.model_dump() == validated.model_dump()
+    assert trusted.model_dump_json(exclude_none=True) == validated.model_dump_json(exclude_none=True)
+    assert trusted.model_fields_set == validated.model_fields_set
+
+
+def test_trusted_sources_bulk():
+    """Test building a list of sources."""
+    rows = [dict(SOURCE_ROW, title=f"Document {i}") for i in range(5)]
+    sources = trusted_sources(rows, validate=False)
+
+    assert [s.title for s in sources] == [f"Document {i}" for i in range(5)]
+    assert all(isinstance(s, Source) for s in sources)
+
+
+def test_trusted_source_keeps_models():
+    """Test that nested model instances are kept as they are."""
+    highlight = PDFHighlight(page=1, rect=Rect(top=0, left=0, width=1, height=1))
+    source = trusted_source(dict(SOURCE_ROW, highlights=[highlight]), validate=False)
+
+    assert source.highlights[0] is highlight
+
+
+def test_trusted_spreadsheet_highlights():
+    """Test that mappings with a sheetName become SpreadsheetHighlights."""
+    highlights = trusted_highlights([{"sheetName": "Sheet1", "ranges": ["A1:B5"]}], validate=False)
+
+    assert isinstance(highlights[0], SpreadsheetHighlight)
+    assert highlights[0].ranges == ["A1:B5"]
+
+
+def test_trusted_rect():
+    """Test creating a single rect."""
+    rect = trusted_rect({"top": 1, "left": 2, "width": 3, "height": 4}, validate=False)
+
+    assert rect == Rect(top=1, left=2, width=3, height=4)
+
+
+def test_trusted_mode_skips_validation():
+    """Test that invalid data passes in trusted mode."""
+    source = trusted_source(dict(SOURCE_ROW, relevance=5.0), validate=False)
+
+    assert source.relevance == 5.0
+
+
+def test_validate_argument():
+    """Test that validate=True runs the regular validation."""
+    with pytest.raises(ValidationError):
+        trusted_source(dict(SOURCE_ROW, relevance=5.0), validate=True)
+    with pytest.raises(ValidationError):
+        trusted_highlights([{"page": 0, "rect": {"top": 0, "left": 0, "width": 1, "height": 1}}], validate=True)
+    with pytest.raises(ValidationError):
+        trusted_rect({"top": 0, "left": 0, "width": 1}, validate=True)
+
+
+def test_global_validation_switch(restore_validate_trusted):
+    """Test that the debug switch enables validation in all builders."""
+    set_validate_trusted(True)
+
+    assert get_validate_trusted() is True
+    with pytest.raises(ValidationError):
+        trusted_sources([dict(SOURCE_ROW, unknown="field")])
+
+    set_validate_trusted(False)
+
+    assert trusted_sources([dict(SOURCE_ROW, relevance=5.0)])[0].relevance == 5.0
+
+
+def test_trusted_nested_models_skip_checks():
+    """Test that nested models are constructed without checking their values."""
+    row = dict(SOURCE_ROW, highlights=[{"page": 0, "rect": {"top": -1, "left": 0, "width": 1, "height": 1}}])
+    source = trusted_source(row, validate=False)
+
+    assert isinstance(source.highlights[0], PDFHighlight)
+    assert isinstance(source.highlights[0].rect, Rect)
+    assert source.highlights[0].page == 0
+    assert source.highlights[0].rect.top == -1
+    assert source.highlights[0].model_fields_set == {"page", "rect"}
+
+
+def test_trusted_source_drops_unknown_keys():
+    """Test that unknown keys are dropped instead of rejected."""
+    source = trusted_source(dict(SOURCE_ROW, unknown="field"), validate=False)
+
+    assert source.model_dump() == Source.model_validate(SOURCE_ROW).model_dump()
+
+
+def test_trusted_source_spreadsheet_highlights():
+    """Test that nested highlights become the model whose required fields they have."""
+    source = trusted_source(
+        dict(SOURCE_ROW, type="xlsx", highlights=[{"sheetName": "Sheet1", "ranges": ["A1:B5"]}]), validate=False
+    )
+
+    assert isinstance(source.highlights[0], SpreadsheetHighlight)
+    assert source.model_dump_json() == Source.model_validate(source.model_dump()).model_dump_json()
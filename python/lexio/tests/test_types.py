@@ -177,8 +177,8 @@ def test_source_data_union_type():
     annotations = getattr(SourceClass, "__annotations__", {})
     data_type = annotations.get("data", None)
     
-    # Check if it's a Union type with str and bytes
-    assert "Union" in str(data_type) and "str" in str(data_type) and "bytes" in str(data_type)
+    # Check if it's a Union type with str and the binary type, which also accepts bytes
+    assert "Union" in str(data_type) and "str" in str(data_type) and "BinaryData" in str(data_type)
 
 
 def test_uuid_validation():
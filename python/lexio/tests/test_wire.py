@@ -0,0 +1,113 @@
+"""Tests for the optional MessagePack wire encoding."""
+import json
+from typing import List
+
+import pytest
+
+msgpack = pytest.importorskip("msgpack")
+
+from lexio import fast  # noqa: E402
+from lexio.payload import FileRef  # noqa: E402
+from lexio.types import PDFHighlight, Rect, Source, StreamChunk  # noqa: E402
+from lexio.wire import (  # noqa: E402
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    decode_msgpack,
+    encode,
+    encode_msgpack,
+    iter_msgpack_stream,
+    negotiate,
+)
+
+SOURCE_ID = "12345678-1234-5678-1234-567812345678"
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 40
+
+
+def make_sources():
+    return [
+        Source(
+            id=SOURCE_ID,
+            title="Document",
+            type="pdf",
+            data=PDF,
+            highlights=[PDFHighlight(page=1, rect=Rect(top=0.1, left=0.2, width=0.3, height=0.05))],
+        ),
+        Source(id=SOURCE_ID, title="Text", type="text", data="some text", relevance=0.5),
+    ]
+
+
+def test_roundtrip_sources():
+    """Test that sources survive the round trip and binary data is sent raw."""
+    sources = make_sources()
+
+    encoded = encode_msgpack(sources)
+
+    assert decode_msgpack(encoded, List[Source]) == sources
+    assert decode_msgpack(encoded)[0]["data"] == PDF
+    assert "description" not in decode_msgpack(encoded)[0]
+    # raw bytes instead of base64
+    assert len(encoded) < len(sources[0].model_dump_json(exclude_none=True))
+    assert len(encoded) < len(PDF) * 1.05
+
+
+def test_roundtrip_stream_chunk_and_fast_types():
+    """Test stream chunks and fast types."""
+    chunk = StreamChunk(content="Hello", done=False)
+
+    assert decode_msgpack(encode_msgpack(chunk), StreamChunk) == chunk
+    assert encode_msgpack(fast.StreamChunk.from_model(chunk)) == encode_msgpack(chunk)
+    fast_source = fast.Source.from_model(make_sources()[0])
+    assert decode_msgpack(encode_msgpack(fast_source), Source) == make_sources()[0]
+
+
+def test_buffers_and_file_refs(tmp_path):
+    """Test that memoryviews and file references are sent as raw bytes."""
+    path = tmp_path / "document.pdf"
+    path.write_bytes(PDF)
+    sources = [
+        Source(id=SOURCE_ID, title="Mapped", type="pdf", data=memoryview(bytearray(PDF))),
+        Source(id=SOURCE_ID, title="File", type="pdf", data=FileRef(path)),
+    ]
+
+    decoded = decode_msgpack(encode_msgpack(sources), List[Source])
+
+    assert [source.data for source in decoded] == [PDF, PDF]
+
+
+def test_iter_msgpack_stream():
+    """Test decoding a stream of objects split at arbitrary positions."""
+    chunks = [StreamChunk(sources=make_sources())] + [StreamChunk(content=f"token {i}", done=False) for i in range(10)]
+    stream = b"".join(encode_msgpack(chunk) for chunk in chunks)
+    pieces = [stream[i:i + 100] for i in range(0, len(stream), 100)]
+
+    assert list(iter_msgpack_stream(pieces, StreamChunk)) == chunks
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, JSON_MEDIA_TYPE),
+        ("", JSON_MEDIA_TYPE),
+        ("*/*", JSON_MEDIA_TYPE),
+        ("application/json", JSON_MEDIA_TYPE),
+        ("application/vnd.msgpack", MSGPACK_MEDIA_TYPE),
+        ("application/x-msgpack, application/json;q=0.5", MSGPACK_MEDIA_TYPE),
+        ("application/json, application/vnd.msgpack;q=0.9", JSON_MEDIA_TYPE),
+        ("application/vnd.msgpack;q=0, */*", JSON_MEDIA_TYPE),
+        ("application/vnd.msgpack;q=invalid", JSON_MEDIA_TYPE),
+    ],
+)
+def test_negotiate(accept, expected):
+    """Test that MessagePack is only chosen when the client prefers it."""
+    assert negotiate(accept) == expected
+
+
+def test_encode_json_is_default():
+    """Test that the JSON encoding matches the model serialization."""
+    sources = make_sources()
+
+    body = encode(sources)
+
+    assert json.loads(body) == [json.loads(source.model_dump_json(exclude_none=True)) for source in sources]
+    assert encode(sources, MSGPACK_MEDIA_TYPE) == encode_msgpack(sources)
+    assert encode(fast.StreamChunk(content="Hi")) == b'{"content":"Hi"}'
@@ -0,0 +1,105 @@
+"""Tests for mapping character ranges to PDF highlights with the word index."""
+import pytest
+
+pytest.importorskip("numpy")
+
+from lexio.types import PDFHighlight  # noqa: E402
+from lexio.word_index import WordIndex  # noqa: E402
+
+WIDTH = 100.0
+HEIGHT = 200.0
+
+
+def make_index():
+    # page 1: two lines with two words each, page 2: one line
+    return WordIndex.from_pages([
+        (1, WIDTH, HEIGHT, [
+            (10, 20, 30, 30, "hello"),
+            (32, 20, 50, 30, "world"),
+            (10, 40, 30, 50, "second"),
+            (30, 40, 32, 50, " "),
+            (32, 40, 60, 50, "line"),
+        ]),
+        (2, WIDTH, HEIGHT, [
+            (10, 20, 40, 30, "next", 0, 0, 0),
+            (42, 20, 60, 30, "page", 0, 0, 1),
+        ]),
+    ])
+
+
+def test_text_and_offsets():
+    """Test that words are joined by single spaces and empty words are skipped."""
+    index = make_index()
+
+    assert index.text == "hello world second line next page"
+    assert len(index) == 6
+    assert index.starts.tolist() == [0, 6, 12, 19, 24, 29]
+    assert index.ends.tolist() == [5, 11, 18, 23, 28, 33]
+    assert index.words.pages.tolist() == [1, 1, 1, 1, 2, 2]
+    assert index.words.rects[0].tolist() == pytest.approx([0.1, 0.1, 0.2, 0.05])
+
+
+def test_page_range():
+    index = make_index()
+
+    assert index.page_range(1) == (0, 23)
+    assert index.page_range(2) == (24, 33)
+    assert index.page_range(3) == (33, 33)
+
+
+def test_word_range():
+    """Test that all words overlapping the range are found, also partially."""
+    index = make_index()
+
+    assert index.word_range(0, 5) == (0, 1)
+    assert index.word_range(3, 8) == (0, 2)
+    assert index.word_range(5, 6) == (1, 1)
+    assert index.word_range(12, 33) == (2, 6)
+    assert index.word_range(40, 50) == (6, 6)
+
+
+def test_highlights_per_word_and_line():
+    index = make_index()
+    start = index.text.index("world")
+    end = index.text.index("page") + len("page")
+
+    words = index.highlight_array(start, end, level=None)
+    lines = index.highlights(start, end)
+
+    assert len(words) == 5
+    assert all(isinstance(h, PDFHighlight) for h in lines)
+    assert [h.page for h in lines] == [1, 1, 2]
+    # the two words of the second line and of the next page are merged
+    assert lines[1].rect.left == pytest.approx(0.1)
+    assert lines[1].rect.width == pytest.approx(0.5)
+    assert index.highlights(40, 50) == []
+
+
+def test_locate():
+    """Test locating chunks with different whitespace and by their anchors."""
+    index = make_index()
+
+    assert index.locate("world\n second") == (6, 18)
+    assert index.locate("hello", start=1) is None
+    assert index.locate("   ") is None
+    assert index.locate("missing") is None
+
+    text = " ".join(f"word{i}" for i in range(40))
+    words = [(i, 0, i + 1, 1, f"word{i}") for i in range(40)]
+    long_index = WordIndex.from_pages([(1, 100.0, 10.0, words)])
+    # a chunk whose middle was extracted differently is found by its start and end
+    chunk = text[:60] + " extracted-differently " + text[-60:]
+    assert long_index.locate(chunk) == (0, len(text))
+    # the end of the chunk lies beyond the bound
+    assert long_index.locate(chunk, 0, len(text) - 1) is None
+
+
+def test_locate_within_page():
+    """Test that a search bounded to a page does not match text on later pages."""
+    index = make_index()
+    page_start, page_end = index.page_range(1)
+
+    assert index.locate("next", page_start, page_end) is None
+    assert index.locate("line next", page_start, page_end) is None
+    assert index.locate("second line", page_start, page_end) == (12, 23)
+    assert index.locate("next", *index.page_range(2)) == (24, 28)